@@ -61,6 +61,7 @@ def unregister():
     properties.clear_props(bpy.types.Scene)
     utils.bl_class_registry.BlClassRegistry.unregister()
     gpu_utils.shader.ShaderManager.unregister_shaders()
+    common.IslandCache.clear()
 
 
 if __name__ == "__main__":
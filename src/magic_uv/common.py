@@ -5,20 +5,56 @@ __status__ = "production"
 __version__ = "6.6"
 __date__ = "22 Apr 2022"
 
-from collections import defaultdict
+from collections import OrderedDict, deque
+try:
+    from collections.abc import MutableMapping
+except ImportError:
+    from collections import MutableMapping
 from pprint import pprint
 from math import fabs, sqrt
+import csv
+import hashlib
+import json
 import os
+import random
+import threading
+import time
 
 import bpy
 from mathutils import Vector
 import bmesh
+import numpy as np
 
 from .utils import compatibility as compat
-from .utils.graph import Graph, Node
+from .utils.graph import (
+    Graph,
+    Node,
+    calc_graph_signature,
+    make_csr_adjacency,
+    weld_points,
+)
+from .utils.island import IslandIndex, label_islands, make_csr
+from .utils.polygon import (
+    clip_polygons,
+    is_point_in_polygons,
+    is_polygon_overlapped,
+)
+from .utils.spatial import (
+    find_intersected_segments,
+    find_overlapped_boxes,
+    find_overlapped_boxes_by_grid,
+)
+from .utils.transform import (
+    calc_group_anchors,
+    make_scale_matrices,
+    to_uv_matrix,
+    transform_uvs,
+)
+from .utils.uv_array import UVLayerArray, read_bmesh
 
 
 __DEBUG_MODE = False
+__PROFILE_MODE = False
 
 
 def is_console_mode():
@@ -60,6 +96,209 @@ def debug_print(*s):
         pprint(s)
 
 
+def is_profile_mode():
+    return __PROFILE_MODE
+
+
+def enable_profile_mode():
+    # pylint: disable=W0603
+    global __PROFILE_MODE
+    __PROFILE_MODE = True
+
+
+def disable_profile_mode():
+    # pylint: disable=W0603
+    global __PROFILE_MODE
+    __PROFILE_MODE = False
+
+
+class _SpanStatistics:
+    """
+    Running aggregates of the durations of the span. Percentiles are
+    estimated from the reservoir sample of the durations.
+    """
+
+    __slots__ = ("count", "total", "max", "samples")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, duration, reservoir_size, rng):
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+        if len(self.samples) < reservoir_size:
+            self.samples.append(duration)
+            return
+        i = rng.randrange(self.count)
+        if i < reservoir_size:
+            self.samples[i] = duration
+
+
+class Profiler:
+    """
+    Records of the time spans measured in profiling mode.
+    Spans are recorded both as the statistics keyed by (category, name)
+    and as the events of the trace. Events exceeding max_events are not
+    recorded to the trace, but are counted in the statistics.
+    Statistics keep at most reservoir_size durations for each span, so
+    percentiles are estimated when a span is recorded more than that.
+    """
+
+    max_events = 1000000
+    reservoir_size = 1024
+
+    __events = []       # [(category, name, start, duration, thread ID)]
+    __spans = {}        # { (category, name): _SpanStatistics }
+    __num_dropped_events = 0
+    __num_records = 0
+    __cached_statistics = None      # (num_records, percentiles, stats)
+    __random = random.Random(0)
+    __origin = time.perf_counter()
+
+    @classmethod
+    def record(cls, category, name, start, end):
+        duration = end - start
+        span = cls.__spans.get((category, name))
+        if span is None:
+            span = _SpanStatistics()
+            cls.__spans[(category, name)] = span
+        span.add(duration, cls.reservoir_size, cls.__random)
+        cls.__num_records += 1
+        if len(cls.__events) >= cls.max_events:
+            cls.__num_dropped_events += 1
+            return
+        cls.__events.append(
+            (category, name, start, duration, threading.get_ident()))
+
+    @classmethod
+    def clear(cls):
+        cls.__events = []
+        cls.__spans = {}
+        cls.__num_dropped_events = 0
+        cls.__num_records = 0
+        cls.__cached_statistics = None
+
+    @classmethod
+    def num_events(cls):
+        return len(cls.__events)
+
+    @classmethod
+    def num_dropped_events(cls):
+        return cls.__num_dropped_events
+
+    @classmethod
+    def get_statistics(cls, percentiles=(50, 90, 99)):
+        """
+        Return the statistics (count, total/mean/max time and percentiles
+        of time in seconds) of each span sorted by the total time.
+        Statistics are cached until the next span is recorded.
+        """
+
+        percentiles = tuple(percentiles)
+        cached = cls.__cached_statistics
+        if cached is not None and cached[0] == cls.__num_records and \
+                cached[1] == percentiles:
+            return list(cached[2])
+
+        stats = []
+        for (category, name), span in cls.__spans.items():
+            samples = np.array(span.samples)
+            stats.append({
+                "category": category,
+                "name": name,
+                "count": span.count,
+                "total": span.total,
+                "mean": span.total / span.count,
+                "max": span.max,
+                "percentiles": {
+                    "{:g}".format(p): float(np.percentile(samples, p))
+                    for p in percentiles
+                },
+            })
+        stats.sort(key=lambda s: s["total"], reverse=True)
+        cls.__cached_statistics = (cls.__num_records, percentiles, stats)
+
+        return list(stats)
+
+    @classmethod
+    def dump_chrome_trace(cls, filepath):
+        """
+        Dump the recorded spans to the file as the Chrome trace event
+        format, which can be loaded by chrome://tracing or Perfetto
+        """
+
+        pid = os.getpid()
+        events = []
+        for category, name, start, duration, tid in cls.__events:
+            events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (start - cls.__origin) * 1000000.0,
+                "dur": duration * 1000000.0,
+                "pid": pid,
+                "tid": tid,
+            })
+        trace = {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "blender_version": ".".join(str(v) for v in bpy.app.version),
+                "dropped_events": cls.__num_dropped_events,
+            },
+        }
+        with open(filepath, "w") as f:
+            json.dump(trace, f)
+
+
+class _ProfileSpan:
+    __slots__ = ("category", "name", "start")
+
+    def __init__(self, category, name):
+        self.category = category
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        Profiler.record(self.category, self.name, self.start,
+                        time.perf_counter())
+        return False
+
+
+class _NullProfileSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        return False
+
+
+__NULL_PROFILE_SPAN = _NullProfileSpan()
+
+
+def profile_span(name, category='phase'):
+    """
+    Measure the time span of the with statement in profiling mode.
+    Phases of the operator are named 'extract', 'compute', 'write-back'
+    and 'mesh update'.
+    ex. with profile_span('compute'):
+    """
+
+    if not __PROFILE_MODE:
+        return __NULL_PROFILE_SPAN
+    return _ProfileSpan(category, name)
+
+
 def check_version(major, minor, _):
     """
     Check blender version
@@ -179,102 +418,598 @@ def create_new_uv_map(obj, name=None):
     return new
 
 
-def __get_island_info(uv_layer, islands):
+class IslandCache:
     """
-    get information about each island
+    Cache of the UV island index (utils.island.IslandIndex) shared among all
+    operators.
+    The entry is keyed by (BMesh, UV layer, only_selected) and validated by
+    the fingerprint of the topology (faces and vertices of loops) on every
+    query. When only UV coordinates are changed, the cached index is
+    updated incrementally.
+    Entries are evicted in LRU order when the total memory size exceeds
+    max_memory_size.
+    """
+
+    max_memory_size = 256 * 1024 * 1024     # bytes
+
+    __entries = OrderedDict()   # { key: entry }
+    __memory_size = 0
+    __num_hits = 0
+    __num_misses = 0
+
+    @staticmethod
+    def make_fingerprint(*arrays):
+        """
+        Make the fingerprint from the sizes and the hash of the array data
+        """
+
+        sizes = tuple(a.size for a in arrays)
+        hasher = hashlib.sha1()
+        for a in arrays:
+            hasher.update(np.ascontiguousarray(a).data)
+
+        return sizes, hasher.digest()
+
+    @classmethod
+    def __purge_invalid_entries(cls):
+        for key in [k for k, e in cls.__entries.items()
+                    if not e["bmesh"].is_valid]:
+            cls.__remove(key)
+
+    @classmethod
+    def __remove(cls, key):
+        entry = cls.__entries.pop(key)
+        cls.__memory_size -= entry["memory_size"]
+
+    @classmethod
+    def find(cls, bm, uv_layer, only_selected, fingerprint):
+        """
+        Return the cached data, or None if not cached or data is outdated
+        """
+
+        cls.__purge_invalid_entries()
+
+        key = (id(bm), uv_layer.name, only_selected)
+        entry = cls.__entries.get(key)
+        if entry is None or entry["fingerprint"] != fingerprint:
+            if entry is not None:
+                cls.__remove(key)
+            cls.__num_misses += 1
+            return None
+
+        cls.__entries.move_to_end(key)
+        cls.__num_hits += 1
+        return entry["data"]
+
+    @classmethod
+    def find_all(cls, bm, uv_layer):
+        """
+        Return the cached data of all entries of BMesh and UV layer
+        """
+
+        return [e["data"] for k, e in cls.__entries.items()
+                if k[0] == id(bm) and k[1] == uv_layer.name]
+
+    @classmethod
+    def store(cls, bm, uv_layer, only_selected, fingerprint, data):
+        """
+        Store data which has 'nbytes' attribute
+        """
+
+        key = (id(bm), uv_layer.name, only_selected)
+        if key in cls.__entries:
+            cls.__remove(key)
+
+        memory_size = data.nbytes
+        if memory_size > cls.max_memory_size:
+            return
+
+        cls.__entries[key] = {
+            # Keep the reference to BMesh so that id(bm) is not reused
+            # while the entry is alive.
+            "bmesh": bm,
+            "fingerprint": fingerprint,
+            "data": data,
+            "memory_size": memory_size,
+        }
+        cls.__memory_size += memory_size
+        while cls.__memory_size > cls.max_memory_size:
+            cls.__remove(next(iter(cls.__entries)))
+
+    @classmethod
+    def cache_info(cls):
+        """
+        Return the number of hits/misses, the number of entries and the
+        total memory size of the entries
+        """
+
+        return {
+            "hits": cls.__num_hits,
+            "misses": cls.__num_misses,
+            "num_entries": len(cls.__entries),
+            "memory_size": cls.__memory_size,
+        }
+
+    @classmethod
+    def clear(cls):
+        cls.__entries.clear()
+        cls.__memory_size = 0
+        cls.__num_hits = 0
+        cls.__num_misses = 0
+
+
+def get_loop_uvs(loops, uv_layer):
+    """
+    Get the UV coordinates of loops as the array whose shape is
+    (len(loops), 2)
+    """
+
+    uvs = []
+    for l in loops:
+        uvs.extend(l[uv_layer].uv)
+
+    return np.array(uvs, dtype=np.float64).reshape(-1, 2)
+
+
+def set_loop_uvs(loops, uv_layer, uvs):
+    """
+    Write back the UV coordinates of loops.
+    BMesh has no bulk setter, so uvs is converted to the list at once and
+    assigned to each loop.
     """
 
-    island_info = []
-    for isl in islands:
-        info = {}
-        max_uv = Vector((-10000000.0, -10000000.0))
-        min_uv = Vector((10000000.0, 10000000.0))
-        ave_uv = Vector((0.0, 0.0))
-        num_uv = 0
-        for face in isl:
-            n = 0
-            a = Vector((0.0, 0.0))
-            ma = Vector((-10000000.0, -10000000.0))
-            mi = Vector((10000000.0, 10000000.0))
-            for l in face['face'].loops:
-                uv = l[uv_layer].uv
-                ma.x = max(uv.x, ma.x)
-                ma.y = max(uv.y, ma.y)
-                mi.x = min(uv.x, mi.x)
-                mi.y = min(uv.y, mi.y)
-                a = a + uv
-                n = n + 1
-            ave_uv = ave_uv + a
-            num_uv = num_uv + n
-            a = a / n
-            max_uv.x = max(ma.x, max_uv.x)
-            max_uv.y = max(ma.y, max_uv.y)
-            min_uv.x = min(mi.x, min_uv.x)
-            min_uv.y = min(mi.y, min_uv.y)
-            face['max_uv'] = ma
-            face['min_uv'] = mi
-            face['ave_uv'] = a
-        ave_uv = ave_uv / num_uv
-
-        info['center'] = ave_uv
-        info['size'] = max_uv - min_uv
-        info['num_uv'] = num_uv
-        info['group'] = -1
-        info['faces'] = isl
-        info['max'] = max_uv
-        info['min'] = min_uv
-
-        island_info.append(info)
-
-    return island_info
-
-
-def __parse_island(bm, face_idx, faces_left, island,
-                   face_to_verts, vert_to_faces):
-    """
-    Parse island
-    """
-
-    faces_to_parse = [face_idx]
-    while faces_to_parse:
-        fidx = faces_to_parse.pop(0)
-        if fidx in faces_left:
-            faces_left.remove(fidx)
-            island.append({'face': bm.faces[fidx]})
-            for v in face_to_verts[fidx]:
-                connected_faces = vert_to_faces[v]
-                for cf in connected_faces:
-                    faces_to_parse.append(cf)
-
-
-def __get_island(bm, face_to_verts, vert_to_faces):
-    """
-    Get island list
-    """
-
-    uv_island_lists = []
-    faces_left = set(face_to_verts.keys())
-    while faces_left:
-        current_island = []
-        face_idx = list(faces_left)[0]
-        __parse_island(bm, face_idx, faces_left, current_island,
-                       face_to_verts, vert_to_faces)
-        uv_island_lists.append(current_island)
-
-    return uv_island_lists
-
-
-def __create_vert_face_db(faces, uv_layer):
-    # create mesh database for all faces
-    face_to_verts = defaultdict(set)
-    vert_to_faces = defaultdict(set)
-    for f in faces:
+    for l, uv in zip(loops, np.asarray(uvs).tolist()):
+        l[uv_layer].uv = uv
+
+
+def transform_loop_uvs(loops, uv_layer, matrices, groups=None, uvs=None):
+    """
+    Apply the 2D affine transform to UV coordinates of loops, and write
+    back them at once.
+    matrices is the 3x3 matrix (or the 4x4 matrix which transforms the
+    points on the XY plane) applied to all loops, or the array of 3x3
+    matrices whose groups[i]-th matrix is applied to the i-th loop.
+    uvs is the UV coordinates to be transformed instead of the current UV
+    coordinates of loops.
+    Return the transformed UV coordinates.
+    """
+
+    if uvs is None:
+        with profile_span('extract'):
+            uvs = get_loop_uvs(loops, uv_layer)
+    with profile_span('compute'):
+        if groups is None:
+            matrices = to_uv_matrix(matrices)
+        uvs = transform_uvs(uvs, matrices, groups)
+    with profile_span('write-back'):
+        set_loop_uvs(loops, uv_layer, uvs)
+
+    return uvs
+
+
+def get_face_group_loops(uv_array, faces_list):
+    """
+    Get the loop indices in UVLayerArray of each face group in faces_list,
+    and the group index of each loop.
+    uv_array must be read after the face index of BMesh is updated.
+    """
+
+    face_indices = np.fromiter(
+        (f.index for faces in faces_list for f in faces), dtype=np.int64)
+    loops = uv_array.get_face_loops(face_indices)
+    face_groups = np.repeat(np.arange(len(faces_list)),
+                            [len(faces) for faces in faces_list])
+    groups = np.repeat(face_groups, uv_array.face_loop_totals[face_indices])
+
+    return loops, groups
+
+
+def transform_uv_array(uv_array, loops, matrices, groups=None, uvs=None):
+    """
+    Apply the 2D affine transform to UV coordinates of loops (loop indices
+    in UVLayerArray), and write back them to the mesh. The mesh is not
+    updated.
+    Other arguments are same as transform_loop_uvs.
+    Return the transformed UV coordinates.
+    """
+
+    if uvs is None:
+        with profile_span('extract'):
+            uvs = uv_array.uvs[loops]
+    with profile_span('compute'):
+        if groups is None:
+            matrices = to_uv_matrix(matrices)
+        uvs = transform_uvs(uvs, matrices, groups)
+    with profile_span('write-back'):
+        uv_array.uvs[loops] = uvs
+        uv_array.mark_dirty('UV', loops)
+        uv_array.write_back(update=False)
+
+    return uvs
+
+
+def scale_face_groups_uvs(obj, faces_list, uv_layer, origin, factors):
+    """
+    Scale UV coordinates of each face group in faces_list by factors[i]
+    about the origin (ex. 'CENTER', 'LEFT_TOP') of the group.
+    UV coordinates are read and written back through UVLayerArray.
+    """
+
+    with profile_span('extract'):
+        uv_array = UVLayerArray(obj, uv_layer.name)
+        loops, groups = get_face_group_loops(uv_array, faces_list)
+        uvs = uv_array.uvs[loops]
+    origins = calc_group_anchors(uvs, groups, len(faces_list), origin)
+    transform_uv_array(uv_array, loops,
+                       make_scale_matrices(factors, origins), groups, uvs)
+
+
+def move_face_groups_uvs(obj, faces_list, uv_layer, offsets, anchor=None):
+    """
+    Move UV coordinates of each face group in faces_list by offsets[i].
+    When anchor (ex. 'CENTER') is specified, each group is moved so that
+    its anchor point comes to offsets[i].
+    UV coordinates are read and written back through UVLayerArray.
+    """
+
+    with profile_span('extract'):
+        uv_array = UVLayerArray(obj, uv_layer.name)
+        loops, groups = get_face_group_loops(uv_array, faces_list)
+        uvs = uv_array.uvs[loops]
+    offsets = np.asarray(offsets, dtype=np.float64).reshape(-1, 2)
+    if anchor is not None:
+        offsets = offsets - calc_group_anchors(uvs, groups, len(faces_list),
+                                               anchor)
+    transform_uv_array(uv_array, loops, make_translation_matrices(offsets),
+                       groups, uvs)
+
+
+def __create_loop_arrays(faces, uv_layer):
+    """
+    Create the flat arrays about loops of faces
+    """
+
+    face_indices = []
+    loop_faces = []
+    loop_verts = []
+    loop_uvs = []
+    for i, f in enumerate(faces):
+        face_indices.append(f.index)
         for l in f.loops:
-            id_ = l[uv_layer].uv.to_tuple(5), l.vert.index
-            face_to_verts[f.index].add(id_)
-            vert_to_faces[id_].add(f.index)
+            loop_faces.append(i)
+            loop_verts.append(l.vert.index)
+            loop_uvs.extend(l[uv_layer].uv)
+
+    return (np.array(face_indices, dtype=np.int32),
+            np.array(loop_faces, dtype=np.int32),
+            np.array(loop_verts, dtype=np.int32),
+            np.array(loop_uvs, dtype=np.float32).reshape(-1, 2))
+
+
+class _IslandCacheData:
+    """
+    Island index of faces and the arrays made from it, which are stored in
+    IslandCache
+    """
+
+    def __init__(self, index, face_indices):
+        self.index = index
+        self.face_indices = face_indices    # BMFace.index of faces
+        self.__arrays = None
+        self.__face_table = None
+
+    @property
+    def nbytes(self):
+        # Arrays made from the index are not larger than the index.
+        return 2 * self.index.nbytes + self.face_indices.nbytes
+
+    def update_uvs(self, loops, uvs):
+        """
+        Update UV coordinates of loops (index of loops in the index)
+        """
+
+        self.index.update_uvs(loops, uvs)
+        self.__arrays = None
+
+    def find_loops(self, bmloops):
+        """
+        Find the index of loops in the index.
+        Return the array whose element is -1 if the face of the loop is not
+        in the index.
+        """
+
+        if self.__face_table is None:
+            size = int(self.face_indices.max()) + 1 \
+                if self.face_indices.size else 0
+            self.__face_table = np.full(size, -1, dtype=np.int64)
+            self.__face_table[self.face_indices] = \
+                np.arange(len(self.face_indices))
+
+        face_indices = np.fromiter((l.face.index for l in bmloops),
+                                   dtype=np.int64, count=len(bmloops))
+        vert_indices = np.fromiter((l.vert.index for l in bmloops),
+                                   dtype=np.int64, count=len(bmloops))
+        in_table = (face_indices >= 0) & \
+            (face_indices < len(self.__face_table))
+        faces = np.full(len(bmloops), -1, dtype=np.int64)
+        faces[in_table] = self.__face_table[face_indices[in_table]]
+
+        loops = np.full(len(bmloops), -1, dtype=np.int64)
+        found = np.flatnonzero(faces >= 0)
+        loops[found] = self.index.find_loops(faces[found],
+                                             vert_indices[found])
+
+        return loops
+
+    def get_arrays(self):
+        """
+        Get the island index and UV bounds of each face/island as arrays
+        """
+
+        if self.__arrays is not None:
+            return self.__arrays
+
+        index = self.index
+
+        # Remove the islands which are removed by the incremental update.
+        islands = index.get_islands()
+        island_map = np.full(len(index.island_num_uv), -1, dtype=np.int64)
+        island_map[islands] = np.arange(len(islands))
+        face_islands = island_map[index.face_islands]
+        island_faces, island_face_offsets = make_csr(face_islands,
+                                                     len(islands))
+
+        # Copy arrays because the cached index will be updated in place.
+        self.__arrays = {
+            "face_indices": self.face_indices,
+            "face_islands": face_islands,
+            "face_min_uv": index.face_min_uv.copy(),
+            "face_max_uv": index.face_max_uv.copy(),
+            "face_ave_uv": index.face_ave_uv.copy(),
+            "island_min_uv": index.island_min_uv[islands],
+            "island_max_uv": index.island_max_uv[islands],
+            "island_ave_uv": index.island_ave_uv[islands],
+            "island_num_uv": index.island_num_uv[islands],
+            "island_faces": island_faces,
+            "island_face_offsets": island_face_offsets,
+        }
+
+        return self.__arrays
+
+
+def __read_loop_arrays(bm, face_indices, uv_layer):
+    """
+    Read the loops of faces (whose position in bm.faces is face_indices[i])
+    at once through the temporary mesh, without walking BMesh loops.
+    Return (loop_faces, loop_verts, loop_uvs). loop_faces[i] is the index
+    in face_indices, and loop_verts[i] is the position of the vertex in
+    bm.verts.
+    """
+
+    data = read_bmesh(bm, uv_layer.name)
+    counts = data['FACE_LOOP_TOTALS'][face_indices].astype(np.int64)
+    num_loops = int(counts.sum())
+    loop_faces = np.repeat(np.arange(len(face_indices)), counts)
+    loops = np.repeat(
+        data['FACE_LOOP_STARTS'][face_indices] - (np.cumsum(counts) - counts),
+        counts) + np.arange(num_loops)
+
+    return loop_faces, data['LOOP_VERTS'][loops], data['UV'][loops]
+
+
+def __get_island_data(bm, faces, uv_layer, only_selected):
+    """
+    Get the island index of faces.
+    The index is shared among operators via IslandCache.
+    """
+
+    bm.faces.index_update()
+    face_indices = np.fromiter((f.index for f in faces), dtype=np.int64,
+                               count=len(faces))
+    loop_faces, loop_verts, loop_uvs = \
+        __read_loop_arrays(bm, face_indices, uv_layer)
+    fingerprint = IslandCache.make_fingerprint(face_indices, loop_verts)
+
+    data = IslandCache.find(bm, uv_layer, only_selected, fingerprint)
+    if data is None:
+        index = IslandIndex(len(faces), loop_faces, loop_verts, loop_uvs)
+        data = _IslandCacheData(index, face_indices)
+        IslandCache.store(bm, uv_layer, only_selected, fingerprint, data)
+    else:
+        # Topology is same, so label again only the islands whose UV
+        # coordinates are changed.
+        changed_loops = np.flatnonzero(
+            np.any(data.index.loop_uvs != loop_uvs, axis=1))
+        if changed_loops.size != 0:
+            data.update_uvs(changed_loops, loop_uvs[changed_loops])
+
+    return data
+
+
+def update_island_cache(bm, uv_layer, loops):
+    """
+    Apply the change of UV coordinates of loops to the islands cached in
+    IslandCache, so that the islands are labeled while the changed loops
+    are known. The cached islands are still validated by the next query.
+    This must be called after UV coordinates of loops are changed.
+    """
+
+    datas = IslandCache.find_all(bm, uv_layer)
+    if not datas:
+        return
+
+    loops = list(loops)
+    bm.faces.index_update()
+    bm.verts.index_update()
+    uvs = get_loop_uvs(loops, uv_layer)
+    for data in datas:
+        indices = data.find_loops(loops)
+        found = indices >= 0
+        indices = indices[found]
+        new_uvs = uvs[found]
+        changed = np.any(data.index.loop_uvs[indices] != new_uvs, axis=1)
+        if np.any(changed):
+            data.update_uvs(indices[changed], new_uvs[changed])
+
+
+class _ArrayRecord(MutableMapping):
+    """
+    Dictionary compatible record whose values are materialized from the
+    arrays when they are accessed first time.
+    """
+
+    __slots__ = ("_fields",)
+
+    # Keys provided by the record. Values of the lazy keys are kept after
+    # they are materialized.
+    record_keys = ()
+    lazy_keys = ()
+
+    def __init__(self):
+        self._fields = None     # materialized or user specified values
+
+    def _materialize(self, key):
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        if self._fields is not None and key in self._fields:
+            return self._fields[key]
+        value = self._materialize(key)
+        if key in self.lazy_keys:
+            self[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        if self._fields is None:
+            self._fields = {}
+        self._fields[key] = value
+
+    def __delitem__(self, key):
+        if self._fields is None:
+            raise KeyError(key)
+        del self._fields[key]
+
+    def __iter__(self):
+        for key in self.record_keys:
+            yield key
+        if self._fields is not None:
+            for key in self._fields:
+                if key not in self.record_keys:
+                    yield key
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    # Records are compared by the identity.
+    # Comparing the values like dict materializes all of them.
+    __eq__ = object.__eq__
+    __ne__ = object.__ne__
+    __hash__ = object.__hash__
+
+
+class IslandFaceInfo(_ArrayRecord):
+    """
+    Face record of the island. See get_island_info_from_bmesh().
+    """
+
+    __slots__ = ("_face", "_data", "_index")
+
+    record_keys = ("face", "max_uv", "min_uv", "ave_uv")
+    lazy_keys = ("max_uv", "min_uv", "ave_uv")
+
+    def __init__(self, face, data, index):
+        super().__init__()
+        self._face = face
+        self._data = data
+        self._index = index
+
+    def _materialize(self, key):
+        if key == "face":
+            return self._face
+        if key in self.lazy_keys:
+            return Vector(self._data["face_" + key][self._index])
+        raise KeyError(key)
 
-    return (face_to_verts, vert_to_faces)
+
+class IslandInfo(_ArrayRecord):
+    """
+    Island record. See get_island_info_from_bmesh().
+    """
+
+    __slots__ = ("_faces", "_data", "_index")
+
+    record_keys = ("faces", "center", "size", "num_uv", "group", "max",
+                   "min")
+    lazy_keys = record_keys
+
+    def __init__(self, faces, data, index):
+        super().__init__()
+        self._faces = faces     # all faces passed to get_island_info_*
+        self._data = data
+        self._index = index
+
+    def __face_indices(self):
+        offsets = self._data["island_face_offsets"]
+        return self._data["island_faces"][
+            offsets[self._index]:offsets[self._index + 1]].tolist()
+
+    def get_bmfaces(self):
+        """
+        Return BMFace list without creating face records
+        """
+
+        return [self._faces[i] for i in self.__face_indices()]
+
+    def get_bmface_indices(self):
+        """
+        Return the array of BMFace.index of faces in this island
+        """
+
+        offsets = self._data["island_face_offsets"]
+        faces = self._data["island_faces"][
+            offsets[self._index]:offsets[self._index + 1]]
+        return self._data["face_indices"][faces]
+
+    def get_face_ave_uvs(self):
+        """
+        Return the array of the average UV coordinates of faces (same as
+        ave_uv of the face records) whose shape is (num_faces, 2)
+        """
+
+        return self._data["face_ave_uv"][self.__face_indices()]
+
+    def _materialize(self, key):
+        data = self._data
+        idx = self._index
+        if key == "faces":
+            return [IslandFaceInfo(self._faces[i], data, i)
+                    for i in self.__face_indices()]
+        if key == "center":
+            return Vector(data["island_ave_uv"][idx])
+        if key == "size":
+            size = data["island_max_uv"][idx] - data["island_min_uv"][idx]
+            return Vector(size)
+        if key == "num_uv":
+            return int(data["island_num_uv"][idx])
+        if key == "group":
+            return -1
+        if key == "max":
+            return Vector(data["island_max_uv"][idx])
+        if key == "min":
+            return Vector(data["island_min_uv"][idx])
+        raise KeyError(key)
+
+
+def __get_island_info(bm, faces, uv_layer, only_selected):
+    """
+    get information about each island
+    """
+
+    data = __get_island_data(bm, faces, uv_layer, only_selected) \
+        .get_arrays()
+    num_islands = len(data["island_num_uv"])
+
+    return [IslandInfo(faces, data, i) for i in range(num_islands)]
 
 
 def get_island_info(obj, only_selected=True):
@@ -286,6 +1021,8 @@ def get_island_info(obj, only_selected=True):
 
 
 # Return island info.
+# Each island and face is a dictionary compatible record (IslandInfo and
+# IslandFaceInfo) whose values are created from the arrays on demand.
 #
 # Format:
 #
@@ -320,17 +1057,30 @@ def get_island_info_from_bmesh(bm, only_selected=True):
     else:
         selected_faces = [f for f in bm.faces]
 
-    return get_island_info_from_faces(bm, selected_faces, uv_layer)
+    return get_island_info_from_faces(bm, selected_faces, uv_layer,
+                                      only_selected)
 
 
-def get_island_info_from_faces(bm, faces, uv_layer):
-    ftv, vtf = __create_vert_face_db(faces, uv_layer)
+def get_island_info_from_faces(bm, faces, uv_layer, only_selected=True):
+    return __get_island_info(bm, faces, uv_layer, only_selected)
 
-    # Get island information
-    uv_island_lists = __get_island(bm, ftv, vtf)
-    island_info = __get_island_info(uv_layer, uv_island_lists)
 
-    return island_info
+def get_island_lookup_table(bm, islands):
+    """
+    Return the table to find the island which includes the face or loop.
+    i-th element is the index in islands of the island which includes the
+    face whose BMFace.index is i, and -1 if the face is not included.
+    The island of the loop l is found by table[l.face.index].
+    """
+
+    table = np.full(len(bm.faces), -1, dtype=np.int64)
+    for i, isl in enumerate(islands):
+        if isinstance(isl, IslandInfo):
+            table[isl.get_bmface_indices()] = i
+        else:
+            table[[f["face"].index for f in isl["faces"]]] = i
+
+    return table
 
 
 def get_uvimg_editor_board_size(area):
@@ -382,12 +1132,13 @@ def get_faces_list(bm, method, only_selected):
             faces = [f for f in bm.faces if f.select]
             islands = get_island_info_from_faces(bm, faces, uv_layer)
             for isl in islands:
-                faces_list.append([f["face"] for f in isl["faces"]])
+                faces_list.append(isl.get_bmfaces())
         else:
             faces = [f for f in bm.faces]
-            islands = get_island_info_from_faces(bm, faces, uv_layer)
+            islands = get_island_info_from_faces(bm, faces, uv_layer,
+                                                 only_selected=False)
             for isl in islands:
-                faces_list.append([f["face"] for f in isl["faces"]])
+                faces_list.append(isl.get_bmfaces())
     elif method == 'FACE':
         if only_selected:
             for f in bm.faces:
@@ -402,21 +1153,85 @@ def get_faces_list(bm, method, only_selected):
     return faces_list
 
 
-def measure_all_faces_mesh_area(bm):
+def __calc_triangle_areas_3d(tris):
+    edges_1 = tris[:, 1] - tris[:, 0]
+    edges_2 = tris[:, 2] - tris[:, 0]
+    cross_x = edges_1[:, 1] * edges_2[:, 2] - edges_1[:, 2] * edges_2[:, 1]
+    cross_y = edges_1[:, 2] * edges_2[:, 0] - edges_1[:, 0] * edges_2[:, 2]
+    cross_z = edges_1[:, 0] * edges_2[:, 1] - edges_1[:, 1] * edges_2[:, 0]
+    lengths = cross_x * cross_x + cross_y * cross_y
+    lengths += cross_z * cross_z
+    return 0.5 * np.sqrt(lengths)
+
+
+def __calc_triangle_areas_2d(tris):
+    edges_1 = tris[:, 1] - tris[:, 0]
+    edges_2 = tris[:, 2] - tris[:, 0]
+    cross_1 = edges_1[:, 0] * edges_2[:, 1]
+    cross_2 = edges_1[:, 1] * edges_2[:, 0]
+    return 0.5 * np.abs(cross_1 - cross_2)
+
+
+def calc_face_area_table(bm, uv_layer=None):
+    """
+    Calculate the mesh area and UV area of all faces in a single pass.
+    Return (mesh_areas, uv_areas). i-th element is the area of the face
+    whose BMFace.index is i. uv_areas is None if uv_layer is None.
+    BMFace.index is updated to be consistent with the tables.
+    """
+
+    bm.faces.index_update()
     if compat.check_version(2, 80, 0) >= 0:
         triangle_loops = bm.calc_loop_triangles()
     else:
         triangle_loops = bm.calc_tessface()
 
-    areas = {face: 0.0 for face in bm.faces}
-
+    tri_faces = []
+    tri_cos = []
+    tri_uvs = []
     for loops in triangle_loops:
-        face = loops[0].face
-        area = areas[face]
-        area += calc_tris_3d_area([l.vert.co for l in loops])
-        areas[face] = area
+        tri_faces.append(loops[0].face.index)
+        for l in loops:
+            tri_cos.extend(l.vert.co)
+            if uv_layer is not None:
+                tri_uvs.extend(l[uv_layer].uv)
+
+    tri_faces = np.array(tri_faces, dtype=np.int64)
+    tri_cos = np.array(tri_cos, dtype=np.float64).reshape(-1, 3, 3)
+    mesh_areas = np.bincount(tri_faces,
+                             weights=__calc_triangle_areas_3d(tri_cos),
+                             minlength=len(bm.faces))
+    if uv_layer is None:
+        return mesh_areas, None
+
+    tri_uvs = np.array(tri_uvs, dtype=np.float64).reshape(-1, 3, 2)
+    uv_areas = np.bincount(tri_faces,
+                           weights=__calc_triangle_areas_2d(tri_uvs),
+                           minlength=len(bm.faces))
+
+    return mesh_areas, uv_areas
+
+
+def sum_face_areas(face_areas, faces_list):
+    """
+    Sum up the areas of faces for each group in faces_list.
+    face_areas is the table returned by calc_face_area_table, and faces
+    must not be added or removed after the table is calculated.
+    """
+
+    face_indices = [f.index for faces in faces_list for f in faces]
+    groups = np.repeat(np.arange(len(faces_list)),
+                       [len(faces) for faces in faces_list])
+    totals = np.bincount(groups, weights=face_areas[face_indices],
+                         minlength=len(faces_list))
 
-    return areas
+    return totals.tolist()
+
+
+def measure_all_faces_mesh_area(bm):
+    mesh_areas, _ = calc_face_area_table(bm)
+
+    return {face: mesh_areas[face.index] for face in bm.faces}
 
 
 def measure_mesh_area(obj, calc_method, only_selected):
@@ -427,23 +1242,16 @@ def measure_mesh_area(obj, calc_method, only_selected):
         bm.faces.ensure_lookup_table()
 
     faces_list = get_faces_list(bm, calc_method, only_selected)
+    mesh_areas, _ = calc_face_area_table(bm)
 
-    areas = []
-    for faces in faces_list:
-        areas.append(measure_mesh_area_from_faces(bm, faces))
-
-    return areas
+    return sum_face_areas(mesh_areas, faces_list)
 
 
-def measure_mesh_area_from_faces(bm, faces):
-    face_areas = measure_all_faces_mesh_area(bm)
+def measure_mesh_area_from_faces(bm, faces, face_areas=None):
+    if face_areas is None:
+        face_areas, _ = calc_face_area_table(bm)
 
-    mesh_area = 0.0
-    for f in faces:
-        if f in face_areas:
-            mesh_area += face_areas[f]
-
-    return mesh_area
+    return sum_face_areas(face_areas, [faces])[0]
 
 
 def find_texture_layer(bm):
@@ -512,86 +1320,138 @@ def find_images(obj, face=None, tex_layer=None):
 
 
 def measure_all_faces_uv_area(bm, uv_layer):
-    if compat.check_version(2, 80, 0) >= 0:
-        triangle_loops = bm.calc_loop_triangles()
-    else:
-        triangle_loops = bm.calc_tessface()
+    _, uv_areas = calc_face_area_table(bm, uv_layer)
 
-    areas = {face: 0.0 for face in bm.faces}
+    return {face: uv_areas[face.index] for face in bm.faces}
 
-    for loops in triangle_loops:
-        face = loops[0].face
-        area = areas[face]
-        area += calc_tris_2d_area([l[uv_layer].uv for l in loops])
-        areas[face] = area
 
-    return areas
+class TextureSizeResolver:
+    """
+    Memo of the texture size used to measure the UV area of faces within
+    one call.
+    The texture size is resolved on the first lookup of each texture
+    source (the image assigned to the face by the texture layer, or the
+    textures of the object's materials) and reused for the other faces.
+    The memo is never invalidated, so do not keep it across calls: create
+    it for each measurement so that the change of materials and images is
+    reflected.
+    """
 
+    def __init__(self, obj, tex_layer=None):
+        self.__obj = obj
+        self.__tex_layer = tex_layer
+        self.__node_images = None
+        self.__sizes = {}   # { (method, tex_size, image): size }
 
-def measure_uv_area_from_faces(obj, bm, faces, uv_layer, tex_layer,
-                               tex_selection_method, tex_size):
+    def __find_images(self, image):
+        if image is not None:
+            return [image]
+        if self.__node_images is None:
+            self.__node_images = find_images(self.__obj)
+        return self.__node_images
 
-    face_areas = measure_all_faces_uv_area(bm, uv_layer)
+    def __resolve(self, tex_selection_method, tex_size, image):
+        # user specified
+        if tex_selection_method == 'USER_SPECIFIED' and tex_size is not None:
+            return tex_size
 
-    uv_area = 0.0
-    for f in faces:
-        if f not in face_areas:
-            continue
+        if tex_selection_method not in ('FIRST', 'AVERAGE', 'MAX', 'MIN'):
+            raise RuntimeError("Unexpected method: {}"
+                               .format(tex_selection_method))
 
-        f_uv_area = face_areas[f]
+        imgs = self.__find_images(image)
+        # can not find from node, so we can not get texture size
+        if not imgs:
+            return None
 
-        # user specified
-        if tex_selection_method == 'USER_SPECIFIED' and tex_size is not None:
-            img_size = tex_size
+        sizes = [tuple(img.size) for img in imgs]
         # first texture if there are more than 2 textures assigned
         # to the object
-        elif tex_selection_method == 'FIRST':
-            img = find_image(obj, f, tex_layer)
-            # can not find from node, so we can not get texture size
-            if not img:
-                return None
-            img_size = img.size
+        if tex_selection_method == 'FIRST':
+            if len(imgs) >= 2:
+                raise RuntimeError("Find more than 2 images")
+            return sizes[0]
         # average texture size
-        elif tex_selection_method == 'AVERAGE':
-            imgs = find_images(obj, f, tex_layer)
-            if not imgs:
-                return None
-
-            img_size_total = [0.0, 0.0]
-            for img in imgs:
-                img_size_total = [img_size_total[0] + img.size[0],
-                                  img_size_total[1] + img.size[1]]
-            img_size = [img_size_total[0] / len(imgs),
-                        img_size_total[1] / len(imgs)]
+        if tex_selection_method == 'AVERAGE':
+            return (sum(s[0] for s in sizes) / len(sizes),
+                    sum(s[1] for s in sizes) / len(sizes))
         # max texture size
-        elif tex_selection_method == 'MAX':
-            imgs = find_images(obj, f, tex_layer)
-            if not imgs:
+        if tex_selection_method == 'MAX':
+            return (max(s[0] for s in sizes), max(s[1] for s in sizes))
+        # min texture size
+        return (min(s[0] for s in sizes), min(s[1] for s in sizes))
+
+    def get_size(self, tex_selection_method, tex_size=None, image=None):
+        """
+        Return the texture size, or None if no texture is found
+        """
+
+        if tex_size is not None:
+            tex_size = tuple(tex_size)
+        key = (tex_selection_method, tex_size, image)
+        if key not in self.__sizes:
+            self.__sizes[key] = self.__resolve(tex_selection_method,
+                                               tex_size, image)
+
+        return self.__sizes[key]
+
+    def get_face_sizes(self, faces, tex_selection_method, tex_size=None):
+        """
+        Return the array of the texture size of each face whose shape is
+        (len(faces), 2), or None if the texture of any face is not found
+        """
+
+        if not faces:
+            return np.empty((0, 2))
+
+        # Faces share the same texture without texture layer.
+        tex_layer = self.__tex_layer
+        user_specified = (tex_selection_method == 'USER_SPECIFIED')
+        user_specified &= (tex_size is not None)
+        if tex_layer is None or user_specified:
+            size = self.get_size(tex_selection_method, tex_size)
+            if size is None:
                 return None
+            return np.tile(np.array(size, dtype=np.float64), (len(faces), 1))
 
-            img_size_max = [-99999999.0, -99999999.0]
-            for img in imgs:
-                img_size_max = [max(img_size_max[0], img.size[0]),
-                                max(img_size_max[1], img.size[1])]
-            img_size = img_size_max
-        # min texture size
-        elif tex_selection_method == 'MIN':
-            imgs = find_images(obj, f, tex_layer)
-            if not imgs:
+        images = []
+        face_images = []
+        image_to_index = {}
+        for f in faces:
+            img = f[tex_layer].image
+            if img not in image_to_index:
+                image_to_index[img] = len(images)
+                images.append(img)
+            face_images.append(image_to_index[img])
+
+        sizes = []
+        for img in images:
+            size = self.get_size(tex_selection_method, tex_size, img)
+            if size is None:
                 return None
+            sizes.append(size)
 
-            img_size_min = [99999999.0, 99999999.0]
-            for img in imgs:
-                img_size_min = [min(img_size_min[0], img.size[0]),
-                                min(img_size_min[1], img.size[1])]
-            img_size = img_size_min
-        else:
-            raise RuntimeError("Unexpected method: {}"
-                               .format(tex_selection_method))
+        return np.array(sizes, dtype=np.float64)[face_images]
 
-        uv_area += f_uv_area * img_size[0] * img_size[1]
 
-    return uv_area
+def measure_uv_area_from_faces(obj, bm, faces, uv_layer, tex_layer,
+                               tex_selection_method, tex_size,
+                               face_areas=None, tex_size_resolver=None):
+
+    if face_areas is None:
+        _, face_areas = calc_face_area_table(bm, uv_layer)
+    if tex_size_resolver is None:
+        tex_size_resolver = TextureSizeResolver(obj, tex_layer)
+
+    img_sizes = tex_size_resolver.get_face_sizes(
+        faces, tex_selection_method, tex_size)
+    if img_sizes is None:
+        return None
+
+    f_uv_areas = face_areas[[f.index for f in faces]]
+    f_uv_areas = f_uv_areas * img_sizes[:, 0] * img_sizes[:, 1]
+
+    return float(np.sum(f_uv_areas))
 
 
 def measure_uv_area(obj, calc_method, tex_selection_method,
@@ -607,13 +1467,15 @@ def measure_uv_area(obj, calc_method, tex_selection_method,
     uv_layer = bm.loops.layers.uv.verify()
     tex_layer = find_texture_layer(bm)
     faces_list = get_faces_list(bm, calc_method, only_selected)
+    _, face_areas = calc_face_area_table(bm, uv_layer)
+    tex_size_resolver = TextureSizeResolver(obj, tex_layer)
 
     # measure
     uv_areas = []
     for faces in faces_list:
         uv_area = measure_uv_area_from_faces(
             obj, bm, faces, uv_layer, tex_layer,
-            tex_selection_method, tex_size)
+            tex_selection_method, tex_size, face_areas, tex_size_resolver)
         if uv_area is None:
             return None
         uv_areas.append(uv_area)
@@ -621,6 +1483,269 @@ def measure_uv_area(obj, calc_method, tex_selection_method,
     return uv_areas
 
 
+def __measure_mesh_face_areas(obj, tex_selection_method, tex_size):
+    """
+    Measure the mesh area and the UV area (multiplied by the texture size)
+    of each face, and label UV islands from the mesh data without entering
+    edit mode.
+    Return None if the object has no UV map or texture.
+    """
+
+    mesh = obj.data
+
+    # Blender 2.7x has no loop triangles API and the texture may be
+    # assigned per face, so measure them on the temporary BMesh.
+    if compat.check_version(2, 80, 0) < 0:
+        bm = bmesh.new()
+        try:
+            bm.from_mesh(mesh)
+            bm.verts.index_update()
+            bm.faces.index_update()
+            if not bm.loops.layers.uv:
+                return None
+            uv_layer = bm.loops.layers.uv.verify()
+            faces = list(bm.faces)
+            tex_sizes = TextureSizeResolver(
+                obj, find_texture_layer(bm)).get_face_sizes(
+                    faces, tex_selection_method, tex_size)
+            if tex_sizes is None:
+                return None
+            mesh_areas, uv_areas = calc_face_area_table(bm, uv_layer)
+            _, loop_faces, loop_verts, loop_uvs = \
+                __create_loop_arrays(faces, uv_layer)
+        finally:
+            bm.free()
+    else:
+        if not mesh.uv_layers:
+            return None
+        tex_size = TextureSizeResolver(obj).get_size(tex_selection_method,
+                                                     tex_size)
+        if tex_size is None:
+            return None
+        tex_sizes = np.array([tex_size], dtype=np.float64)
+
+        uv_array = UVLayerArray(obj)
+        num_faces = uv_array.num_faces
+        loop_faces = uv_array.loop_faces
+        loop_verts = uv_array.loop_verts
+        loop_uvs = uv_array.uvs
+        vert_cos = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", vert_cos)
+        vert_cos = vert_cos.reshape(-1, 3)
+
+        mesh.calc_loop_triangles()
+        num_tris = len(mesh.loop_triangles)
+        tri_loops = np.empty(num_tris * 3, dtype=np.int32)
+        tri_faces = np.empty(num_tris, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", tri_loops)
+        mesh.loop_triangles.foreach_get("polygon_index", tri_faces)
+
+        tri_cos = vert_cos[loop_verts[tri_loops]].astype(np.float64)
+        tri_uvs = loop_uvs[tri_loops].astype(np.float64)
+        mesh_areas = np.bincount(
+            tri_faces, minlength=num_faces,
+            weights=__calc_triangle_areas_3d(tri_cos.reshape(-1, 3, 3)))
+        uv_areas = np.bincount(
+            tri_faces, minlength=num_faces,
+            weights=__calc_triangle_areas_2d(tri_uvs.reshape(-1, 3, 2)))
+
+    num_islands, face_islands = label_islands(
+        len(mesh_areas), loop_faces, loop_verts, loop_uvs)
+
+    return {
+        "mesh_areas": mesh_areas,
+        "uv_areas": uv_areas * tex_sizes[:, 0] * tex_sizes[:, 1],
+        "num_islands": num_islands,
+        "face_islands": face_islands,
+    }
+
+
+def __calc_densities(uv_areas, mesh_areas):
+    densities = np.zeros(len(mesh_areas))
+    valid = mesh_areas > 0.0
+    densities[valid] = np.sqrt(uv_areas[valid]) / np.sqrt(mesh_areas[valid])
+    return densities
+
+
+def __calc_density_statistics(densities, mesh_areas, percentiles):
+    # Densities of the degenerated faces are meaningless.
+    densities = np.asarray(densities)[np.asarray(mesh_areas) > 0.0]
+
+    stats = {
+        "count": len(densities),
+        "min": None,
+        "max": None,
+        "mean": None,
+        "percentiles": {"{:g}".format(p): None for p in percentiles},
+    }
+    if len(densities) == 0:
+        return stats
+
+    stats["min"] = float(densities.min())
+    stats["max"] = float(densities.max())
+    stats["mean"] = float(densities.mean())
+    values = np.percentile(densities, list(percentiles))
+    for p, v in zip(percentiles, values):
+        stats["percentiles"]["{:g}".format(p)] = float(v)
+
+    return stats
+
+
+def measure_texel_density(objs, tex_selection_method='AVERAGE',
+                          tex_size=None, include_islands=True,
+                          include_faces=False,
+                          percentiles=(5, 25, 50, 75, 95)):
+    """
+    Measure the texel density of each object, UV island and face for all
+    mesh objects in objs without entering edit mode.
+    tex_selection_method and tex_size are same as
+    measure_uv_area_from_faces.
+    Return the report as the dictionary which can be serialized into JSON.
+    Objects which have no UV map or texture are listed in
+    "skipped_objects".
+    """
+
+    report = {
+        "tex_selection_method": tex_selection_method,
+        "objects": [],
+        "skipped_objects": [],
+        "statistics": {},
+    }
+    levels = {
+        "object": {"uv_areas": [], "mesh_areas": [], "densities": []},
+        "island": {"uv_areas": [], "mesh_areas": [], "densities": []},
+        "face": {"uv_areas": [], "mesh_areas": [], "densities": []},
+    }
+
+    for obj in objs:
+        if obj.type != 'MESH':
+            continue
+        if obj.mode == 'EDIT':
+            # Mesh data is not synchronized with the edit mesh.
+            obj.update_from_editmode()
+
+        if not obj.data.uv_layers:
+            report["skipped_objects"].append({
+                "name": obj.name,
+                "reason": "Object has no UV map",
+            })
+            continue
+        try:
+            info = __measure_mesh_face_areas(obj, tex_selection_method,
+                                             tex_size)
+        except RuntimeError as e:
+            # e.g. more than 2 textures are found for 'FIRST'.
+            report["skipped_objects"].append({
+                "name": obj.name,
+                "reason": str(e),
+            })
+            continue
+        if info is None:
+            report["skipped_objects"].append({
+                "name": obj.name,
+                "reason": "Texture is not found",
+            })
+            continue
+
+        face_uv_areas = info["uv_areas"]
+        face_mesh_areas = info["mesh_areas"]
+        num_islands = info["num_islands"]
+        face_islands = info["face_islands"]
+        isl_uv_areas = np.bincount(face_islands, weights=face_uv_areas,
+                                   minlength=num_islands)
+        isl_mesh_areas = np.bincount(face_islands, weights=face_mesh_areas,
+                                     minlength=num_islands)
+        obj_uv_area = float(face_uv_areas.sum())
+        obj_mesh_area = float(face_mesh_areas.sum())
+
+        entries = [
+            ("object", np.array([obj_uv_area]), np.array([obj_mesh_area])),
+            ("island", isl_uv_areas, isl_mesh_areas),
+            ("face", face_uv_areas, face_mesh_areas),
+        ]
+        densities = {}
+        for level, uv_areas, mesh_areas in entries:
+            densities[level] = __calc_densities(uv_areas, mesh_areas)
+            levels[level]["uv_areas"].append(uv_areas)
+            levels[level]["mesh_areas"].append(mesh_areas)
+            levels[level]["densities"].append(densities[level])
+
+        obj_report = {
+            "name": obj.name,
+            "uv_area": obj_uv_area,
+            "mesh_area": obj_mesh_area,
+            "density": float(densities["object"][0]),
+            "num_faces": len(face_mesh_areas),
+            "num_islands": num_islands,
+        }
+        if include_islands:
+            obj_report["islands"] = {
+                "uv_area": isl_uv_areas.tolist(),
+                "mesh_area": isl_mesh_areas.tolist(),
+                "density": densities["island"].tolist(),
+                "num_faces": np.bincount(
+                    face_islands, minlength=num_islands).tolist(),
+            }
+        if include_faces:
+            obj_report["faces"] = {
+                "uv_area": face_uv_areas.tolist(),
+                "mesh_area": face_mesh_areas.tolist(),
+                "density": densities["face"].tolist(),
+                "island": face_islands.tolist(),
+            }
+        report["objects"].append(obj_report)
+
+    for level, values in levels.items():
+        if values["densities"]:
+            report["statistics"][level] = __calc_density_statistics(
+                np.concatenate(values["densities"]),
+                np.concatenate(values["mesh_areas"]), percentiles)
+        else:
+            report["statistics"][level] = __calc_density_statistics(
+                [], [], percentiles)
+
+    return report
+
+
+def export_texel_density_report(report, filepath, file_format='JSON'):
+    """
+    Export the report made by measure_texel_density to the file.
+    file_format is 'JSON' or 'CSV'. CSV has the row for each object,
+    island and face (if included in report), and the row for each
+    statistics value.
+    """
+
+    if file_format == 'JSON':
+        with open(filepath, "w") as f:
+            json.dump(report, f, indent=2)
+    elif file_format == 'CSV':
+        with open(filepath, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["level", "object", "index", "uv_area",
+                             "mesh_area", "density"])
+            for obj in report["objects"]:
+                writer.writerow(["OBJECT", obj["name"], "", obj["uv_area"],
+                                 obj["mesh_area"], obj["density"]])
+                for key, level in (("islands", "ISLAND"), ("faces", "FACE")):
+                    if key not in obj:
+                        continue
+                    values = obj[key]
+                    for i, row in enumerate(zip(values["uv_area"],
+                                                values["mesh_area"],
+                                                values["density"])):
+                        writer.writerow([level, obj["name"], i] + list(row))
+            for level, stats in report["statistics"].items():
+                items = [("count", stats["count"]), ("min", stats["min"]),
+                         ("max", stats["max"]), ("mean", stats["mean"])]
+                items.extend(("p{}".format(p), v)
+                             for p, v in stats["percentiles"].items())
+                for name, value in items:
+                    writer.writerow(["STATISTICS", level, name, "", "",
+                                     "" if value is None else value])
+    else:
+        raise ValueError("Invalid file format: {}".format(file_format))
+
+
 def diff_point_to_segment(a, b, p):
     ab = b - a
     normal_ab = ab.normalized()
@@ -640,81 +1765,75 @@ def diff_point_to_segment(a, b, p):
 # get selected loop pair whose loops are connected each other
 def __get_loop_pairs(l, uv_layer):
     pairs = []
-    parsed = []
-    loops_ready = [l]
+    pair_keys = set()       # loops in pair, to find same pair quickly
+    parsed = {l}            # parsed loops and loops ready to be parsed
+    loops_ready = deque([l])
     while loops_ready:
-        l = loops_ready.pop(0)
-        parsed.append(l)
+        l = loops_ready.popleft()
         for ll in l.vert.link_loops:
-            # forward direction
-            lln = ll.link_loop_next
-            # if there is same pair, skip it
-            found = False
-            for p in pairs:
-                if (ll in p) and (lln in p):
-                    found = True
-                    break
-            # two loops must be selected
-            if ll[uv_layer].select and lln[uv_layer].select:
-                if not found:
+            # forward direction and backward direction
+            for lln in (ll.link_loop_next, ll.link_loop_prev):
+                # two loops must be selected
+                if not ll[uv_layer].select or not lln[uv_layer].select:
+                    continue
+                # if there is same pair, skip it
+                key = frozenset((ll, lln))
+                if key not in pair_keys:
+                    pair_keys.add(key)
                     pairs.append([ll, lln])
-                if (lln not in parsed) and (lln not in loops_ready):
+                if lln not in parsed:
+                    parsed.add(lln)
                     loops_ready.append(lln)
 
-            # backward direction
-            llp = ll.link_loop_prev
-            # if there is same pair, skip it
-            found = False
-            for p in pairs:
-                if (ll in p) and (llp in p):
-                    found = True
-                    break
-            # two loops must be selected
-            if ll[uv_layer].select and llp[uv_layer].select:
-                if not found:
-                    pairs.append([ll, llp])
-                if (llp not in parsed) and (llp not in loops_ready):
-                    loops_ready.append(llp)
-
     return pairs
 
 
 # sort pair by vertex
 # (v0, v1) - (v1, v2) - (v2, v3) ....
 def __sort_loop_pairs(uv_layer, pairs, closed):
-    rest = pairs
-    sorted_pairs = [rest[0]]
-    rest.remove(rest[0])
+    # pairs which include the vertex, in order of pairs
+    vert_to_pairs = {}
+    for i, p in enumerate(pairs):
+        for l in p:
+            vert_to_pairs.setdefault(l.vert, deque()).append(i)
+    used = [False] * len(pairs)
+
+    def pop_connected_pair(vert):
+        # find first unused pair which includes vert
+        indices = vert_to_pairs[vert]
+        while indices and used[indices[0]]:
+            indices.popleft()
+        if not indices:
+            return None
+        idx = indices.popleft()
+        used[idx] = True
+        return pairs[idx]
+
+    sorted_pairs = deque([pairs[0]])
+    used[0] = True
 
     # prepend
     while True:
         p1 = sorted_pairs[0]
-        for p2 in rest:
-            if p1[0].vert == p2[0].vert:
-                sorted_pairs.insert(0, [p2[1], p2[0]])
-                rest.remove(p2)
-                break
-            elif p1[0].vert == p2[1].vert:
-                sorted_pairs.insert(0, [p2[0], p2[1]])
-                rest.remove(p2)
-                break
-        else:
+        p2 = pop_connected_pair(p1[0].vert)
+        if p2 is None:
             break
+        if p1[0].vert == p2[0].vert:
+            sorted_pairs.appendleft([p2[1], p2[0]])
+        else:
+            sorted_pairs.appendleft([p2[0], p2[1]])
 
     # append
     while True:
         p1 = sorted_pairs[-1]
-        for p2 in rest:
-            if p1[1].vert == p2[0].vert:
-                sorted_pairs.append([p2[0], p2[1]])
-                rest.remove(p2)
-                break
-            elif p1[1].vert == p2[1].vert:
-                sorted_pairs.append([p2[1], p2[0]])
-                rest.remove(p2)
-                break
-        else:
+        p2 = pop_connected_pair(p1[1].vert)
+        if p2 is None:
             break
+        if p1[1].vert == p2[0].vert:
+            sorted_pairs.append([p2[0], p2[1]])
+        else:
+            sorted_pairs.append([p2[1], p2[0]])
+    sorted_pairs = list(sorted_pairs)
 
     begin_vert = sorted_pairs[0][0].vert
     end_vert = sorted_pairs[-1][-1].vert
@@ -745,26 +1864,15 @@ def __sort_loop_pairs(uv_layer, pairs, closed):
     return sorted_pairs, ""
 
 
-# get index of the island group which includes loop
-def __get_island_group_include_loop(loop, island_info):
-    for i, isl in enumerate(island_info):
-        for f in isl['faces']:
-            for l in f['face'].loops:
-                if l == loop:
-                    return i    # found
-
-    return -1   # not found
-
-
 # get index of the island group which includes pair.
 # if island group is not same between loops, it will be invalid
-def __get_island_group_include_pair(pair, island_info):
-    l1_grp = __get_island_group_include_loop(pair[0], island_info)
+def __get_island_group_include_pair(pair, island_table):
+    l1_grp = island_table[pair[0].face.index]
     if l1_grp == -1:
         return -1   # not found
 
     for p in pair[1:]:
-        l2_grp = __get_island_group_include_loop(p, island_info)
+        l2_grp = island_table[p.face.index]
         if (l2_grp == -1) or (l1_grp != l2_grp):
             return -1   # not found or invalid
 
@@ -821,12 +1929,13 @@ def __get_next_poly_loop_pair(pair):
 
 
 # get loop sequence in the same island
-def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
+def __get_loop_sequence_internal(uv_layer, pairs, island_table, closed):
     loop_sequences = []
     for pair in pairs:
         seqs = [pair]
+        parsed_pairs = {frozenset(pair)}
         p = pair
-        isl_grp = __get_island_group_include_pair(pair, island_info)
+        isl_grp = __get_island_group_include_pair(pair, island_table)
         if isl_grp == -1:
             return None, "Can not find the island or invalid island"
 
@@ -834,7 +1943,7 @@ def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
             nlp = __get_next_loop_pair(p)
             if not nlp:
                 break       # no more loop pair
-            nlp_isl_grp = __get_island_group_include_pair(nlp, island_info)
+            nlp_isl_grp = __get_island_group_include_pair(nlp, island_table)
             if nlp_isl_grp != isl_grp:
                 break       # another island
             for nlpl in nlp:
@@ -843,6 +1952,7 @@ def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
                                  "the end edge"
 
             seqs.append(nlp)
+            parsed_pairs.add(frozenset(nlp))
 
             # when face is triangle, it indicates CLOSED
             if (len(nlp) == 1) and closed:
@@ -851,20 +1961,14 @@ def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
             nplp = __get_next_poly_loop_pair(nlp)
             if not nplp:
                 break       # no more loop pair
-            nplp_isl_grp = __get_island_group_include_pair(nplp, island_info)
+            nplp_isl_grp = __get_island_group_include_pair(nplp, island_table)
             if nplp_isl_grp != isl_grp:
                 break       # another island
 
             # check if the UVs are already parsed.
             # this check is needed for the mesh which has the circular
             # sequence of the vertices
-            matched = False
-            for p1 in seqs:
-                p2 = nplp
-                if ((p1[0] == p2[0]) and (p1[1] == p2[1])) or \
-                   ((p1[0] == p2[1]) and (p1[1] == p2[0])):
-                    matched = True
-            if matched:
+            if frozenset(nplp) in parsed_pairs:
                 debug_print("This is a circular sequence")
                 break
 
@@ -874,6 +1978,7 @@ def __get_loop_sequence_internal(uv_layer, pairs, island_info, closed):
                                  "the end edge"
 
             seqs.append(nplp)
+            parsed_pairs.add(frozenset(nplp))
 
             p = nplp
 
@@ -896,46 +2001,19 @@ def get_loop_sequences(bm, uv_layer, closed=False):
 
     first_loop = cand_loops[0]
     isl_info = get_island_info_from_bmesh(bm, False)
+    isl_table = get_island_lookup_table(bm, isl_info).tolist()
     loop_pairs = __get_loop_pairs(first_loop, uv_layer)
     loop_pairs, err = __sort_loop_pairs(uv_layer, loop_pairs, closed)
     if not loop_pairs:
         return None, err
     loop_seqs, err = __get_loop_sequence_internal(uv_layer, loop_pairs,
-                                                  isl_info, closed)
+                                                  isl_table, closed)
     if not loop_seqs:
         return None, err
 
     return loop_seqs, ""
 
 
-def __is_segment_intersect(start1, end1, start2, end2):
-    seg1 = end1 - start1
-    seg2 = end2 - start2
-
-    a1 = -seg1.y
-    b1 = seg1.x
-    d1 = -(a1 * start1.x + b1 * start1.y)
-
-    a2 = -seg2.y
-    b2 = seg2.x
-    d2 = -(a2 * start2.x + b2 * start2.y)
-
-    seg1_line2_start = a2 * start1.x + b2 * start1.y + d2
-    seg1_line2_end = a2 * end1.x + b2 * end1.y + d2
-
-    seg2_line1_start = a1 * start2.x + b1 * start2.y + d1
-    seg2_line1_end = a1 * end2.x + b1 * end2.y + d1
-
-    if (seg1_line2_start * seg1_line2_end >= 0) or \
-            (seg2_line1_start * seg2_line1_end >= 0):
-        return False, None
-
-    u = seg1_line2_start / (seg1_line2_start - seg1_line2_end)
-    out = start1 + u * seg1
-
-    return True, out
-
-
 class RingBuffer:
     def __init__(self, arr):
         self.__buffer = arr.copy()
@@ -992,207 +2070,6 @@ class RingBuffer:
         self.reset()
 
 
-# clip: reference polygon
-# subject: tested polygon
-def __do_weiler_atherton_cliping(clip_uvs, subject_uvs, mode,
-                                 same_polygon_threshold):
-
-    clip_uvs = RingBuffer(clip_uvs)
-    if __is_polygon_flipped(clip_uvs):
-        clip_uvs.reverse()
-    subject_uvs = RingBuffer(subject_uvs)
-    if __is_polygon_flipped(subject_uvs):
-        subject_uvs.reverse()
-
-    debug_print("===== Clip UV List =====")
-    debug_print(clip_uvs)
-    debug_print("===== Subject UV List =====")
-    debug_print(subject_uvs)
-
-    # check if clip and subject is overlapped completely
-    if __is_polygon_same(clip_uvs, subject_uvs, same_polygon_threshold):
-        polygons = [subject_uvs.as_list()]
-        debug_print("===== Polygons Overlapped Completely =====")
-        debug_print(polygons)
-        return True, polygons
-
-    # check if subject is in clip
-    if __is_points_in_polygon(subject_uvs, clip_uvs):
-        polygons = [subject_uvs.as_list()]
-        return True, polygons
-
-    # check if clip is in subject
-    if __is_points_in_polygon(clip_uvs, subject_uvs):
-        polygons = [subject_uvs.as_list()]
-        return True, polygons
-
-    # check if clip and subject is overlapped partially
-    intersections = []
-    while True:
-        subject_uvs.reset()
-        while True:
-            uv_start1 = clip_uvs.get()
-            uv_end1 = clip_uvs.get(1)
-            uv_start2 = subject_uvs.get()
-            uv_end2 = subject_uvs.get(1)
-            intersected, point = __is_segment_intersect(uv_start1, uv_end1,
-                                                        uv_start2, uv_end2)
-            if intersected:
-                clip_uvs.insert(point, 1)
-                subject_uvs.insert(point, 1)
-                intersections.append([point,
-                                      [clip_uvs.get(), clip_uvs.get(1)]])
-            subject_uvs.next()
-            if subject_uvs.get() == subject_uvs.head():
-                break
-        clip_uvs.next()
-        if clip_uvs.get() == clip_uvs.head():
-            break
-
-    debug_print("===== Intersection List =====")
-    debug_print(intersections)
-
-    # no intersection, so subject and clip is not overlapped
-    if not intersections:
-        return False, None
-
-    def get_intersection_pair(intersects, key):
-        for sect in intersects:
-            if sect[0] == key:
-                return sect[1]
-
-        return None
-
-    # make enter/exit pair
-    subject_uvs.reset()
-    subject_entering = []
-    subject_exiting = []
-    clip_entering = []
-    clip_exiting = []
-    intersect_uv_list = []
-    while True:
-        pair = get_intersection_pair(intersections, subject_uvs.get())
-        if pair:
-            sub = subject_uvs.get(1) - subject_uvs.get(-1)
-            inter = pair[1] - pair[0]
-            cross = sub.x * inter.y - inter.x * sub.y
-            if cross < 0:
-                subject_entering.append(subject_uvs.get())
-                clip_exiting.append(subject_uvs.get())
-            else:
-                subject_exiting.append(subject_uvs.get())
-                clip_entering.append(subject_uvs.get())
-            intersect_uv_list.append(subject_uvs.get())
-
-        subject_uvs.next()
-        if subject_uvs.get() == subject_uvs.head():
-            break
-
-    debug_print("===== Enter List =====")
-    debug_print(clip_entering)
-    debug_print(subject_entering)
-    debug_print("===== Exit List =====")
-    debug_print(clip_exiting)
-    debug_print(subject_exiting)
-
-    # for now, can't handle the situation when fulfill all below conditions
-    #        * two faces have common edge
-    #        * each face is intersected
-    #        * Show Mode is "Part"
-    #       so for now, ignore this situation
-    if len(subject_entering) != len(subject_exiting):
-        if mode == 'FACE':
-            polygons = [subject_uvs.as_list()]
-            return True, polygons
-        return False, None
-
-    def traverse(current_list, entering, exiting, p, current, other_list):
-        result = current_list.find(current)
-        if not result:
-            return None
-        if result != current:
-            print("Internal Error")
-            return None
-        if not exiting:
-            print("Internal Error: No exiting UV")
-            return None
-
-        # enter
-        if entering.count(current) >= 1:
-            entering.remove(current)
-
-        current_list.find_and_next(current)
-        current = current_list.get()
-
-        prev = None
-        error = False
-        while exiting.count(current) == 0:
-            p.append(current.copy())
-            current_list.find_and_next(current)
-            current = current_list.get()
-            if prev == current:
-                error = True
-                break
-            prev = current
-
-        if error:
-            print("Internal Error: Infinite loop")
-            return None
-
-        # exit
-        p.append(current.copy())
-        exiting.remove(current)
-
-        other_list.find_and_set(current)
-        return other_list.get()
-
-    # Traverse
-    polygons = []
-    current_uv_list = subject_uvs
-    other_uv_list = clip_uvs
-    current_entering = subject_entering
-    current_exiting = subject_exiting
-
-    poly = []
-    current_uv = current_entering[0]
-
-    while True:
-        current_uv = traverse(current_uv_list, current_entering,
-                              current_exiting, poly, current_uv, other_uv_list)
-
-        if current_uv is None:
-            break
-
-        if current_uv_list == subject_uvs:
-            current_uv_list = clip_uvs
-            other_uv_list = subject_uvs
-            current_entering = clip_entering
-            current_exiting = clip_exiting
-            debug_print("-- Next: Clip --")
-        else:
-            current_uv_list = subject_uvs
-            other_uv_list = clip_uvs
-            current_entering = subject_entering
-            current_exiting = subject_exiting
-            debug_print("-- Next: Subject --")
-
-        debug_print(clip_entering)
-        debug_print(clip_exiting)
-        debug_print(subject_entering)
-        debug_print(subject_exiting)
-
-        if not clip_entering and not clip_exiting \
-                and not subject_entering and not subject_exiting:
-            break
-
-    polygons.append(poly)
-
-    debug_print("===== Polygons Overlapped Partially =====")
-    debug_print(polygons)
-
-    return True, polygons
-
-
 def __is_polygon_flipped(points):
     area = 0.0
     for i in range(len(points)):
@@ -1206,40 +2083,6 @@ def __is_polygon_flipped(points):
     return False
 
 
-def __is_point_in_polygon(point, subject_points):
-    """Return true when point is inside of the polygon by using
-    'Crossing number algorithm'.
-    """
-
-    count = 0
-    for i in range(len(subject_points)):
-        uv_start1 = subject_points.get(i)
-        uv_end1 = subject_points.get(i + 1)
-        uv_start2 = point
-        uv_end2 = Vector((1000000.0, point.y))
-
-        # If the point exactly matches to the point of the polygon,
-        # this point is not in polygon.
-        if uv_start1.x == uv_start2.x and uv_start1.y == uv_start2.y:
-            return False
-
-        intersected, _ = __is_segment_intersect(uv_start1, uv_end1,
-                                                uv_start2, uv_end2)
-        if intersected:
-            count = count + 1
-
-    return count % 2
-
-
-def __is_points_in_polygon(points, subject_points):
-    for i in range(len(points)):
-        internal = __is_point_in_polygon(points.get(i), subject_points)
-        if not internal:
-            return False
-
-    return True
-
-
 def get_uv_editable_objects(context):
     if compat.check_version(2, 80, 0) < 0:
         objs = []
@@ -1255,93 +2098,254 @@ def get_uv_editable_objects(context):
     return objs
 
 
-def get_overlapped_uv_info(bm_list, faces_list, uv_layer_list,
-                           mode, same_polygon_threshold=0.0000001):
+def __create_triangle_arrays(bm, faces, uv_layer):
+    """
+    Create the arrays of UV triangles of faces.
+    Triangles of the i-th face are
+    tri_uvs[tri_offsets[i]:tri_offsets[i + 1]].
+    """
+
+    if compat.check_version(2, 80, 0) >= 0:
+        triangle_loops = bm.calc_loop_triangles()
+    else:
+        triangle_loops = bm.calc_tessface()
+
+    face_to_pos = {f: i for i, f in enumerate(faces)}
+    tri_faces = []
+    tri_uvs = []
+    for loops in triangle_loops:
+        pos = face_to_pos.get(loops[0].face)
+        if pos is None:
+            continue
+        tri_faces.append(pos)
+        for l in loops:
+            tri_uvs.extend(l[uv_layer].uv)
+
+    tri_uvs = np.array(tri_uvs, dtype=np.float64).reshape(-1, 3, 2)
+    order, tri_offsets = make_csr(np.array(tri_faces, dtype=np.int64),
+                                  len(faces))
+
+    return tri_uvs[order], tri_offsets
+
+
+def __find_overlap_candidates_by_island(bm_list, faces_list, uv_layer_list,
+                                        face_offsets, only_selected):
+    """
+    Find the candidates of the overlapped faces by the bounding boxes of
+    UV islands and faces.
+    Faces are identified by the index in the concatenated faces_list.
+    """
+
     # at first, check island overlapped
     isl = []
-    for bm, uv_layer, faces in zip(bm_list, uv_layer_list, faces_list):
-        info = get_island_info_from_faces(bm, faces, uv_layer)
-        isl.extend([(i, uv_layer, bm) for i in info])
-
-    overlapped_isl_pairs = []
-    overlapped_uv_layer_pairs = []
-    overlapped_bm_paris = []
-    for i, (i1, uv_layer_1, bm_1) in enumerate(isl):
-        for i2, uv_layer_2, bm_2 in isl[i + 1:]:
-            if (i1["max"].x < i2["min"].x) or (i2["max"].x < i1["min"].x) or \
-               (i1["max"].y < i2["min"].y) or (i2["max"].y < i1["min"].y):
-                continue
-            overlapped_isl_pairs.append([i1, i2])
-            overlapped_uv_layer_pairs.append([uv_layer_1, uv_layer_2])
-            overlapped_bm_paris.append([bm_1, bm_2])
+    isl_min_uvs = [np.empty((0, 2))]
+    isl_max_uvs = [np.empty((0, 2))]
+    isl_data = []
+    for obj_idx, (bm, uv_layer, faces) in enumerate(
+            zip(bm_list, uv_layer_list, faces_list)):
+        data = __get_island_data(bm, faces, uv_layer, only_selected) \
+            .get_arrays()
+        num_islands = len(data["island_num_uv"])
+        isl.extend([(obj_idx, i) for i in range(num_islands)])
+        isl_min_uvs.append(data["island_min_uv"])
+        isl_max_uvs.append(data["island_max_uv"])
+        isl_data.append(data)
+
+    candidates = [(np.empty(0, dtype=np.int64),) * 2]
+
+    # fast operation, find the candidates by sort and sweep
+    # (inter UV islands)
+    indices_1, indices_2 = find_overlapped_boxes(
+        np.concatenate(isl_min_uvs), np.concatenate(isl_max_uvs))
+    for idx_1, idx_2 in zip(indices_1.tolist(), indices_2.tolist()):
+        obj_1, isl_1 = isl[idx_1]
+        obj_2, isl_2 = isl[idx_2]
+        data_1 = isl_data[obj_1]
+        data_2 = isl_data[obj_2]
+        offsets_1 = data_1["island_face_offsets"]
+        offsets_2 = data_2["island_face_offsets"]
+        faces_1 = data_1["island_faces"][offsets_1[isl_1]:offsets_1[isl_1 + 1]]
+        faces_2 = data_2["island_faces"][offsets_2[isl_2]:offsets_2[isl_2 + 1]]
+
+        # fast operation, apply bounding box algorithm
+        pairs_1, pairs_2 = find_overlapped_boxes_by_grid(
+            np.concatenate((data_1["face_min_uv"][faces_1],
+                            data_2["face_min_uv"][faces_2])),
+            np.concatenate((data_1["face_max_uv"][faces_1],
+                            data_2["face_max_uv"][faces_2])))
+        inter = (pairs_1 < len(faces_1)) & (pairs_2 >= len(faces_1))
+        pairs_1 = faces_1[pairs_1[inter]]
+        pairs_2 = faces_2[pairs_2[inter] - len(faces_1)]
+        candidates.append((pairs_1 + face_offsets[obj_1],
+                           pairs_2 + face_offsets[obj_2]))
+
+    # fast operation, find the candidates by uniform grid
+    # (intra UV island)
+    for obj_idx, data in enumerate(isl_data):
+        face_islands = data["face_islands"]
+        pairs_1, pairs_2 = find_overlapped_boxes_by_grid(
+            data["face_min_uv"], data["face_max_uv"])
+        same_island = face_islands[pairs_1] == face_islands[pairs_2]
+        pairs_1 = pairs_1[same_island]
+        pairs_2 = pairs_2[same_island]
+        order = np.lexsort((pairs_2, pairs_1, face_islands[pairs_1]))
+        candidates.append((pairs_1[order] + face_offsets[obj_idx],
+                           pairs_2[order] + face_offsets[obj_idx]))
+
+    polygons_1, polygons_2 = [np.concatenate(c) for c in zip(*candidates)]
+
+    return polygons_1, polygons_2
+
+
+def __find_overlap_candidates_by_edge(faces_list, uv_layer_list):
+    """
+    Find the candidates of the overlapped faces by the intersections of
+    all UV edges. The cost does not depend on the number of UV islands.
+    Faces are identified by the index in the concatenated faces_list.
+    """
 
-    # check polygon overlapped (inter UV islands)
-    overlapped_uvs = []
-    for oip, uvlp, bmp in zip(overlapped_isl_pairs,
-                              overlapped_uv_layer_pairs,
-                              overlapped_bm_paris):
-        for clip in oip[0]["faces"]:
-            f_clip = clip["face"]
-            clip_uvs = [l[uvlp[0]].uv.copy() for l in f_clip.loops]
-            for subject in oip[1]["faces"]:
-                f_subject = subject["face"]
-
-                # fast operation, apply bounding box algorithm
-                if (clip["max_uv"].x < subject["min_uv"].x) or \
-                   (subject["max_uv"].x < clip["min_uv"].x) or \
-                   (clip["max_uv"].y < subject["min_uv"].y) or \
-                   (subject["max_uv"].y < clip["min_uv"].y):
-                    continue
+    loop_faces = [np.empty(0, dtype=np.int64)]
+    loop_uvs = [np.empty((0, 2))]
+    num_faces = 0
+    for faces, uv_layer in zip(faces_list, uv_layer_list):
+        _, lf, _, luvs = __create_loop_arrays(faces, uv_layer)
+        loop_faces.append(lf.astype(np.int64) + num_faces)
+        loop_uvs.append(luvs.astype(np.float64))
+        num_faces += len(faces)
+    loop_faces = np.concatenate(loop_faces)
+    edge_starts = np.concatenate(loop_uvs)
+
+    # Loops of each face are stored contiguously, so the edge from the
+    # last loop goes back to the first loop of the face.
+    _, edge_offsets = make_csr(loop_faces, num_faces)
+    first_loops = edge_offsets[:-1]
+    last_loops = edge_offsets[1:] - 1
+    has_edges = np.flatnonzero(last_loops >= first_loops)
+    next_loops = np.arange(1, len(loop_faces) + 1)
+    next_loops[last_loops[has_edges]] = first_loops[has_edges]
+    edge_ends = edge_starts[next_loops]
+
+    # Faces are overlapped when their edges intersect ...
+    edges_1, edges_2 = find_intersected_segments(edge_starts, edge_ends)
+    polygons_1 = loop_faces[edges_1]
+    polygons_2 = loop_faces[edges_2]
+    other_face = polygons_1 != polygons_2
+    polygons_1 = polygons_1[other_face]
+    polygons_2 = polygons_2[other_face]
+
+    # ... or the face is inside the other face.
+    # Test the center of the face whose center is in the bounding box of
+    # the other face. The first point of the face is not used because it
+    # may be on the edge of the other face (ex. same faces).
+    face_min_uvs = np.minimum.reduceat(edge_starts, first_loops[has_edges])
+    face_max_uvs = np.maximum.reduceat(edge_starts, first_loops[has_edges])
+    points = np.add.reduceat(edge_starts, first_loops[has_edges]) / \
+        np.diff(edge_offsets)[has_edges, np.newaxis]
+    indices_1, indices_2 = find_overlapped_boxes_by_grid(
+        np.concatenate((face_min_uvs, points)),
+        np.concatenate((face_max_uvs, points)))
+    box_and_point = indices_1 < len(has_edges)
+    box_and_point &= indices_2 >= len(has_edges)
+    outers = has_edges[indices_1[box_and_point]]
+    inner_points = indices_2[box_and_point] - len(has_edges)
+    inners = has_edges[inner_points]
+    other_face = outers != inners
+    outers = outers[other_face]
+    inners = inners[other_face]
+    included = is_point_in_polygons(points[inner_points[other_face]],
+                                    edge_starts, edge_ends, edge_offsets,
+                                    outers)
+
+    polygons_1 = np.concatenate((polygons_1, outers[included]))
+    polygons_2 = np.concatenate((polygons_2, inners[included]))
+    polygons_1, polygons_2 = \
+        np.minimum(polygons_1, polygons_2), np.maximum(polygons_1, polygons_2)
+
+    # Remove the duplicated pairs.
+    order = np.lexsort((polygons_2, polygons_1))
+    polygons_1 = polygons_1[order]
+    polygons_2 = polygons_2[order]
+    unique = np.ones(len(order), dtype=bool)
+    unique[1:] = polygons_1[1:] != polygons_1[:-1]
+    unique[1:] |= polygons_2[1:] != polygons_2[:-1]
+
+    return polygons_1[unique], polygons_2[unique]
 
-                subject_uvs = [l[uvlp[1]].uv.copy() for l in f_subject.loops]
-                # slow operation, apply Weiler-Atherton cliping algorithm
-                result, polygons = \
-                    __do_weiler_atherton_cliping(clip_uvs, subject_uvs,
-                                                 mode, same_polygon_threshold)
-                if result:
-                    overlapped_uvs.append({"clip_bmesh": bmp[0],
-                                           "subject_bmesh": bmp[1],
-                                           "clip_face": f_clip,
-                                           "subject_face": f_subject,
-                                           "clip_uv_layer": uvlp[0],
-                                           "subject_uv_layer": uvlp[1],
-                                           "subject_uvs": subject_uvs,
-                                           "polygons": polygons})
-
-    # check polygon overlapped (intra UV island)
-    for info, uv_layer, bm in isl:
-        for i in range(len(info["faces"])):
-            clip = info["faces"][i]
-            f_clip = clip["face"]
-            clip_uvs = [l[uv_layer].uv.copy() for l in f_clip.loops]
-            for j in range(len(info["faces"])):
-                if j <= i:
-                    continue
 
-                subject = info["faces"][j]
-                f_subject = subject["face"]
+def get_overlapped_uv_info(bm_list, faces_list, uv_layer_list,
+                           mode, same_polygon_threshold=0.0000001,
+                           detection_method='ISLAND', only_selected=True):
+    # Triangles of all faces are concatenated. Faces are identified by
+    # the index in the concatenated faces_list.
+    tri_uvs = [np.empty((0, 3, 2))]
+    tri_offsets = [np.zeros(1, dtype=np.int64)]
+    face_offsets = [0]
+    for bm, uv_layer, faces in zip(bm_list, uv_layer_list, faces_list):
+        uvs, offsets = __create_triangle_arrays(bm, faces, uv_layer)
+        tri_uvs.append(uvs)
+        tri_offsets.append(offsets[1:] + tri_offsets[-1][-1])
+        face_offsets.append(face_offsets[-1] + len(faces))
+    face_offsets = np.array(face_offsets, dtype=np.int64)
+    tri_uvs = np.concatenate(tri_uvs)
+    tri_offsets = np.concatenate(tri_offsets)
+
+    # Find the candidates of the overlapped faces.
+    if detection_method == 'ISLAND':
+        polygons_1, polygons_2 = __find_overlap_candidates_by_island(
+            bm_list, faces_list, uv_layer_list, face_offsets, only_selected)
+    elif detection_method == 'EDGE':
+        polygons_1, polygons_2 = __find_overlap_candidates_by_edge(
+            faces_list, uv_layer_list)
+    else:
+        raise ValueError("Invalid detection method: {}"
+                         .format(detection_method))
+    objs_1 = np.searchsorted(face_offsets, polygons_1, side='right') - 1
+    objs_2 = np.searchsorted(face_offsets, polygons_2, side='right') - 1
+    faces_1 = polygons_1 - face_offsets[objs_1]
+    faces_2 = polygons_2 - face_offsets[objs_2]
+
+    # fast operation, test the overlap of triangulated faces all at once
+    if mode == 'FACE':
+        overlapped = is_polygon_overlapped(
+            tri_uvs, tri_offsets, polygons_1, polygons_2,
+            same_polygon_threshold)
+    else:
+        # Intersection polygons are calculated as the convex pieces by
+        # clipping triangles with Sutherland-Hodgman algorithm.
+        piece_pairs, piece_uvs, piece_counts = clip_polygons(
+            tri_uvs, tri_offsets, polygons_1, polygons_2,
+            same_polygon_threshold)
+        piece_offsets = np.searchsorted(piece_pairs,
+                                        np.arange(len(polygons_1) + 1))
+        overlapped = np.diff(piece_offsets) > 0
 
-                # fast operation, apply bounding box algorithm
-                if (clip["max_uv"].x < subject["min_uv"].x) or \
-                   (subject["max_uv"].x < clip["min_uv"].x) or \
-                   (clip["max_uv"].y < subject["min_uv"].y) or \
-                   (subject["max_uv"].y < clip["min_uv"].y):
-                    continue
+    overlapped_uvs = []
+    for pair in np.flatnonzero(overlapped).tolist():
+        obj_1 = int(objs_1[pair])
+        obj_2 = int(objs_2[pair])
+        uv_layer_1 = uv_layer_list[obj_1]
+        uv_layer_2 = uv_layer_list[obj_2]
+        f_clip = faces_list[obj_1][int(faces_1[pair])]
+        f_subject = faces_list[obj_2][int(faces_2[pair])]
+        subject_uvs = [l[uv_layer_2].uv.copy() for l in f_subject.loops]
 
-                subject_uvs = [l[uv_layer].uv.copy() for l in f_subject.loops]
-                # slow operation, apply Weiler-Atherton cliping algorithm
-                result, polygons = \
-                    __do_weiler_atherton_cliping(clip_uvs, subject_uvs,
-                                                 mode, same_polygon_threshold)
-                if result:
-                    overlapped_uvs.append({"clip_bmesh": bm,
-                                           "subject_bmesh": bm,
-                                           "clip_face": f_clip,
-                                           "subject_face": f_subject,
-                                           "clip_uv_layer": uv_layer,
-                                           "subject_uv_layer": uv_layer,
-                                           "subject_uvs": subject_uvs,
-                                           "polygons": polygons})
+        if mode == 'FACE':
+            # Intersection polygons are not needed.
+            polygons = [subject_uvs.copy()]
+        else:
+            polygons = []
+            for i in range(piece_offsets[pair], piece_offsets[pair + 1]):
+                polygons.append([Vector(uv) for uv in
+                                 piece_uvs[i, :piece_counts[i]].tolist()])
+
+        overlapped_uvs.append({"clip_bmesh": bm_list[obj_1],
+                               "subject_bmesh": bm_list[obj_2],
+                               "clip_face": f_clip,
+                               "subject_face": f_subject,
+                               "clip_uv_layer": uv_layer_1,
+                               "subject_uv_layer": uv_layer_2,
+                               "subject_uvs": subject_uvs,
+                               "polygons": polygons})
 
     return overlapped_uvs
 
@@ -1381,62 +2385,144 @@ def __is_polygon_same(points1, points2, threshold):
     return True
 
 
-def _is_uv_loop_connected(l1, l2, uv_layer):
-    uv1 = l1[uv_layer].uv
-    uv2 = l2[uv_layer].uv
-    return uv1.x == uv2.x and uv1.y == uv2.y
-
-
 def create_uv_graph(loops, uv_layer):
-    # For looking up faster.
-    loop_index_to_loop = {}     # { loop index: loop }
-    for l in loops:
-        loop_index_to_loop[l.index] = l
+    """
+    Create the graph whose node is the UV vertex (the loops which share
+    the same UV coordinate) and whose edge is the UV edge.
+    Key of the node is the index of the first loop of the UV vertex.
+    """
+
+    loops = list(loops)
+    loop_to_index = {l: i for i, l in enumerate(loops)}
+    next_loops = [loop_to_index[l.link_loop_next] for l in loops]
+    prev_loops = [loop_to_index[l.link_loop_prev] for l in loops]
 
     # Setup relationship between uv_vert and loops.
     # uv_vert is a representative of the loops which shares same
     # UV coordinate.
-    uv_vert_to_loops = {}   # { uv_vert: loops belonged to uv_vert }
-    loop_to_uv_vert = {}    # { loop: uv_vert belonged to }
-    for l in loops:
-        found = False
-        for k in uv_vert_to_loops.keys():
-            if _is_uv_loop_connected(k, l, uv_layer):
-                uv_vert_to_loops[k].append(l)
-                loop_to_uv_vert[l] = k
-                found = True
-                break
-        if not found:
-            uv_vert_to_loops[l] = [l]
-            loop_to_uv_vert[l] = l
+    uv_verts, representatives = weld_points(get_loop_uvs(loops, uv_layer))
+    num_uv_verts = len(representatives)
+    vert_loops, vert_loop_offsets = make_csr(uv_verts, num_uv_verts)
 
     # Collect adjacent uv_vert.
-    uv_adj_verts = {}       # { uv_vert: adj uv_vert list }
-    for v, vs in uv_vert_to_loops.items():
-        uv_adj_verts[v] = []
-        for ll in vs:
-            ln = ll.link_loop_next
-            lp = ll.link_loop_prev
-            uv_adj_verts[v].append(loop_to_uv_vert[ln])
-            uv_adj_verts[v].append(loop_to_uv_vert[lp])
-        uv_adj_verts[v] = list(set(uv_adj_verts[v]))
+    loop_uv_verts = np.concatenate((uv_verts, uv_verts))
+    adj_uv_verts = uv_verts[np.concatenate((next_loops, prev_loops))]
+    neighbors, offsets = make_csr_adjacency(loop_uv_verts, adj_uv_verts,
+                                            num_uv_verts)
 
     # Setup uv_vert graph.
     graph = Graph()
-    for v in uv_adj_verts.keys():
-        graph.add_node(
-            Node(v.index, {"uv_vert": v, "loops": uv_vert_to_loops[v]})
-        )
-    edges = []
-    for v, adjs in uv_adj_verts.items():
-        n1 = graph.get_node(v.index)
-        for a in adjs:
-            n2 = graph.get_node(a.index)
-            edges.append(tuple(sorted((n1.key, n2.key))))
-    edges = list(set(edges))
-    for e in edges:
-        n1 = graph.get_node(e[0])
-        n2 = graph.get_node(e[1])
-        graph.add_edge(n1, n2)
+    nodes = []
+    vert_loops = [loops[j] for j in vert_loops.tolist()]
+    vert_loop_offsets = vert_loop_offsets.tolist()
+    for i, rep in enumerate(representatives.tolist()):
+        node = Node(loops[rep].index,
+                    {"uv_vert": loops[rep],
+                     "loops": vert_loops[vert_loop_offsets[i]:
+                                         vert_loop_offsets[i + 1]]})
+        graph.add_node(node)
+        nodes.append(node)
+
+    neighbors = neighbors.tolist()
+    offsets = offsets.tolist()
+    for i, n1 in enumerate(nodes):
+        for j in neighbors[offsets[i]:offsets[i + 1]]:
+            if j < i:
+                continue
+            n2 = nodes[j]
+            if n1.key <= n2.key:
+                graph.add_edge(n1, n2)
+            else:
+                graph.add_edge(n2, n1)
 
     return graph
+
+
+# Normalized UV edge lengths are quantized by 1/_EDGE_LENGTH_RESOLUTION
+# for the signature of the UV graph.
+_EDGE_LENGTH_RESOLUTION = 1000
+
+
+def calc_uv_graph_signature(graph, uv_layer, use_edge_length=False):
+    """
+    Calculate the signature of the UV graph (see create_uv_graph) from
+    the degree and the face sizes of UV vertices.
+    When use_edge_length is True, UV edge lengths normalized by their
+    average are also compared. Note that the islands whose UVs are not
+    exactly same may have the different signatures in this case.
+    Graphs whose signatures are different are not isomorphic.
+    """
+
+    node_labels = {
+        key: tuple(sorted(len(l.face.loops) for l in node.value["loops"]))
+        for key, node in graph.nodes.items()
+    }
+
+    edge_labels = None
+    if use_edge_length and graph.edges:
+        uvs_1 = get_loop_uvs([e.node_1.value["uv_vert"] for e in graph.edges],
+                             uv_layer)
+        uvs_2 = get_loop_uvs([e.node_2.value["uv_vert"] for e in graph.edges],
+                             uv_layer)
+        lengths = np.sqrt(np.sum((uvs_2 - uvs_1) ** 2, axis=1))
+        mean = np.mean(lengths)
+        if mean > 0.0:
+            lengths = lengths / mean
+        edge_labels = np.rint(
+            lengths * _EDGE_LENGTH_RESOLUTION).astype(np.int64).tolist()
+
+    return calc_graph_signature(graph, node_labels, edge_labels)
+
+
+def get_island_loops(island):
+    if isinstance(island, IslandInfo):
+        faces = island.get_bmfaces()
+    else:
+        faces = [f["face"] for f in island["faces"]]
+
+    return [l for f in faces for l in f.loops]
+
+
+def get_island_uv_graph(island, uv_layer):
+    """
+    Return the UV graph of the island.
+    Graph is cached in the island record until clear_island_uv_graph is
+    called, so UVs of the island must not be changed while the cache is
+    used.
+    """
+
+    graph = island.get("uv_graph")
+    if graph is None:
+        graph = create_uv_graph(get_island_loops(island), uv_layer)
+        island["uv_graph"] = graph
+
+    return graph
+
+
+def get_island_signature(island, uv_layer, use_edge_length=False):
+    """
+    Return the signature of the UV graph of the island.
+    Signature is cached in the island record as well as the UV graph.
+    Islands whose signatures are different can not be matched by
+    graph_is_isomorphic.
+    """
+
+    signatures = island.get("uv_graph_signatures")
+    if signatures is None:
+        signatures = {}
+        island["uv_graph_signatures"] = signatures
+    if use_edge_length not in signatures:
+        graph = get_island_uv_graph(island, uv_layer)
+        signatures[use_edge_length] = calc_uv_graph_signature(
+            graph, uv_layer, use_edge_length)
+
+    return signatures[use_edge_length]
+
+
+def clear_island_uv_graph(island):
+    """
+    Clear the UV graph and its signature cached in the island record
+    """
+
+    island.pop("uv_graph", None)
+    island.pop("uv_graph_signatures", None)
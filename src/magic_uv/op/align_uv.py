@@ -17,6 +17,7 @@ from bpy.props import (
 )
 import bmesh
 from mathutils import Vector
+import numpy as np
 
 from ..utils.bl_class_registry import BlClassRegistry
 from ..utils.property_class_registry import PropertyClassRegistry
@@ -1171,46 +1172,32 @@ class MUV_OT_AlignUV_SnapToPoint(bpy.types.Operator):
                     self._get_snap_target_loops(context, bm, uv_layer)
 
                 # Process snap operation.
-                for l in target_loops:
-                    l[uv_layer].uv = self.target
+                # All UV coordinates are moved to the target point.
+                if target_loops:
+                    mat = np.zeros((3, 3))
+                    mat[:2, 2] = self.target
+                    mat[2, 2] = 1.0
+                    common.transform_loop_uvs(target_loops, uv_layer, mat)
                     no_selection_reason = None
 
-            elif self.group == 'FACE':
-                target_faces = \
-                    self._get_snap_target_faces(context, bm, uv_layer)
-
-                for face in target_faces:
-                    ave_uv = Vector((0.0, 0.0))
-                    for l in face.loops:
-                        ave_uv += l[uv_layer].uv
-                    ave_uv /= len(face.loops)
-                    diff = Vector(self.target) - ave_uv
-
-                    # Process snap operation.
-                    for l in face.loops:
-                        l[uv_layer].uv += diff
-                        no_selection_reason = None
-
-            elif self.group == 'UV_ISLAND':
-                target_islands = \
-                    self._get_snap_target_islands(context, bm, uv_layer)
-
-                for isl in target_islands:
-                    ave_uv = Vector((0.0, 0.0))
-                    count = 0
-                    for face in isl["faces"]:
-                        for l in face["face"].loops:
-                            ave_uv += l[uv_layer].uv
-                            count += 1
-                    if count != 0:
-                        ave_uv /= count
-                    diff = Vector(self.target) - ave_uv
+            elif self.group in ('FACE', 'UV_ISLAND'):
+                if self.group == 'FACE':
+                    target_faces_list = [
+                        [f] for f in
+                        self._get_snap_target_faces(context, bm, uv_layer)]
+                else:
+                    target_faces_list = [
+                        [f["face"] for f in isl["faces"]] for isl in
+                        self._get_snap_target_islands(context, bm, uv_layer)]
 
-                    # Process snap operation.
-                    for face in isl["faces"]:
-                        for l in face["face"].loops:
-                            l[uv_layer].uv += diff
-                            no_selection_reason = None
+                # Process snap operation.
+                # Center of each face (or island) is moved to the target
+                # point.
+                if target_faces_list:
+                    common.move_face_groups_uvs(
+                        obj, target_faces_list, uv_layer,
+                        [self.target] * len(target_faces_list), 'CENTER')
+                    no_selection_reason = None
 
             bmesh.update_edit_mesh(obj.data)
 
@@ -1349,13 +1336,12 @@ class MUV_OT_AlignUV_SnapToEdge(bpy.types.Operator):
 
         return target_loop_pairs
 
-    def _find_target_island_from_face(self, islands, face):
-        for isl in islands:
-            for f in isl["faces"]:
-                if f["face"] == face:
-                    return isl
+    def _find_target_island_from_face(self, islands, island_table, face):
+        idx = island_table[face.index]
+        if idx == -1:
+            return None
 
-        return None
+        return islands[idx]
 
     def execute(self, context):
         objs = common.get_uv_editable_objects(context)
@@ -1381,67 +1367,61 @@ class MUV_OT_AlignUV_SnapToEdge(bpy.types.Operator):
 
                     no_selection = False
 
-            elif self.group == 'FACE':
+            elif self.group in ('FACE', 'UV_ISLAND'):
                 target_loop_pairs = \
                     self._get_snap_target_loop_pairs(bm, uv_layer)
-
-                face_processed = []
+                if self.group == 'UV_ISLAND':
+                    islands = common.get_island_info_from_bmesh(
+                        bm, only_selected=False)
+                    isl_table = \
+                        common.get_island_lookup_table(bm, islands).tolist()
+
+                target_faces_list = []
+                diffs = []
+                processed = []
                 for pair in target_loop_pairs:
                     p = list(pair)
-                    diff = self._calc_snap_move_amount(p, uv_layer)
-
-                    # Process snap operation.
                     face = p[0].face
-                    if face in face_processed:
-                        self.report(
-                            {'WARNING'},
-                            "Must select only one edge per face. (Object: {})"
-                            .format(obj.name)
-                        )
-                        return {'CANCELLED'}
-                    face_processed.append(face)
-                    for l in face.loops:
-                        l[uv_layer].uv += diff
-                        no_selection = False
+                    if self.group == 'FACE':
+                        if face in processed:
+                            self.report(
+                                {'WARNING'},
+                                "Must select only one edge per face. "
+                                "(Object: {})".format(obj.name)
+                            )
+                            return {'CANCELLED'}
+                        processed.append(face)
+                        target_faces_list.append([face])
+                    else:
+                        # Find island to process.
+                        target_isl = self._find_target_island_from_face(
+                            islands, isl_table, face)
+                        if target_isl is None:
+                            self.report(
+                                {'WARNING'},
+                                "Failed to find island. (Object: {})"
+                                .format(obj.name)
+                            )
+                            return {'CANCELLED'}
+                        if target_isl in processed:
+                            self.report(
+                                {'WARNING'},
+                                """Must select only one edge per island.
+                                   (Object: {})"""
+                                .format(obj.name)
+                            )
+                            return {'CANCELLED'}
+                        processed.append(target_isl)
+                        target_faces_list.append(
+                            [f["face"] for f in target_isl["faces"]])
+                    diffs.append(self._calc_snap_move_amount(p, uv_layer))
 
-            elif self.group == 'UV_ISLAND':
-                target_loop_pairs = \
-                    self._get_snap_target_loop_pairs(bm, uv_layer)
-
-                islands = common.get_island_info_from_bmesh(
-                    bm, only_selected=False)
-
-                isl_processed = []
-                for pair in target_loop_pairs:
-                    p = list(pair)
-                    diff = self._calc_snap_move_amount(p, uv_layer)
-
-                    # Find island to process.
-                    face = p[0].face
-                    target_isl = \
-                        self._find_target_island_from_face(islands, face)
-                    if target_isl is None:
-                        self.report(
-                            {'WARNING'},
-                            "Failed to find island. (Object: {})"
-                            .format(obj.name)
-                        )
-                        return {'CANCELLED'}
-                    if target_isl in isl_processed:
-                        self.report(
-                            {'WARNING'},
-                            """Must select only one edge per island.
-                               (Object: {})"""
-                            .format(obj.name)
-                        )
-                        return {'CANCELLED'}
-                    isl_processed.append(target_isl)
-
-                    # Process snap operation.
-                    for f in target_isl["faces"]:
-                        for l in f["face"].loops:
-                            l[uv_layer].uv += diff
-                            no_selection = False
+                # Process snap operation.
+                # Each face (or island) is moved by the amount of its edge.
+                if target_faces_list:
+                    common.move_face_groups_uvs(obj, target_faces_list,
+                                                uv_layer, diffs)
+                    no_selection = False
 
             bmesh.update_edit_mesh(obj.data)
 
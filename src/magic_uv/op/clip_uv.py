@@ -10,13 +10,40 @@ import math
 
 import bpy
 import bmesh
-from mathutils import Vector
+import numpy as np
 from bpy.props import BoolProperty, FloatVectorProperty
 
 from .. import common
 from ..utils.bl_class_registry import BlClassRegistry
 from ..utils.property_class_registry import PropertyClassRegistry
 from ..utils import compatibility as compat
+from ..utils import transform
+
+
+def _calc_clip_move_amount(min_uvs, max_uvs, range_min, range_max):
+    """
+    Calculate the amount of movement of each group to clip the UV
+    coordinates whose bounding box is (min_uvs, max_uvs) into the range
+    """
+
+    range_min = np.asarray(range_min, dtype=np.float64)
+    range_max = np.asarray(range_max, dtype=np.float64)
+    clip_size = range_max - range_min
+    valid_size = np.where(clip_size != 0.0, clip_size, 1.0)
+
+    def wrap(uvs):
+        target = np.fmod(uvs - range_min, valid_size)
+        target = np.where(target < 0.0, target + clip_size, target)
+        target = np.where(clip_size != 0.0, target, 0.0)
+        return target + range_min
+
+    move_uvs = np.zeros_like(min_uvs)
+    move_uvs = np.where(max_uvs > range_max, wrap(max_uvs) - max_uvs,
+                        move_uvs)
+    move_uvs = np.where(min_uvs < range_min, wrap(min_uvs) - min_uvs,
+                        move_uvs)
+
+    return move_uvs
 
 
 def _is_valid_context(context):
@@ -155,66 +182,43 @@ class MUV_OT_ClipUV(bpy.types.Operator):
                 return {'CANCELLED'}
 
             uv_layer = bm.loops.layers.uv.verify()
-
-            for face in bm.faces:
-                if not face.select:
-                    continue
-
-                selected_loops = [
-                    l for l in face.loops
-                    if l[uv_layer].select or
-                    context.scene.tool_settings.use_uv_select_sync
-                ]
-                if not selected_loops:
-                    continue
-
-                # average of UV coordinates on the face
-                max_uv = Vector((-10000000.0, -10000000.0))
-                min_uv = Vector((10000000.0, 10000000.0))
-                for l in selected_loops:
-                    uv = l[uv_layer].uv
-                    max_uv.x = max(max_uv.x, uv.x)
-                    max_uv.y = max(max_uv.y, uv.y)
-                    min_uv.x = min(min_uv.x, uv.x)
-                    min_uv.y = min(min_uv.y, uv.y)
-
-                # clip
-                move_uv = Vector((0.0, 0.0))
-                clip_size = Vector(self.clip_uv_range_max) - \
-                    Vector(self.clip_uv_range_min)
-                if max_uv.x > self.clip_uv_range_max[0]:
-                    target_x = math.fmod(max_uv.x - self.clip_uv_range_min[0],
-                                         clip_size.x)
-                    if target_x < 0.0:
-                        target_x += clip_size.x
-                    target_x += self.clip_uv_range_min[0]
-                    move_uv.x = target_x - max_uv.x
-                if min_uv.x < self.clip_uv_range_min[0]:
-                    target_x = math.fmod(min_uv.x - self.clip_uv_range_min[0],
-                                         clip_size.x)
-                    if target_x < 0.0:
-                        target_x += clip_size.x
-                    target_x += self.clip_uv_range_min[0]
-                    move_uv.x = target_x - min_uv.x
-                if max_uv.y > self.clip_uv_range_max[1]:
-                    target_y = math.fmod(max_uv.y - self.clip_uv_range_min[1],
-                                         clip_size.y)
-                    if target_y < 0.0:
-                        target_y += clip_size.y
-                    target_y += self.clip_uv_range_min[1]
-                    move_uv.y = target_y - max_uv.y
-                if min_uv.y < self.clip_uv_range_min[1]:
-                    target_y = math.fmod(min_uv.y - self.clip_uv_range_min[1],
-                                         clip_size.y)
-                    if target_y < 0.0:
-                        target_y += clip_size.y
-                    target_y += self.clip_uv_range_min[1]
-                    move_uv.y = target_y - min_uv.y
-
-                # update UV
-                for l in selected_loops:
-                    l[uv_layer].uv = l[uv_layer].uv + move_uv
-
-            bmesh.update_edit_mesh(obj.data)
+            sync = context.scene.tool_settings.use_uv_select_sync
+
+            # Clip UV coordinates of the selected loops for each face.
+            with common.profile_span('extract'):
+                loops = []
+                groups = []
+                num_groups = 0
+                for face in bm.faces:
+                    if not face.select:
+                        continue
+
+                    selected_loops = [
+                        l for l in face.loops if sync or l[uv_layer].select
+                    ]
+                    if not selected_loops:
+                        continue
+                    loops.extend(selected_loops)
+                    groups.extend([num_groups] * len(selected_loops))
+                    num_groups += 1
+
+                uvs = common.get_loop_uvs(loops, uv_layer)
+
+            with common.profile_span('compute'):
+                min_uvs = transform.calc_group_anchors(
+                    uvs, groups, num_groups, 'LEFT_BOTTOM')
+                max_uvs = transform.calc_group_anchors(
+                    uvs, groups, num_groups, 'RIGHT_TOP')
+                move_uvs = _calc_clip_move_amount(min_uvs, max_uvs,
+                                                  self.clip_uv_range_min,
+                                                  self.clip_uv_range_max)
+
+            # update UV
+            common.transform_loop_uvs(
+                loops, uv_layer, transform.make_translation_matrices(move_uvs),
+                groups, uvs)
+
+            with common.profile_span('mesh update'):
+                bmesh.update_edit_mesh(obj.data)
 
         return {'FINISHED'}
@@ -354,34 +354,35 @@ class MUV_OT_CopyPasteUVUVEdit_PasteUVIsland(bpy.types.Operator):
                     }
                 )
 
+        # Group the source islands by the signature, so that the graph
+        # matching is only tried among the islands with same signature.
+        # UVs may be changed after copied, so the cache is cleared.
+        src_buckets = {}
+        for sdata in src_data:
+            common.clear_island_uv_graph(sdata["island"])
+            sig = common.get_island_signature(sdata["island"],
+                                              sdata["uv_layer"])
+            src_buckets.setdefault(sig, []).append(sdata)
+
         used = []
         for ddata in dst_data:
-            dst_loops = []
-            for f in ddata["island"]["faces"]:
-                for l in f["face"].loops:
-                    dst_loops.append(l)
             dst_uv_layer = ddata["uv_layer"]
+            dst_sig = common.get_island_signature(ddata["island"],
+                                                  dst_uv_layer)
 
             # Find a suitable island.
-            for sdata in src_data:
+            for sdata in src_buckets.get(dst_sig, []):
                 if self.unique_target and sdata in used:
                     continue
 
-                src_loops = []
-                for f in sdata["island"]["faces"]:
-                    for l in f["face"].loops:
-                        src_loops.append(l)
                 src_uv_layer = sdata["uv_layer"]
 
-                if len(src_loops) != len(dst_loops):
-                    continue
-
-                # Create UV graph.
-                src_uv_graph = common.create_uv_graph(src_loops, src_uv_layer)
-                dst_uv_graph = common.create_uv_graph(dst_loops, dst_uv_layer)
-
                 # Check if the graph is isomorphic.
                 # If the graph is isomorphic, matching pair is returned.
+                src_uv_graph = common.get_island_uv_graph(sdata["island"],
+                                                          src_uv_layer)
+                dst_uv_graph = common.get_island_uv_graph(ddata["island"],
+                                                          dst_uv_layer)
                 result, pairs = graph_is_isomorphic(src_uv_graph, dst_uv_graph)
                 if result:
                     # Paste UV island.
@@ -11,6 +11,7 @@ import bmesh
 from mathutils import Vector
 
 from .. import common
+from ..utils import transform
 from ..utils.bl_class_registry import BlClassRegistry
 from ..utils.property_class_registry import PropertyClassRegistry
 
@@ -125,10 +126,11 @@ class MUV_OT_MoveUV(bpy.types.Operator):
 
         # update UV
         obj = self.__cache["active_object"]
-        bm = self.__cache["bmesh"]
         active_uv = self.__cache["active_uv"]
-        for uv in self.__cache["target_uv"]:
-            uv += dv
+        loops = self.__cache["target_loops"]
+        self.__cache["target_uv"] = common.transform_loop_uvs(
+            loops, active_uv, transform.make_translation_matrices([dv])[0],
+            uvs=self.__cache["target_uv"])
         bmesh.update_edit_mesh(obj.data)
 
         # check mouse preference
@@ -137,8 +139,7 @@ class MUV_OT_MoveUV(bpy.types.Operator):
 
         # cancelled
         if event.type == cancel_btn and event.value == 'PRESS':
-            for (fidx, vidx), uv in zip(self.__topology_dict, self.__ini_uvs):
-                bm.faces[fidx].loops[vidx][active_uv].uv = uv
+            common.set_loop_uvs(loops, active_uv, self.__ini_uvs)
             MUV_OT_MoveUV.__running = False
             self.__cache = {}
             return {'FINISHED'}
@@ -169,10 +170,10 @@ class MUV_OT_MoveUV(bpy.types.Operator):
         self.__cache["active_object"] = obj
         self.__cache["bmesh"] = bm
         self.__cache["active_uv"] = active_uv
-        self.__cache["target_uv"] = []
-        for fidx, vidx in self.__topology_dict:
-            l = bm.faces[fidx].loops[vidx]
-            self.__cache["target_uv"].append(l[active_uv].uv)
+        self.__cache["target_loops"] = [
+            bm.faces[fidx].loops[vidx] for fidx, vidx in self.__topology_dict]
+        self.__cache["target_uv"] = common.get_loop_uvs(
+            self.__cache["target_loops"], active_uv)
 
         if context.area:
             context.area.tag_redraw()
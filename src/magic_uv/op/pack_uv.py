@@ -5,25 +5,36 @@ __status__ = "production"
 __version__ = "6.6"
 __date__ = "22 Apr 2022"
 
-from math import fabs
-
 import bpy
 from bpy.props import (
     FloatProperty,
     FloatVectorProperty,
     BoolProperty,
+    EnumProperty,
 )
 import bmesh
-import mathutils
 from mathutils import Vector
+import numpy as np
 
 from ..utils.bl_class_registry import BlClassRegistry
 from ..utils.property_class_registry import PropertyClassRegistry
 from ..utils.graph import graph_is_isomorphic
+from ..utils.packing import make_packing_matrices, pack_rects
+from ..utils.spatial import find_nearest_points, group_close_points
 from ..utils import compatibility as compat
 from .. import common
 
 
+# Items of the pack method shared by the scene property and the operator.
+_PACK_METHOD_ITEMS = [
+    ('BLENDER', "Blender",
+     "Pack by Pack Islands operation intrinsic to Blender"),
+    ('BUILTIN', "Built-in",
+     "Pack bounding boxes of UV islands by the built-in packer "
+     "(Rotate option rotates islands by 90 degrees only)"),
+]
+
+
 def _is_valid_context(context):
     # 'IMAGE_EDITOR' and 'VIEW_3D' space is allowed to execute.
     # If 'View_3D' space is not allowed, you can't find option in Tool-Shelf
@@ -42,17 +53,32 @@ def _is_valid_context(context):
     return True
 
 
-def _sort_island_faces(kd, uvs, isl1, isl2):
+def _sort_island_faces(group):
     """
-    Sort faces in island
+    Sort faces in islands of the group.
+    Faces of the first island are kept as they are, and the nearest face
+    to each of them is chosen from each of the other islands.
     """
 
-    sorted_faces = []
-    for f in isl1['sorted']:
-        _, idx, _ = kd.find(
-            Vector((f['ave_uv'].x, f['ave_uv'].y, 0.0)))
-        sorted_faces.append(isl2['faces'][uvs[idx]['face_idx']])
-    return sorted_faces
+    isl_1 = group[0]
+    isl_1['sorted'] = isl_1['faces']
+    if len(group) == 1:
+        return
+
+    queries = isl_1.get_face_ave_uvs()
+    points = [isl.get_face_ave_uvs() for isl in group[1:]]
+    point_groups = np.repeat(np.arange(len(points)),
+                             [len(p) for p in points])
+    nearest = find_nearest_points(
+        np.concatenate(points), np.tile(queries, (len(points), 1)),
+        point_groups, np.repeat(np.arange(len(points)), len(queries)))
+
+    offset = 0
+    nearest = nearest.reshape(len(points), len(queries)).tolist()
+    for isl_2, faces in zip(group[1:], nearest):
+        isl_faces = isl_2['faces']
+        isl_2['sorted'] = [isl_faces[i - offset] for i in faces]
+        offset += len(isl_faces)
 
 
 def _group_island(island_info, allowable_center_deviation,
@@ -61,64 +87,54 @@ def _group_island(island_info, allowable_center_deviation,
     Group island
     """
 
-    num_group = 0
-    while True:
-        # search islands which is not parsed yet
-        isl_1 = None
-        for isl_1 in island_info:
-            if isl_1['group'] == -1:
-                break
-        else:
-            break   # all faces are parsed
-        if isl_1 is None:
-            break
-        isl_1['group'] = num_group
-        isl_1['sorted'] = isl_1['faces']
-
-        # search same island
-        for isl_2 in island_info:
-            if isl_2['group'] == -1:
-                dcx = isl_2['center'].x - isl_1['center'].x
-                dcy = isl_2['center'].y - isl_1['center'].y
-                dsx = isl_2['size'].x - isl_1['size'].x
-                dsy = isl_2['size'].y - isl_1['size'].y
-                center_x_matched = (
-                    fabs(dcx) < allowable_center_deviation[0]
-                )
-                center_y_matched = (
-                    fabs(dcy) < allowable_center_deviation[1]
-                )
-                size_x_matched = (
-                    fabs(dsx) < allowable_size_deviation[0]
-                )
-                size_y_matched = (
-                    fabs(dsy) < allowable_size_deviation[1]
-                )
-                center_matched = center_x_matched and center_y_matched
-                size_matched = size_x_matched and size_y_matched
-                num_uv_matched = (isl_2['num_uv'] == isl_1['num_uv'])
-                # are islands have same?
-                if center_matched and size_matched and num_uv_matched:
-                    isl_2['group'] = num_group
-                    kd = mathutils.kdtree.KDTree(len(isl_2['faces']))
-                    uvs = [
-                        {
-                            'uv': Vector(
-                                (f['ave_uv'].x, f['ave_uv'].y, 0.0)
-                            ),
-                            'face_idx': fidx
-                        } for fidx, f in enumerate(isl_2['faces'])
-                    ]
-                    for i, uv in enumerate(uvs):
-                        kd.insert(uv['uv'], i)
-                    kd.balance()
-                    # sort faces for copy/paste UV
-                    isl_2['sorted'] = _sort_island_faces(kd, uvs, isl_1, isl_2)
-        num_group = num_group + 1
+    # Islands whose centers and sizes are close to the first island of
+    # the group and which have the same number of UVs are grouped.
+    keys = [(isl['center'].x, isl['center'].y, isl['size'].x, isl['size'].y)
+            for isl in island_info]
+    groups, num_group = group_close_points(
+        np.array(keys).reshape(-1, 4),
+        tuple(allowable_center_deviation) + tuple(allowable_size_deviation),
+        [isl['num_uv'] for isl in island_info])
+
+    group_islands = [[] for _ in range(num_group)]
+    for isl, gidx in zip(island_info, groups.tolist()):
+        isl['group'] = gidx
+        group_islands[gidx].append(isl)
+
+    # sort faces for copy/paste UV
+    for group in group_islands:
+        _sort_island_faces(group)
 
     return num_group
 
 
+def _pack_islands(islands, island_to_bm, island_to_uv_layer, rotate,
+                  margin):
+    """
+    Pack islands into the UV space (0.0-1.0) by the built-in packer.
+    Bounding boxes of islands are packed, and UVs of islands are
+    transformed at once for each BMesh.
+    """
+
+    min_uvs = np.array([isl['min'].to_tuple() for isl in islands])
+    max_uvs = np.array([isl['max'].to_tuple() for isl in islands])
+    positions, rotated, scale = pack_rects(max_uvs - min_uvs, margin,
+                                           rotate)
+    matrices = make_packing_matrices(min_uvs, max_uvs, positions, rotated,
+                                     scale)
+
+    bm_to_loops = {}    # { BMesh: (loops, island index of loops) }
+    for i, isl in enumerate(islands):
+        loops, groups = bm_to_loops.setdefault(island_to_bm[isl["id"]],
+                                               ([], []))
+        isl_loops = common.get_island_loops(isl)
+        loops.extend(isl_loops)
+        groups.extend([i] * len(isl_loops))
+    for bm, (loops, groups) in bm_to_loops.items():
+        uv_layer = island_to_uv_layer[islands[groups[0]]["id"]]
+        common.transform_loop_uvs(loops, uv_layer, matrices, groups)
+
+
 @PropertyClassRegistry()
 class _Properties:
     idname = "pack_uv"
@@ -167,6 +183,12 @@ class _Properties:
             description="Apply Pack UV operation intrinsic to Blender itself",
             default=True
         )
+        scene.muv_pack_uv_pack_method = EnumProperty(
+            name="Pack Method",
+            description="Method to pack UV islands",
+            items=_PACK_METHOD_ITEMS,
+            default='BLENDER'
+        )
 
     @classmethod
     def del_props(cls, scene):
@@ -176,6 +198,7 @@ class _Properties:
         del scene.muv_pack_uv_accurate_island_copy
         del scene.muv_pack_uv_stride
         del scene.muv_pack_uv_apply_pack_uv
+        del scene.muv_pack_uv_pack_method
 
 
 @BlClassRegistry()
@@ -242,6 +265,12 @@ class MUV_OT_PackUV(bpy.types.Operator):
         description="Apply Pack UV operation intrinsic to Blender itself",
         default=True
     )
+    pack_method = EnumProperty(
+        name="Pack Method",
+        description="Method to pack UV islands",
+        items=_PACK_METHOD_ITEMS,
+        default='BLENDER'
+    )
 
     @classmethod
     def poll(cls, context):
@@ -282,56 +311,55 @@ class MUV_OT_PackUV(bpy.types.Operator):
         num_group = _group_island(island_info,
                                   self.allowable_center_deviation,
                                   self.allowable_size_deviation)
-        bpy.ops.mesh.select_all(action='DESELECT')
+        groups = [[] for _ in range(num_group)]
+        for isl in island_info:
+            groups[isl['group']].append(isl)
 
         # pack UV
-        for gidx in range(num_group):
-            group = list(filter(
-                lambda i, idx=gidx: i['group'] == idx, island_info))
-            for f in group[0]['faces']:
-                f['face'].select = True
-        for obj in objs:
-            bmesh.update_edit_mesh(obj.data)
-        bpy.ops.uv.select_all(action='SELECT')
-        if self.apply_pack_uv:
-            bpy.ops.uv.pack_islands(rotate=self.rotate, margin=self.margin)
+        if self.pack_method == 'BUILTIN':
+            if self.apply_pack_uv:
+                _pack_islands([group[0] for group in groups], island_to_bm,
+                              island_to_uv_layer, self.rotate, self.margin)
+        else:
+            bpy.ops.mesh.select_all(action='DESELECT')
+            for group in groups:
+                for f in group[0]['faces']:
+                    f['face'].select = True
+            for obj in objs:
+                bmesh.update_edit_mesh(obj.data)
+            bpy.ops.uv.select_all(action='SELECT')
+            if self.apply_pack_uv:
+                bpy.ops.uv.pack_islands(rotate=self.rotate,
+                                        margin=self.margin)
 
         # copy/paste UV among same islands
-        for gidx in range(num_group):
-            group = list(filter(
-                lambda i, idx=gidx: i['group'] == idx, island_info))
+        for group in groups:
             if len(group) <= 1:
                 continue
             src_bm = island_to_bm[group[0]["id"]]
             src_uv_layer = island_to_uv_layer[group[0]["id"]]
             src_loop_lists = bm_to_loop_lists[src_bm]
 
-            src_loops = []
-            for f in group[0]["faces"]:
-                for l in f["face"].loops:
-                    src_loops.append(l)
-
-            src_uv_graph = common.create_uv_graph(src_loops, src_uv_layer)
-
             for stride_idx, g in enumerate(group[1:]):
                 dst_bm = island_to_bm[g["id"]]
                 dst_uv_layer = island_to_uv_layer[g["id"]]
                 dst_loop_lists = bm_to_loop_lists[dst_bm]
 
-                dst_loops = []
-                for f in g["faces"]:
-                    for l in f["face"].loops:
-                        dst_loops.append(l)
-
-                dst_uv_graph = common.create_uv_graph(dst_loops, dst_uv_layer)
-
                 uv_stride = Vector(((stride_idx + 1) * self.stride.x,
                                     (stride_idx + 1) * self.stride.y))
                 if self.accurate_island_copy:
                     # Check if the graph is isomorphic.
                     # If the graph is isomorphic, matching pair is returned.
-                    result, pairs = graph_is_isomorphic(
-                        src_uv_graph, dst_uv_graph)
+                    # Islands whose signatures are different never match.
+                    src_sig = common.get_island_signature(group[0],
+                                                          src_uv_layer)
+                    dst_sig = common.get_island_signature(g, dst_uv_layer)
+                    result = False
+                    if src_sig == dst_sig:
+                        result, pairs = graph_is_isomorphic(
+                            common.get_island_uv_graph(group[0],
+                                                       src_uv_layer),
+                            common.get_island_uv_graph(g, dst_uv_layer))
                     if not result:
                         self.report(
                             {'WARNING'},
@@ -358,11 +386,12 @@ class MUV_OT_PackUV(bpy.types.Operator):
                                 uv_stride
 
         # restore face/UV selection
-        bpy.ops.uv.select_all(action='DESELECT')
-        bpy.ops.mesh.select_all(action='DESELECT')
-        for f in selected_faces:
-            f.select = True
-        bpy.ops.uv.select_all(action='SELECT')
+        if self.pack_method != 'BUILTIN':
+            bpy.ops.uv.select_all(action='DESELECT')
+            bpy.ops.mesh.select_all(action='DESELECT')
+            for f in selected_faces:
+                f.select = True
+            bpy.ops.uv.select_all(action='SELECT')
 
         for obj in objs:
             bmesh.update_edit_mesh(obj.data)
@@ -8,12 +8,12 @@ __date__ = "22 Apr 2022"
 import bpy
 from bpy.props import StringProperty, EnumProperty, BoolProperty
 import bmesh
-from mathutils import Vector
 
 from .. import common
 from ..utils.bl_class_registry import BlClassRegistry
 from ..utils.property_class_registry import PropertyClassRegistry
 from ..utils import compatibility as compat
+from ..utils import transform
 
 
 def _is_valid_context(context):
@@ -202,117 +202,26 @@ class MUV_OT_PreserveUVAspect(bpy.types.Operator):
                             info[f[tex_layer].image]['faces'] = []
                         info[f[tex_layer].image]['faces'].append(f)
 
-                for img in info:
-                    if img is None:
-                        continue
-
-                    src_img = img
-                    ratio = Vector((
-                        dest_img.size[0] / src_img.size[0],
-                        dest_img.size[1] / src_img.size[1]))
-
-                    if self.origin == 'CENTER':
-                        origin = Vector((0.0, 0.0))
-                        num = 0
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin = origin + uv
-                                num = num + 1
-                        origin = origin / num
-                    elif self.origin == 'LEFT_TOP':
-                        origin = Vector((100000.0, -100000.0))
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin.x = min(origin.x, uv.x)
-                                origin.y = max(origin.y, uv.y)
-                    elif self.origin == 'LEFT_CENTER':
-                        origin = Vector((100000.0, 0.0))
-                        num = 0
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin.x = min(origin.x, uv.x)
-                                origin.y = origin.y + uv.y
-                                num = num + 1
-                        origin.y = origin.y / num
-                    elif self.origin == 'LEFT_BOTTOM':
-                        origin = Vector((100000.0, 100000.0))
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin.x = min(origin.x, uv.x)
-                                origin.y = min(origin.y, uv.y)
-                    elif self.origin == 'CENTER_TOP':
-                        origin = Vector((0.0, -100000.0))
-                        num = 0
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin.x = origin.x + uv.x
-                                origin.y = max(origin.y, uv.y)
-                                num = num + 1
-                        origin.x = origin.x / num
-                    elif self.origin == 'CENTER_BOTTOM':
-                        origin = Vector((0.0, 100000.0))
-                        num = 0
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin.x = origin.x + uv.x
-                                origin.y = min(origin.y, uv.y)
-                                num = num + 1
-                        origin.x = origin.x / num
-                    elif self.origin == 'RIGHT_TOP':
-                        origin = Vector((-100000.0, -100000.0))
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin.x = max(origin.x, uv.x)
-                                origin.y = max(origin.y, uv.y)
-                    elif self.origin == 'RIGHT_CENTER':
-                        origin = Vector((-100000.0, 0.0))
-                        num = 0
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin.x = max(origin.x, uv.x)
-                                origin.y = origin.y + uv.y
-                                num = num + 1
-                        origin.y = origin.y / num
-                    elif self.origin == 'RIGHT_BOTTOM':
-                        origin = Vector((-100000.0, 100000.0))
-                        for f in info[img]['faces']:
-                            for l in f.loops:
-                                uv = l[uv_layer].uv
-                                origin.x = max(origin.x, uv.x)
-                                origin.y = min(origin.y, uv.y)
-                    else:
-                        self.report({'ERROR'}, "Unknown Operation")
-                        return {'CANCELLED'}
-
-                    info[img]['ratio'] = ratio
-                    info[img]['origin'] = origin
+                imgs = [img for img in info if img is not None]
+                faces_list = [info[img]['faces'] for img in imgs]
+                factors = [(img.size[0] / dest_img.size[0],
+                            img.size[1] / dest_img.size[1])
+                           for img in imgs]
 
-                for img in info:
-                    if img is None:
-                        continue
+                if not transform.is_valid_anchor(self.origin):
+                    self.report({'ERROR'}, "Unknown Operation")
+                    return {'CANCELLED'}
 
-                    for f in info[img]['faces']:
-                        if compat.check_version(2, 80, 0) < 0:
-                            tex_layer = bm.faces.layers.tex.verify()
+                if compat.check_version(2, 80, 0) < 0:
+                    tex_layer = bm.faces.layers.tex.verify()
+                    for faces in faces_list:
+                        for f in faces:
                             f[tex_layer].image = dest_img
-                        for l in f.loops:
-                            uv = l[uv_layer].uv
-                            origin = info[img]['origin']
-                            ratio = info[img]['ratio']
-                            diff = uv - origin
-                            diff.x = diff.x / ratio.x
-                            diff.y = diff.y / ratio.y
-                            uv.x = origin.x + diff.x
-                            uv.y = origin.y + diff.y
-                            l[uv_layer].uv = uv
+
+                # Scale UV coordinates of faces about the origin of each
+                # texture so that the aspect ratio is preserved.
+                common.scale_face_groups_uvs(obj, faces_list, uv_layer,
+                                             self.origin, factors)
 
                 bmesh.update_edit_mesh(obj.data)
 
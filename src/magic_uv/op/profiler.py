@@ -0,0 +1,74 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "6.6"
+__date__ = "22 Apr 2022"
+
+import bpy
+from bpy.props import StringProperty
+
+from .. import common
+from ..utils.bl_class_registry import BlClassRegistry
+from ..utils import compatibility as compat
+
+
+@BlClassRegistry()
+class MUV_OT_Profiler_ClearRecords(bpy.types.Operator):
+    """
+    Operation class: Clear records of profiling
+    """
+
+    bl_idname = "uv.muv_profiler_clear_records"
+    bl_label = "Clear Profiling Records"
+    bl_description = "Clear all records of profiling"
+    bl_options = {'REGISTER'}
+
+    def execute(self, _):
+        common.Profiler.clear()
+        return {'FINISHED'}
+
+
+@BlClassRegistry()
+@compat.make_annotations
+class MUV_OT_Profiler_DumpChromeTrace(bpy.types.Operator):
+    """
+    Operation class: Dump records of profiling as Chrome trace
+    """
+
+    bl_idname = "uv.muv_profiler_dump_chrome_trace"
+    bl_label = "Dump Chrome Trace"
+    bl_description = "Dump records of profiling to the file as Chrome " \
+                     "trace event format (chrome://tracing, Perfetto)"
+    bl_options = {'REGISTER'}
+
+    filepath = StringProperty(
+        name="File Path",
+        description="Path of dumped trace",
+        default="",
+        subtype='FILE_PATH'
+    )
+
+    def invoke(self, context, _):
+        wm = context.window_manager
+        wm.fileselect_add(self)
+
+        return {'RUNNING_MODAL'}
+
+    def execute(self, _):
+        if not self.filepath:
+            self.report({'WARNING'}, "File path is not specified")
+            return {'CANCELLED'}
+
+        filepath = bpy.path.ensure_ext(bpy.path.abspath(self.filepath),
+                                       ".json")
+        try:
+            common.Profiler.dump_chrome_trace(filepath)
+        except OSError as e:
+            self.report({'WARNING'}, "Failed to dump trace: {}".format(e))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, "{} events are dumped to {}".format(
+            common.Profiler.num_events(), filepath))
+
+        return {'FINISHED'}
@@ -145,7 +145,8 @@ class MUV_OT_SelectUV_SelectOverlapped(bpy.types.Operator):
 
         overlapped_info = common.get_overlapped_uv_info(
             bm_list, faces_list, uv_layer_list, 'FACE',
-            self.same_polygon_threshold)
+            self.same_polygon_threshold,
+            only_selected=not context.tool_settings.use_uv_select_sync)
 
         if self.selection_method == 'RESET':
             if context.tool_settings.use_uv_select_sync:
@@ -504,6 +504,8 @@ class MUV_OT_TextureLock_Intr(bpy.types.Operator):
                 for r in result:
                     r["l"][uv_layer].uv = ave
                 v_orig["moved"] = True
+                common.update_island_cache(bm, uv_layer,
+                                           [r["l"] for r in result])
                 bmesh.update_edit_mesh(obj.data)
 
             common.redraw_all_areas()
@@ -12,6 +12,7 @@ import bpy
 import gpu
 import mathutils
 import bmesh
+import numpy as np
 from bpy.props import BoolProperty, EnumProperty
 
 from .. import common
@@ -21,9 +22,6 @@ from ..utils import compatibility as compat
 from ..gpu_utils import imm
 
 
-MAX_VALUE = 100000.0
-
-
 def _is_valid_context(context):
     # 'IMAGE_EDITOR' and 'VIEW_3D' space is allowed to execute.
     # If 'View_3D' space is not allowed, you can't find option in Tool-Shelf
@@ -719,25 +717,29 @@ class MUV_OT_UVBoundingBox(bpy.types.Operator):
             if not bm.loops.layers.uv:
                 continue
             uv_layer = bm.loops.layers.uv.verify()
+            fidx = []
+            lidx = []
+            loops = []
             for f in bm.faces:
                 if not f.select:
                     continue
                 for i, l in enumerate(f.loops):
                     if sc.muv_uv_bounding_box_boundary == 'UV_SEL':
-                        if l[uv_layer].select:
-                            uv_info.append({
-                                "bmesh": bm,
-                                "fidx": f.index,
-                                "lidx": i,
-                                "uv": l[uv_layer].uv.copy()
-                            })
-                    elif sc.muv_uv_bounding_box_boundary == 'UV':
-                        uv_info.append({
-                            "bmesh": bm,
-                            "fidx": f.index,
-                            "lidx": i,
-                            "uv": l[uv_layer].uv.copy()
-                        })
+                        if not l[uv_layer].select:
+                            continue
+                    elif sc.muv_uv_bounding_box_boundary != 'UV':
+                        continue
+                    fidx.append(f.index)
+                    lidx.append(i)
+                    loops.append(l)
+            if not loops:
+                continue
+            uv_info.append({
+                "bmesh": bm,
+                "fidx": fidx,
+                "lidx": lidx,
+                "uv": common.get_loop_uvs(loops, uv_layer),
+            })
         if not uv_info:
             return None
         return uv_info
@@ -746,21 +748,9 @@ class MUV_OT_UVBoundingBox(bpy.types.Operator):
         """
         Get control point
         """
-        left = MAX_VALUE
-        right = -MAX_VALUE
-        top = -MAX_VALUE
-        bottom = MAX_VALUE
-
-        for info in uv_info_ini:
-            uv = info["uv"]
-            if uv.x < left:
-                left = uv.x
-            if uv.x > right:
-                right = uv.x
-            if uv.y < bottom:
-                bottom = uv.y
-            if uv.y > top:
-                top = uv.y
+        uvs = np.concatenate([info["uv"] for info in uv_info_ini])
+        left, bottom = uvs.min(axis=0).tolist()
+        right, top = uvs.max(axis=0).tolist()
 
         points = [
             mathutils.Vector((
@@ -787,13 +777,11 @@ class MUV_OT_UVBoundingBox(bpy.types.Operator):
         for info in uv_info_ini:
             bm = info["bmesh"]
             uv_layer = bm.loops.layers.uv.verify()
-            fidx = info["fidx"]
-            lidx = info["lidx"]
-            uv = info["uv"]
-            v = mathutils.Vector((uv.x, uv.y, 0.0))
-            av = compat.matmul(trans_mat, v)
-            bm.faces[fidx].loops[lidx][uv_layer].uv = mathutils.Vector(
-                (av.x, av.y))
+            loops = [bm.faces[fidx].loops[lidx]
+                     for fidx, lidx in zip(info["fidx"], info["lidx"])]
+            common.transform_loop_uvs(loops, uv_layer, trans_mat,
+                                      uvs=info["uv"])
+            common.update_island_cache(bm, uv_layer, loops)
 
         objs = common.get_uv_editable_objects(context)
         for obj in objs:
@@ -64,7 +64,9 @@ def _update_uvinsp_info(context):
 
     props.overlapped_info = common.get_overlapped_uv_info(
         bm_list, faces_list, uv_layer_list, sc.muv_uv_inspection_show_mode,
-        sc.muv_uv_inspection_same_polygon_threshold)
+        sc.muv_uv_inspection_same_polygon_threshold,
+        sc.muv_uv_inspection_detection_method,
+        not context.tool_settings.use_uv_select_sync)
     props.flipped_info = common.get_flipped_uv_info(
         bm_list, faces_list, uv_layer_list)
 
@@ -156,6 +158,18 @@ class _Properties:
             max=0.01,
             step=0.00001
         )
+        scene.muv_uv_inspection_detection_method = EnumProperty(
+            name="Detection Method",
+            description="Method to find overlapped UVs",
+            items=[
+                ('ISLAND', "Island",
+                 "Find overlapped UVs between/within UV islands"),
+                ('EDGE', "Edge",
+                 "Find overlapped UVs from intersections of all UV edges "
+                 "(Faster for the UV map which has many UV islands)")
+            ],
+            default='ISLAND'
+        )
 
     @classmethod
     def del_props(cls, scene):
@@ -167,6 +181,7 @@ class _Properties:
         del scene.muv_uv_inspection_display_in_v3d
         del scene.muv_uv_inspection_show_mode
         del scene.muv_uv_inspection_same_polygon_threshold
+        del scene.muv_uv_inspection_detection_method
 
 
 @BlClassRegistry()
@@ -278,12 +278,14 @@ class MUV_OT_UVSculpt(bpy.types.Operator):
             bm = bmesh.from_edit_mesh(obj.data)
             uv_layer = bm.loops.layers.uv.verify()
             mco = self.current_mco
+            changed_loops = []
 
             if sc.muv_uv_sculpt_tools == 'GRAB':
                 for info in self.__loop_info[obj]:
                     diff_uv = (mco - self.__initial_mco) * info["strength"]
                     l = bm.faces[info["face_idx"]].loops[info["loop_idx"]]
                     l[uv_layer].uv = info["initial_uv"] + diff_uv / 100.0
+                    changed_loops.append(l)
 
             elif sc.muv_uv_sculpt_tools == 'PINCH':
                 _, region, space = common.get_space(
@@ -345,6 +347,7 @@ class MUV_OT_UVSculpt(bpy.types.Operator):
                         diff_uv = \
                             (target_uv - l[uv_layer].uv) * info["strength"]
                     l[uv_layer].uv = l[uv_layer].uv + diff_uv / 10.0
+                    changed_loops.append(l)
 
             elif sc.muv_uv_sculpt_tools == 'RELAX':
                 _, region, space = common.get_space(
@@ -412,7 +415,9 @@ class MUV_OT_UVSculpt(bpy.types.Operator):
                             continue
 
                         l[uv_layer].uv = target_uv
+                        changed_loops.append(l)
 
+            common.update_island_cache(bm, uv_layer, changed_loops)
             bmesh.update_edit_mesh(obj.data)
 
     def __stroke_exit(self, context, _):
@@ -423,13 +428,16 @@ class MUV_OT_UVSculpt(bpy.types.Operator):
             bm = bmesh.from_edit_mesh(obj.data)
             uv_layer = bm.loops.layers.uv.verify()
             mco = self.current_mco
+            changed_loops = []
 
             if sc.muv_uv_sculpt_tools == 'GRAB':
                 for info in self.__loop_info[obj]:
                     diff_uv = (mco - self.__initial_mco) * info["strength"]
                     l = bm.faces[info["face_idx"]].loops[info["loop_idx"]]
                     l[uv_layer].uv = info["initial_uv"] + diff_uv / 100.0
+                    changed_loops.append(l)
 
+            common.update_island_cache(bm, uv_layer, changed_loops)
             bmesh.update_edit_mesh(obj.data)
 
     def modal(self, context, event):
@@ -13,9 +13,9 @@ from bpy.props import (
     FloatProperty,
     IntVectorProperty,
     BoolProperty,
+    StringProperty,
 )
 import bmesh
-from mathutils import Vector
 
 from .. import common
 from ..utils.bl_class_registry import BlClassRegistry
@@ -56,6 +56,19 @@ def _is_valid_context_for_apply(context):
     return True
 
 
+def _is_valid_context_for_report(context):
+    # only 'VIEW_3D' space is allowed to execute
+    if not common.is_valid_space(context, ['VIEW_3D']):
+        return False
+
+    # Only object mode is allowed to execute.
+    ob = context.object
+    if ob is not None and ob.mode != 'OBJECT':
+        return False
+
+    return True
+
+
 def _measure_wsuv_info(obj, calc_method='MESH',
                        tex_selection_method='FIRST', tex_size=None,
                        only_selected=True):
@@ -80,10 +93,13 @@ def _measure_wsuv_info(obj, calc_method='MESH',
 
 
 def _measure_wsuv_info_from_faces(obj, bm, faces, uv_layer, tex_layer,
-                                  tex_selection_method='FIRST', tex_size=None):
-    mesh_area = common.measure_mesh_area_from_faces(bm, faces)
+                                  tex_selection_method='FIRST', tex_size=None,
+                                  mesh_areas=None, uv_areas=None,
+                                  tex_size_resolver=None):
+    mesh_area = common.measure_mesh_area_from_faces(bm, faces, mesh_areas)
     uv_area = common.measure_uv_area_from_faces(
-        obj, bm, faces, uv_layer, tex_layer, tex_selection_method, tex_size)
+        obj, bm, faces, uv_layer, tex_layer, tex_selection_method, tex_size,
+        uv_areas, tex_size_resolver)
 
     if not uv_area:
         return None, mesh_area, None
@@ -96,92 +112,48 @@ def _measure_wsuv_info_from_faces(obj, bm, faces, uv_layer, tex_layer,
     return uv_area, mesh_area, density
 
 
-def _apply(faces, uv_layer, origin, factor):
-    # calculate origin
-    if origin == 'CENTER':
-        origin = Vector((0.0, 0.0))
-        num = 0
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin = origin + uv
-                num = num + 1
-        origin = origin / num
-    elif origin == 'LEFT_TOP':
-        origin = Vector((100000.0, -100000.0))
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin.x = min(origin.x, uv.x)
-                origin.y = max(origin.y, uv.y)
-    elif origin == 'LEFT_CENTER':
-        origin = Vector((100000.0, 0.0))
-        num = 0
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin.x = min(origin.x, uv.x)
-                origin.y = origin.y + uv.y
-                num = num + 1
-        origin.y = origin.y / num
-    elif origin == 'LEFT_BOTTOM':
-        origin = Vector((100000.0, 100000.0))
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin.x = min(origin.x, uv.x)
-                origin.y = min(origin.y, uv.y)
-    elif origin == 'CENTER_TOP':
-        origin = Vector((0.0, -100000.0))
-        num = 0
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin.x = origin.x + uv.x
-                origin.y = max(origin.y, uv.y)
-                num = num + 1
-        origin.x = origin.x / num
-    elif origin == 'CENTER_BOTTOM':
-        origin = Vector((0.0, 100000.0))
-        num = 0
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin.x = origin.x + uv.x
-                origin.y = min(origin.y, uv.y)
-                num = num + 1
-        origin.x = origin.x / num
-    elif origin == 'RIGHT_TOP':
-        origin = Vector((-100000.0, -100000.0))
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin.x = max(origin.x, uv.x)
-                origin.y = max(origin.y, uv.y)
-    elif origin == 'RIGHT_CENTER':
-        origin = Vector((-100000.0, 0.0))
-        num = 0
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin.x = max(origin.x, uv.x)
-                origin.y = origin.y + uv.y
-                num = num + 1
-        origin.y = origin.y / num
-    elif origin == 'RIGHT_BOTTOM':
-        origin = Vector((-100000.0, 100000.0))
-        for f in faces:
-            for l in f.loops:
-                uv = l[uv_layer].uv
-                origin.x = max(origin.x, uv.x)
-                origin.y = min(origin.y, uv.y)
-
-    # update UV coordinate
-    for f in faces:
-        for l in f.loops:
-            uv = l[uv_layer].uv
-            diff = uv - origin
-            l[uv_layer].uv = origin + diff * factor
+def _scale_face_groups_to_density(obj, bm, faces_list, uv_layer, tex_layer,
+                                  origin, calc_tgt_density,
+                                  tex_selection_method='FIRST',
+                                  tex_size=None):
+    """
+    Scale UVs of each group in faces_list so that the texel density of the
+    group is calc_tgt_density(mesh area of the group).
+    Return the list of the scaling factors, or None if some groups have
+    no UV area.
+    """
+
+    # All groups are measured before any group is scaled. Groups do not
+    # share faces, so the areas of the faces are valid for all groups and
+    # the scale can be applied to all groups at once.
+    mesh_areas, uv_areas = common.calc_face_area_table(bm, uv_layer)
+    tex_size_resolver = common.TextureSizeResolver(obj, tex_layer)
+    factors = []
+    for faces in faces_list:
+        uv_area, mesh_area, density = _measure_wsuv_info_from_faces(
+            obj, bm, faces, uv_layer, tex_layer,
+            tex_selection_method=tex_selection_method, tex_size=tex_size,
+            mesh_areas=mesh_areas, uv_areas=uv_areas,
+            tex_size_resolver=tex_size_resolver)
+        if not uv_area:
+            return None
+        factors.append(calc_tgt_density(mesh_area) / density)
+
+    common.scale_face_groups_uvs(obj, faces_list, uv_layer, origin,
+                                 factors)
+
+    return factors
+
+
+def _get_tex_selection_args(tgt_texture):
+    if tgt_texture == "[Average]":
+        return {"tex_selection_method": 'AVERAGE'}
+    if tgt_texture == "[Max]":
+        return {"tex_selection_method": 'MAX'}
+    if tgt_texture == "[Min]":
+        return {"tex_selection_method": 'MIN'}
+    return {"tex_selection_method": 'USER_SPECIFIED',
+            "tex_size": bpy.data.images[tgt_texture].size}
 
 
 def _get_target_textures(_, __):
@@ -505,27 +477,16 @@ class MUV_OT_WorldScaleUV_ApplyManual(bpy.types.Operator):
             tex_layer = common.find_texture_layer(bm)
             faces_list = common.get_faces_list(
                 bm, self.tgt_area_calc_method, self.only_selected)
-
-            tex_size = self.tgt_texture_size
-
-            factors = []
-            for faces in faces_list:
-                uv_area, _, density = _measure_wsuv_info_from_faces(
-                    obj, bm, faces, uv_layer, tex_layer,
-                    tex_selection_method='USER_SPECIFIED', tex_size=tex_size)
-
-                if not uv_area:
-                    self.report({'WARNING'},
-                                "Object {} must have more than one UV map"
-                                .format(obj.name))
-                    return {'CANCELLED'}
-
-                tgt_density = self.tgt_density
-                factor = tgt_density / density
-
-                _apply(faces, uv_layer, self.origin, factor)
-                factors.append(factor)
-
+            factors = _scale_face_groups_to_density(
+                obj, bm, faces_list, uv_layer, tex_layer, self.origin,
+                lambda _: self.tgt_density,
+                tex_selection_method='USER_SPECIFIED',
+                tex_size=self.tgt_texture_size)
+            if factors is None:
+                self.report({'WARNING'},
+                            "Object {} must have more than one UV map"
+                            .format(obj.name))
+                return {'CANCELLED'}
             bmesh.update_edit_mesh(obj.data)
             self.report({'INFO'},
                         "Scaling factor of object {}: {}"
@@ -675,40 +636,15 @@ class MUV_OT_WorldScaleUV_ApplyScalingDensity(bpy.types.Operator):
             tex_layer = common.find_texture_layer(bm)
             faces_list = common.get_faces_list(
                 bm, self.tgt_area_calc_method, self.only_selected)
-
-            factors = []
-            for faces in faces_list:
-                if self.tgt_texture == "[Average]":
-                    uv_area, _, density = _measure_wsuv_info_from_faces(
-                        obj, bm, faces, uv_layer, tex_layer,
-                        tex_selection_method='AVERAGE')
-                elif self.tgt_texture == "[Max]":
-                    uv_area, _, density = _measure_wsuv_info_from_faces(
-                        obj, bm, faces, uv_layer, tex_layer,
-                        tex_selection_method='MAX')
-                elif self.tgt_texture == "[Min]":
-                    uv_area, _, density = _measure_wsuv_info_from_faces(
-                        obj, bm, faces, uv_layer, tex_layer,
-                        tex_selection_method='MIN')
-                else:
-                    tgt_texture = bpy.data.images[self.tgt_texture]
-                    uv_area, _, density = _measure_wsuv_info_from_faces(
-                        obj, bm, faces, uv_layer, tex_layer,
-                        tex_selection_method='USER_SPECIFIED',
-                        tex_size=tgt_texture.size)
-
-                if not uv_area:
-                    self.report({'WARNING'},
-                                "Object {} must have more than one UV map and "
-                                "texture".format(obj.name))
-                    return {'CANCELLED'}
-
-                tgt_density = self.src_density * self.tgt_scaling_factor
-                factor = tgt_density / density
-
-                _apply(faces, uv_layer, self.origin, factor)
-                factors.append(factor)
-
+            factors = _scale_face_groups_to_density(
+                obj, bm, faces_list, uv_layer, tex_layer, self.origin,
+                lambda _: self.src_density * self.tgt_scaling_factor,
+                **_get_tex_selection_args(self.tgt_texture))
+            if factors is None:
+                self.report({'WARNING'},
+                            "Object {} must have more than one UV map and "
+                            "texture".format(obj.name))
+                return {'CANCELLED'}
             bmesh.update_edit_mesh(obj.data)
             self.report({'INFO'},
                         "Scaling factor of object {}: {}"
@@ -880,44 +816,16 @@ class MUV_OT_WorldScaleUV_ApplyProportionalToMesh(bpy.types.Operator):
             tex_layer = common.find_texture_layer(bm)
             faces_list = common.get_faces_list(
                 bm, self.tgt_area_calc_method, self.only_selected)
-
-            factors = []
-            for faces in faces_list:
-                if self.tgt_texture == "[Average]":
-                    uv_area, mesh_area, density = \
-                        _measure_wsuv_info_from_faces(
-                            obj, bm, faces, uv_layer, tex_layer,
-                            tex_selection_method='AVERAGE')
-                elif self.tgt_texture == "[Max]":
-                    uv_area, mesh_area, density = \
-                        _measure_wsuv_info_from_faces(
-                            obj, bm, faces, uv_layer, tex_layer,
-                            tex_selection_method='MAX')
-                elif self.tgt_texture == "[Min]":
-                    uv_area, mesh_area, density = \
-                        _measure_wsuv_info_from_faces(
-                            obj, bm, faces, uv_layer, tex_layer,
-                            tex_selection_method='MIN')
-                else:
-                    tgt_texture = bpy.data.images[self.tgt_texture]
-                    uv_area, mesh_area, density = \
-                        _measure_wsuv_info_from_faces(
-                            obj, bm, faces, uv_layer, tex_layer,
-                            tex_selection_method='USER_SPECIFIED',
-                            tex_size=tgt_texture.size)
-                if not uv_area:
-                    self.report({'WARNING'},
-                                "Object {} must have more than one UV map and "
-                                "texture".format(obj.name))
-                    return {'CANCELLED'}
-
-                tgt_density = self.src_density * sqrt(mesh_area) / sqrt(
-                    self.src_mesh_area)
-                factor = tgt_density / density
-
-                _apply(faces, uv_layer, self.origin, factor)
-                factors.append(factor)
-
+            factors = _scale_face_groups_to_density(
+                obj, bm, faces_list, uv_layer, tex_layer, self.origin,
+                lambda mesh_area: self.src_density * sqrt(mesh_area) / sqrt(
+                    self.src_mesh_area),
+                **_get_tex_selection_args(self.tgt_texture))
+            if factors is None:
+                self.report({'WARNING'},
+                            "Object {} must have more than one UV map and "
+                            "texture".format(obj.name))
+                return {'CANCELLED'}
             bmesh.update_edit_mesh(obj.data)
             self.report({'INFO'},
                         "Scaling factor of object {}: {}"
@@ -959,3 +867,156 @@ class MUV_OT_WorldScaleUV_ApplyProportionalToMesh(bpy.types.Operator):
 
     def execute(self, context):
         return self.__apply_proportional_to_mesh(context)
+
+
+@BlClassRegistry()
+@compat.make_annotations
+class MUV_OT_WorldScaleUV_ReportDensity(bpy.types.Operator):
+    """
+    Operation class: Report texel density of all mesh objects
+    """
+
+    bl_idname = "uv.muv_world_scale_uv_report_density"
+    bl_label = "Report Texel Density"
+    bl_description = "Report texel density of each object, UV island and " \
+                     "face in scene or collection"
+    bl_options = {'REGISTER'}
+
+    target = EnumProperty(
+        name="Target",
+        description="Objects to be measured",
+        items=[
+            ('SCENE', "Scene", "All mesh objects in scene"),
+            ('SELECTED', "Selected", "Selected mesh objects"),
+            ('COLLECTION', "Collection", "All mesh objects in collection"),
+        ],
+        default='SCENE'
+    )
+    collection = StringProperty(
+        name="Collection",
+        description="Name of collection to be measured",
+        default=""
+    )
+    tex_selection_method = EnumProperty(
+        name="Texture",
+        description="How to determine texture size",
+        items=[
+            ('FIRST', "First", "Texture of object (Object must have only "
+                               "one texture)"),
+            ('AVERAGE', "Average", "Average of all textures"),
+            ('MAX', "Max", "Max of all textures"),
+            ('MIN', "Min", "Min of all textures"),
+            ('USER_SPECIFIED', "User Specified", "Specify texture size"),
+        ],
+        default='AVERAGE'
+    )
+    tgt_texture_size = IntVectorProperty(
+        name="Texture Size",
+        size=2,
+        min=1,
+        soft_max=10240,
+        default=(1024, 1024),
+    )
+    include_faces = BoolProperty(
+        name="Include Faces",
+        description="Include texel density of each face",
+        default=False
+    )
+    file_format = EnumProperty(
+        name="File Format",
+        description="Format of exported report",
+        items=[
+            ('JSON', "JSON", "JSON"),
+            ('CSV', "CSV", "CSV"),
+        ],
+        default='JSON'
+    )
+    filepath = StringProperty(
+        name="File Path",
+        description="Path of exported report (Not exported if empty)",
+        default="",
+        subtype='FILE_PATH'
+    )
+
+    @classmethod
+    def poll(cls, context):
+        # we can not get area/space/region from console
+        if common.is_console_mode():
+            return True
+        return _is_valid_context_for_report(context)
+
+    def __get_objects(self, context):
+        if self.target == 'SCENE':
+            return list(context.scene.objects)
+        if self.target == 'SELECTED':
+            return list(context.selected_objects)
+
+        if compat.check_version(2, 80, 0) < 0:
+            collections = bpy.data.groups
+        else:
+            collections = bpy.data.collections
+        if self.collection not in collections:
+            return None
+        if compat.check_version(2, 80, 0) < 0:
+            return list(collections[self.collection].objects)
+        return list(collections[self.collection].all_objects)
+
+    def draw(self, _):
+        layout = self.layout
+
+        layout.prop(self, "target")
+        if self.target == 'COLLECTION':
+            layout.prop(self, "collection")
+        layout.prop(self, "tex_selection_method")
+        if self.tex_selection_method == 'USER_SPECIFIED':
+            layout.prop(self, "tgt_texture_size")
+        layout.prop(self, "include_faces")
+        layout.prop(self, "file_format")
+
+    def invoke(self, context, _):
+        wm = context.window_manager
+        wm.fileselect_add(self)
+
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        objs = self.__get_objects(context)
+        if objs is None:
+            self.report({'WARNING'},
+                        "Collection {} is not found".format(self.collection))
+            return {'CANCELLED'}
+
+        tex_size = None
+        if self.tex_selection_method == 'USER_SPECIFIED':
+            tex_size = self.tgt_texture_size
+        report = common.measure_texel_density(
+            objs, tex_selection_method=self.tex_selection_method,
+            tex_size=tex_size, include_faces=self.include_faces)
+        for skipped in report["skipped_objects"]:
+            self.report({'WARNING'},
+                        "Object {}: {}".format(skipped["name"],
+                                               skipped["reason"]))
+
+        stats = report["statistics"]["object"]
+        if stats["count"] == 0:
+            self.report({'WARNING'}, "No texel density is measured")
+            return {'CANCELLED'}
+
+        if self.filepath:
+            ext = ".json" if self.file_format == 'JSON' else ".csv"
+            filepath = bpy.path.ensure_ext(bpy.path.abspath(self.filepath),
+                                           ext)
+            try:
+                common.export_texel_density_report(report, filepath,
+                                                   self.file_format)
+            except OSError as e:
+                self.report({'WARNING'},
+                            "Failed to export report: {}".format(e))
+                return {'CANCELLED'}
+
+        self.report({'INFO'},
+                    "Objects: {0}, Texel Density: min {1}, median {2}, max {3}"
+                    .format(stats["count"], stats["min"],
+                            stats["percentiles"].get("50"), stats["max"]))
+
+        return {'FINISHED'}
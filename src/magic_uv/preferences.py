@@ -11,6 +11,7 @@ from bpy.props import (
     FloatVectorProperty,
     BoolProperty,
     EnumProperty,
+    IntProperty,
 )
 from bpy.types import AddonPreferences
 
@@ -21,7 +22,12 @@ from .op.mirror_uv import MUV_OT_MirrorUV
 from .op.move_uv import MUV_OT_MoveUV
 from .op.unwrap_constraint import MUV_OT_UnwrapConstraint
 from .op.pack_uv import MUV_OT_PackUV
+from .op.profiler import (
+    MUV_OT_Profiler_ClearRecords,
+    MUV_OT_Profiler_DumpChromeTrace,
+)
 from .op.smooth_uv import MUV_OT_SmoothUV
+from .op.world_scale_uv import MUV_OT_WorldScaleUV_ReportDensity
 from .ui.VIEW3D_MT_uv_map import (
     MUV_MT_CopyPasteUV,
     MUV_MT_TransferUV,
@@ -97,6 +103,12 @@ def view3d_object_menu_fn(self, _):
     # Copy/Paste UV (Among Object)
     layout.menu(MUV_MT_CopyPasteUV_Object.bl_idname, text="Copy/Paste UV")
 
+    layout.separator()
+    layout.label(text="UV Manipulation", icon=compat.icon('IMAGE'))
+    # World Scale UV (Report Texel Density)
+    layout.operator(MUV_OT_WorldScaleUV_ReportDensity.bl_idname,
+                    text="Report Texel Density")
+
 
 def image_uvs_menu_fn(self, context):
     layout = self.layout
@@ -165,6 +177,51 @@ def get_debug_mode(self):
     return enabled
 
 
+def set_profile_mode(self, value):
+    self['enable_profile_mode'] = value
+
+
+def get_profile_mode(self):
+    enabled = self.get('enable_profile_mode', False)
+    if enabled:
+        common.enable_profile_mode()
+    else:
+        common.disable_profile_mode()
+    return enabled
+
+
+def draw_profile_records(layout, max_items):
+    stats = common.Profiler.get_statistics(percentiles=(50, 90))
+
+    layout.label(text="Events: {} (Dropped: {})".format(
+        common.Profiler.num_events(), common.Profiler.num_dropped_events()))
+    if not stats:
+        return
+
+    box = layout.box()
+    headers = ["Span", "Count", "Total [ms]", "Mean [ms]", "50% [ms]",
+               "90% [ms]", "Max [ms]"]
+    sp = compat.layout_split(box, 0.4)
+    sp.label(text=headers[0])
+    row = sp.row()
+    for header in headers[1:]:
+        row.label(text=header)
+    for s in stats[:max_items]:
+        sp = compat.layout_split(box, 0.4)
+        # Phase spans are shown with indent.
+        if s["category"] == 'operator':
+            sp.label(text=s["name"])
+        else:
+            sp.label(text="    " + s["name"])
+        row = sp.row()
+        row.label(text=str(s["count"]))
+        for v in (s["total"], s["mean"], s["percentiles"]["50"],
+                  s["percentiles"]["90"], s["max"]):
+            row.label(text="{:.3f}".format(v * 1000.0))
+    if len(stats) > max_items:
+        box.label(text="... ({} more)".format(len(stats) - max_items))
+
+
 @BlClassRegistry()
 @compat.make_annotations
 class MUV_Preferences(AddonPreferences):
@@ -195,6 +252,22 @@ class MUV_Preferences(AddonPreferences):
         get=get_debug_mode,
     )
 
+    # enable profiling mode
+    enable_profile_mode = BoolProperty(
+        name="Profiling Mode",
+        description="Record time spent by operators",
+        default=False,
+        set=set_profile_mode,
+        get=get_profile_mode,
+    )
+    profile_max_items = IntProperty(
+        name="Max Items",
+        description="Max number of displayed records",
+        default=30,
+        min=1,
+        max=1000
+    )
+
     # for UV Sculpt
     uv_sculpt_brush_color = FloatVectorProperty(
         name="Color",
@@ -276,6 +349,7 @@ class MUV_Preferences(AddonPreferences):
         items=[
             ('INFO', "Information", "Information about this add-on"),
             ('CONFIG', "Configuration", "Configuration about this add-on"),
+            ('PROFILE', "Profiling", "Time spent by operators"),
         ],
         default='INFO'
     )
@@ -487,3 +561,18 @@ class MUV_Preferences(AddonPreferences):
                 col.prop(self, "uv_bounding_box_cp_size")
                 col.prop(self, "uv_bounding_box_cp_react_size")
                 layout.separator()
+
+        elif self.category == 'PROFILE':
+            layout.separator()
+
+            layout.prop(self, "enable_profile_mode", text="Profiling Mode")
+            row = layout.row()
+            row.operator(MUV_OT_Profiler_ClearRecords.bl_idname,
+                         text="Clear")
+            row.operator(MUV_OT_Profiler_DumpChromeTrace.bl_idname,
+                         text="Dump Chrome Trace")
+            row.prop(self, "profile_max_items")
+
+            layout.separator()
+
+            draw_profile_records(layout, self.profile_max_items)
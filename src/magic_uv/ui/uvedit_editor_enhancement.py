@@ -130,5 +130,7 @@ class MUV_PT_UVEdit_EditorEnhancement(bpy.types.Panel):
             if sc.muv_uv_inspection_show_overlapped:
                 row = box.row()
                 row.prop(sc, "muv_uv_inspection_same_polygon_threshold")
+                row = box.row()
+                row.prop(sc, "muv_uv_inspection_detection_method")
             box.separator()
             box.operator(MUV_OT_UVInspection_PaintUVIsland.bl_idname)
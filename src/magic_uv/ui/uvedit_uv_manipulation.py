@@ -186,7 +186,9 @@ class MUV_PT_UVEdit_UVManipulation(bpy.types.Panel):
                 sc.muv_pack_uv_accurate_island_copy
             ops.stride = sc.muv_pack_uv_stride
             ops.apply_pack_uv = sc.muv_pack_uv_apply_pack_uv
+            ops.pack_method = sc.muv_pack_uv_pack_method
             box.prop(sc, "muv_pack_uv_apply_pack_uv")
+            box.prop(sc, "muv_pack_uv_pack_method")
             box.prop(sc, "muv_pack_uv_accurate_island_copy")
             box.label(text="Allowable Center Deviation:")
             box.prop(sc, "muv_pack_uv_allowable_center_deviation", text="")
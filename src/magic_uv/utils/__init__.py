@@ -10,11 +10,23 @@ if "bpy" in locals():
     importlib.reload(bl_class_registry)
     importlib.reload(compatibility)
     importlib.reload(graph)
+    importlib.reload(island)
+    importlib.reload(packing)
+    importlib.reload(polygon)
     importlib.reload(property_class_registry)
+    importlib.reload(spatial)
+    importlib.reload(transform)
+    importlib.reload(uv_array)
 else:
     from . import bl_class_registry
     from . import compatibility
     from . import graph
+    from . import island
+    from . import packing
+    from . import polygon
     from . import property_class_registry
+    from . import spatial
+    from . import transform
+    from . import uv_array
 
 import bpy
@@ -5,13 +5,35 @@ __status__ = "production"
 __version__ = "6.6"
 __date__ = "22 Apr 2022"
 
+import functools
+
 import bpy
 
 from .. import common
 
 
+# Methods of the operator which are measured in profiling mode.
+_PROFILED_METHODS = ('execute', 'invoke', 'modal')
+
+
+def _make_profiled_method(method_name, func, span_name):
+    # Blender checks the number of arguments of the method on registering
+    # the class, so the wrapper must have the same arguments.
+    if method_name == 'execute':
+        def wrapper(self, context):
+            with common.profile_span(span_name, 'operator'):
+                return func(self, context)
+    else:
+        def wrapper(self, context, event):
+            with common.profile_span(span_name, 'operator'):
+                return func(self, context, event)
+
+    return functools.update_wrapper(wrapper, func)
+
+
 class BlClassRegistry:
     class_list = []
+    __original_methods = {}     # { class: { method name: function } }
 
     def __init__(self, *_, **kwargs):
         self.legacy = kwargs.get('legacy', False)
@@ -47,9 +69,32 @@ class BlClassRegistry:
         cls.class_list.append(new_op)
         common.debug_print("{} is registered.".format(bl_idname))
 
+    @classmethod
+    def __add_profiler(cls, op_class):
+        if not issubclass(op_class, bpy.types.Operator):
+            return
+
+        originals = {}
+        for method_name in _PROFILED_METHODS:
+            func = op_class.__dict__.get(method_name)
+            if func is None:
+                continue
+            originals[method_name] = func
+            span_name = "{}.{}".format(op_class.bl_idname, method_name)
+            setattr(op_class, method_name,
+                    _make_profiled_method(method_name, func, span_name))
+        cls.__original_methods[op_class] = originals
+
+    @classmethod
+    def __remove_profiler(cls, op_class):
+        originals = cls.__original_methods.pop(op_class, {})
+        for method_name, func in originals.items():
+            setattr(op_class, method_name, func)
+
     @classmethod
     def register(cls):
         for class_ in cls.class_list:
+            cls.__add_profiler(class_["class"])
             bpy.utils.register_class(class_["class"])
             common.debug_print("{} is registered to Blender."
                                .format(class_["bl_idname"]))
@@ -58,6 +103,7 @@ class BlClassRegistry:
     def unregister(cls):
         for class_ in cls.class_list:
             bpy.utils.unregister_class(class_["class"])
+            cls.__remove_profiler(class_["class"])
             common.debug_print("{} is unregistered from Blender."
                                .format(class_["bl_idname"]))
 
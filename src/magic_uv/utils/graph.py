@@ -5,6 +5,8 @@ __status__ = "production"
 __version__ = "6.6"
 __date__ = "22 Apr 2022"
 
+import numpy as np
+
 
 class Node:
     def __init__(self, key, value=None):
@@ -64,6 +66,58 @@ class Graph:
         return self.nodes[key]
 
 
+def weld_points(points, quantum=None):
+    """
+    Group the points which have the same coordinates by hashing.
+    When quantum is specified, coordinates are quantized by quantum before
+    comparing.
+    Return (labels, representatives). labels[i] is the group index of the
+    i-th point, and representatives[j] is the index of the first point in
+    the j-th group. Groups are numbered in order of their first point.
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    if quantum is not None:
+        points = np.floor(points / quantum + 0.5).astype(np.int64)
+
+    labels = np.empty(len(points), dtype=np.int64)
+    representatives = []
+    groups = {}     # { coordinates: group index }
+    for i, p in enumerate(map(tuple, points.tolist())):
+        group = groups.get(p)
+        if group is None:
+            group = len(representatives)
+            groups[p] = group
+            representatives.append(i)
+        labels[i] = group
+
+    return labels, np.array(representatives, dtype=np.int64)
+
+
+def make_csr_adjacency(nodes_1, nodes_2, num_nodes):
+    """
+    Make the compressed sparse row adjacency of the undirected graph whose
+    edges are (nodes_1[i], nodes_2[i]). Duplicated edges are removed.
+    Adjacent nodes of the i-th node are
+    neighbors[offsets[i]:offsets[i + 1]] in ascending order.
+    Return (neighbors, offsets).
+    """
+
+    nodes_1 = np.asarray(nodes_1, dtype=np.int64)
+    nodes_2 = np.asarray(nodes_2, dtype=np.int64)
+
+    # Sort and remove duplicates of the edges in both directions at once.
+    keys = np.unique(np.concatenate((nodes_1 * num_nodes + nodes_2,
+                                     nodes_2 * num_nodes + nodes_1)))
+    sources = keys // num_nodes
+    targets = keys % num_nodes
+
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=num_nodes), out=offsets[1:])
+
+    return targets, offsets
+
+
 def dump_graph(graph):
     print("=== Node ===")
     for _, node in graph.nodes.items():
@@ -74,62 +128,100 @@ def dump_graph(graph):
         print("{} - {}".format(edge.node_1.key, edge.node_2.key))
 
 
-# VF2 algorithm
-#   Ref: https://stackoverflow.com/questions/8176298/
-#            vf2-algorithm-steps-with-example
-#   Ref: https://github.com/satemochi/saaaaah/blob/master/geometric_misc/
-#            isomorph/vf2/vf2.py
-def graph_is_isomorphic(graph_1, graph_2):
-    def is_iso(pairs, matching_node, new_node):
-        # Algorithm:
-        #   1. The degree is same (It's faster).
-        #   2. The connected node is same.
-        if matching_node.degree() != new_node.degree():
-            return False
+def _to_adjacency(graph):
+    """
+    Convert the graph to the list of the neighbor sets over integer node
+    IDs. IDs are assigned in order of the sorted node keys.
+    Return (nodes, neighbors).
+    """
+
+    nodes = [graph.nodes[k] for k in sorted(graph.nodes.keys())]
+    node_to_id = {n: i for i, n in enumerate(nodes)}
+    neighbors = [set() for _ in nodes]
+    for e in graph.edges:
+        i1 = node_to_id[e.node_1]
+        i2 = node_to_id[e.node_2]
+        neighbors[i1].add(i2)
+        neighbors[i2].add(i1)
+
+    return nodes, neighbors
+
+
+def _refine_colors(neighbors_1, neighbors_2, max_iterations):
+    """
+    Color the nodes of both graphs by the color refinement (1-dimensional
+    Weisfeiler-Lehman), starting from the degree.
+    Nodes which can be matched by the isomorphism have the same color.
+    """
+
+    colors_1 = [len(n) for n in neighbors_1]
+    colors_2 = [len(n) for n in neighbors_2]
+    num_colors = len(set(colors_1) | set(colors_2))
+    for _ in range(max_iterations):
+        palette = {}
+        signatures_1 = [(c, tuple(sorted(colors_1[j] for j in n)))
+                        for c, n in zip(colors_1, neighbors_1)]
+        signatures_2 = [(c, tuple(sorted(colors_2[j] for j in n)))
+                        for c, n in zip(colors_2, neighbors_2)]
+        colors_1 = [palette.setdefault(s, len(palette))
+                    for s in signatures_1]
+        colors_2 = [palette.setdefault(s, len(palette))
+                    for s in signatures_2]
+        if len(palette) == num_colors:
+            break
+        num_colors = len(palette)
+
+    return colors_1, colors_2
+
+
+def _make_matching_order(neighbors, colors, color_counts):
+    """
+    Order the nodes to be matched (VF2++). Nodes are visited in BFS order
+    from the node whose color is rarest, and nodes in the same BFS level
+    are ordered by the number of the neighbors already ordered, the degree
+    and the rarity of the color.
+    """
+
+    num_nodes = len(neighbors)
+    ordered = [False] * num_nodes
+    num_ordered_neighbors = [0] * num_nodes
+    order = []
+    remaining = sorted(range(num_nodes),
+                       key=lambda i: (color_counts[colors[i]],
+                                      -len(neighbors[i])))
+    for root in remaining:
+        if ordered[root]:
+            continue
+
+        level = [root]
+        ordered[root] = True
+        while level:
+            level.sort(key=lambda i: (-num_ordered_neighbors[i],
+                                      -len(neighbors[i]),
+                                      color_counts[colors[i]]))
+            next_level = []
+            for i in level:
+                order.append(i)
+                for j in neighbors[i]:
+                    num_ordered_neighbors[j] += 1
+                    if not ordered[j]:
+                        ordered[j] = True
+                        next_level.append(j)
+            level = next_level
 
-        matching_connected = [c.key for c in matching_node.connected_nodes()]
-        new_connected = [c.key for c in new_node.connected_nodes()]
-
-        for p in pairs:
-            n1 = p[0]
-            n2 = p[1]
-            if n1 in matching_connected and n2 not in new_connected:
-                return False
-            if n1 not in matching_connected and n2 in new_connected:
-                return False
-
-        return True
-
-    def dfs(graph_1, graph_2):
-        def generate_pair(g1, g2, pairs):
-            remove_1 = [p[0] for p in pairs]
-            remove_2 = [p[1] for p in pairs]
-
-            keys_1 = sorted(list(set(g1.nodes.keys()) - set(remove_1)))
-            keys_2 = sorted(list(set(g2.nodes.keys()) - set(remove_2)))
-            for k1 in keys_1:
-                for k2 in keys_2:
-                    yield (k1, k2)
-
-        pairs = []
-        stack = [generate_pair(graph_1, graph_2, pairs)]
-        while stack:
-            try:
-                k1, k2 = next(stack[-1])
-                n1 = graph_1.get_node(k1)
-                n2 = graph_2.get_node(k2)
-                if is_iso(pairs, n1, n2):
-                    pairs.append([k1, k2])
-                    stack.append(generate_pair(graph_1, graph_2, pairs))
-                    if len(pairs) == len(graph_1.nodes):
-                        return True, pairs
-            except StopIteration:
-                stack.pop()
-                diff = len(pairs) - len(stack)
-                for _ in range(diff):
-                    pairs.pop()
-
-        return False, []
+    return order
+
+
+def graph_is_isomorphic(graph_1, graph_2):
+    """
+    Find the isomorphism from graph_1 to graph_2 by VF2++ algorithm.
+    Return (True, { node of graph_1: node of graph_2 }) if found.
+    When there are some isomorphisms, the nodes whose key has the same
+    rank in each graph are preferred to be matched, so that the copy of
+    the same mesh is matched as it is.
+    Ref: A. Juttner and P. Madarasi, "VF2++ - An improved subgraph
+         isomorphism algorithm", Discrete Applied Mathematics, 2018
+    """
 
     # First, check simple condition.
     if len(graph_1.nodes) != len(graph_2.nodes):
@@ -137,14 +229,150 @@ def graph_is_isomorphic(graph_1, graph_2):
     if len(graph_1.edges) != len(graph_2.edges):
         return False, {}
 
-    is_isomorphic, pairs = dfs(graph_1, graph_2)
+    nodes_1, neighbors_1 = _to_adjacency(graph_1)
+    nodes_2, neighbors_2 = _to_adjacency(graph_2)
+    num_nodes = len(nodes_1)
+    if num_nodes == 0:
+        return True, {}
+
+    # Nodes with the different color can not be matched.
+    colors_1, colors_2 = _refine_colors(neighbors_1, neighbors_2, 3)
+    color_counts = {}
+    for c in colors_1:
+        color_counts[c] = color_counts.get(c, 0) + 1
+    color_counts_2 = {}
+    for c in colors_2:
+        color_counts_2[c] = color_counts_2.get(c, 0) + 1
+    if color_counts != color_counts_2:
+        return False, {}
+    color_to_nodes_2 = {}
+    for i, c in enumerate(colors_2):
+        color_to_nodes_2.setdefault(c, []).append(i)
+
+    order = _make_matching_order(neighbors_1, colors_1, color_counts)
+
+    mapping_1 = [-1] * num_nodes
+    mapping_2 = [-1] * num_nodes
+    # Number of the matched neighbors. The unmatched node which has the
+    # matched neighbors is in the terminal set.
+    terminal_1 = [0] * num_nodes
+    terminal_2 = [0] * num_nodes
+
+    def candidates(n1):
+        # Candidates are the unmatched neighbors of the node matched to
+        # the matched neighbor of n1.
+        color = colors_1[n1]
+        for m in neighbors_1[n1]:
+            if mapping_1[m] != -1:
+                cands = [n2 for n2 in neighbors_2[mapping_1[m]]
+                         if mapping_2[n2] == -1 and colors_2[n2] == color]
+                break
+        else:
+            cands = [n2 for n2 in color_to_nodes_2[color]
+                     if mapping_2[n2] == -1]
+        cands.sort(key=lambda n2: abs(n2 - n1))
+        return cands
+
+    def is_feasible(n1, n2):
+        if terminal_1[n1] != terminal_2[n2]:
+            return False
+
+        num_terminals_1 = 0
+        num_others_1 = 0
+        for m in neighbors_1[n1]:
+            if mapping_1[m] != -1:
+                if mapping_1[m] not in neighbors_2[n2]:
+                    return False
+            elif terminal_1[m] > 0:
+                num_terminals_1 += 1
+            else:
+                num_others_1 += 1
+
+        num_terminals_2 = 0
+        num_others_2 = 0
+        for m in neighbors_2[n2]:
+            if mapping_2[m] != -1:
+                continue
+            if terminal_2[m] > 0:
+                num_terminals_2 += 1
+            else:
+                num_others_2 += 1
+
+        if num_terminals_1 != num_terminals_2:
+            return False
+        return num_others_1 == num_others_2
+
+    def match(n1, n2):
+        mapping_1[n1] = n2
+        mapping_2[n2] = n1
+        for m in neighbors_1[n1]:
+            terminal_1[m] += 1
+        for m in neighbors_2[n2]:
+            terminal_2[m] += 1
+
+    def unmatch(n1, n2):
+        mapping_1[n1] = -1
+        mapping_2[n2] = -1
+        for m in neighbors_1[n1]:
+            terminal_1[m] -= 1
+        for m in neighbors_2[n2]:
+            terminal_2[m] -= 1
+
+    # Depth first search without recursion.
+    stack = [iter(candidates(order[0]))]
+    while stack:
+        depth = len(stack) - 1
+        n1 = order[depth]
+        if mapping_1[n1] != -1:
+            unmatch(n1, mapping_1[n1])
+
+        for n2 in stack[-1]:
+            if is_feasible(n1, n2):
+                match(n1, n2)
+                break
+        else:
+            stack.pop()
+            continue
+
+        if depth + 1 == num_nodes:
+            node_pairs = {}
+            for i, j in enumerate(mapping_1):
+                node_pairs[nodes_1[i]] = nodes_2[j]
+            return True, node_pairs
+        stack.append(iter(candidates(order[depth + 1])))
+
+    return False, {}
+
+
+def calc_graph_signature(graph, node_labels=None, edge_labels=None,
+                         num_iterations=3):
+    """
+    Calculate the signature of the graph by Weisfeiler-Lehman hashing.
+    Isomorphic graphs have the same signature, so the graphs whose
+    signatures are different are not isomorphic (the converse is not
+    always true).
+    node_labels is { node key: label }, and edge_labels[i] is the label of
+    graph.edges[i]. Labels must be hashable, and are also compared.
+    Signature is only valid in the same Python process.
+    """
+
+    nodes = list(graph.nodes.values())
+    node_to_id = {n: i for i, n in enumerate(nodes)}
+    neighbors = [[] for _ in nodes]     # [(node ID, edge label)]
+    for i, e in enumerate(graph.edges):
+        label = edge_labels[i] if edge_labels is not None else None
+        i1 = node_to_id[e.node_1]
+        i2 = node_to_id[e.node_2]
+        neighbors[i1].append((i2, label))
+        neighbors[i2].append((i1, label))
 
-    node_pairs = {}
-    for pair in pairs:
-        n1 = pair[0]
-        n2 = pair[1]
-        node_1 = graph_1.get_node(n1)
-        node_2 = graph_2.get_node(n2)
-        node_pairs[node_1] = node_2
+    if node_labels is None:
+        colors = [hash(len(n)) for n in neighbors]
+    else:
+        colors = [hash((len(neighbors[i]), node_labels[n.key]))
+                  for i, n in enumerate(nodes)]
+    for _ in range(num_iterations):
+        colors = [hash((c, tuple(sorted(hash((colors[j], l)) for j, l in n))))
+                  for c, n in zip(colors, neighbors)]
 
-    return is_isomorphic, node_pairs
+    return len(nodes), len(graph.edges), hash(tuple(sorted(colors)))
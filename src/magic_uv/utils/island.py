@@ -0,0 +1,389 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "6.6"
+__date__ = "22 Apr 2022"
+
+import numpy as np
+
+
+# Island tables are compacted when the fraction of the removed islands
+# exceeds this value.
+_COMPACTION_RATIO = 0.5
+
+
+def union_find(num_nodes, nodes_1, nodes_2):
+    """
+    Label connected components by the vectorized union-find.
+    nodes_1[i] and nodes_2[i] are the end nodes of the i-th edge.
+    Return the root node of each node. The root node is the node whose
+    index is the smallest in the component.
+    """
+
+    parent = np.arange(num_nodes, dtype=np.int64)
+    nodes_1 = np.asarray(nodes_1, dtype=np.int64)
+    nodes_2 = np.asarray(nodes_2, dtype=np.int64)
+
+    while nodes_1.size != 0:
+        roots_1 = parent[nodes_1]
+        roots_2 = parent[nodes_2]
+        unmerged = roots_1 != roots_2
+        if not unmerged.any():
+            break
+        nodes_1 = nodes_1[unmerged]
+        nodes_2 = nodes_2[unmerged]
+        roots_1 = roots_1[unmerged]
+        roots_2 = roots_2[unmerged]
+
+        # Hook the larger root to the smaller root.
+        # parent[i] <= i is always satisfied, so no cycle is created.
+        np.minimum.at(parent, np.maximum(roots_1, roots_2),
+                      np.minimum(roots_1, roots_2))
+
+        # Compress the path until all nodes point to the root.
+        while True:
+            grand_parent = parent[parent]
+            if np.array_equal(grand_parent, parent):
+                break
+            parent = grand_parent
+
+    return parent
+
+
+def group_same_rows(keys):
+    """
+    Group the rows which have same values.
+    Return the sort order of the rows and the index (in the original array)
+    of the first row in the group which each sorted row belongs to.
+    """
+
+    keys = np.asarray(keys)
+    num_rows = keys.shape[0]
+    if num_rows == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty
+
+    # np.lexsort sorts by the last key first.
+    order = np.lexsort(keys.T[::-1])
+    sorted_keys = keys[order]
+
+    boundary = np.empty(num_rows, dtype=bool)
+    boundary[0] = True
+    boundary[1:] = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    group_ids = np.cumsum(boundary) - 1
+    first_rows = order[np.flatnonzero(boundary)][group_ids]
+
+    return order, first_rows
+
+
+def make_uv_vert_keys(loop_verts, loop_uvs, precision=5):
+    """
+    Make the key of the UV vertex for each loop.
+    Loops which have same vertex and same UV coordinate (rounded by
+    precision) share the UV vertex.
+    """
+
+    loop_uvs = np.asarray(loop_uvs, dtype=np.float64).reshape(-1, 2)
+    keys = np.empty((loop_uvs.shape[0], 3), dtype=np.int64)
+    keys[:, 0] = loop_verts
+    keys[:, 1:] = np.round(loop_uvs * (10 ** precision))
+
+    return keys
+
+
+def label_islands(num_faces, loop_faces, loop_verts, loop_uvs, precision=5):
+    """
+    Label UV islands.
+    loop_faces, loop_verts and loop_uvs are the face index (0 to num_faces-1),
+    vertex index and UV coordinate of each loop.
+    Faces are connected when they share the loop which has same vertex and
+    same UV coordinate.
+    Return the number of islands and the island index of each face.
+    Island index is numbered in order of the first face in the island.
+    """
+
+    loop_faces = np.asarray(loop_faces, dtype=np.int64)
+    keys = make_uv_vert_keys(loop_verts, loop_uvs, precision)
+
+    # Connect each loop's face to the face of the first loop which shares
+    # the UV vertex.
+    order, first_loops = group_same_rows(keys)
+    roots = union_find(num_faces, loop_faces[order],
+                       loop_faces[first_loops])
+
+    island_roots, face_islands = np.unique(roots, return_inverse=True)
+
+    return len(island_roots), face_islands.reshape(-1)
+
+
+def segment_reduce(ufunc, values, segment_ids, num_segments, initial):
+    """
+    Reduce values which belong to the same segment by ufunc
+    (ex. np.add, np.minimum).
+    Return the array whose i-th element is the reduced value of the i-th
+    segment. The value of the empty segment is initial.
+    """
+
+    values = np.asarray(values)
+    segment_ids = np.asarray(segment_ids, dtype=np.int64)
+    result = np.full((num_segments,) + values.shape[1:], initial,
+                     dtype=values.dtype)
+    if segment_ids.size == 0:
+        return result
+
+    # ufunc.reduceat requires the values which are sorted by segment.
+    if np.any(segment_ids[1:] < segment_ids[:-1]):
+        order = np.argsort(segment_ids, kind='mergesort')
+        segment_ids = segment_ids[order]
+        values = values[order]
+
+    starts = np.flatnonzero(
+        np.concatenate(([True], segment_ids[1:] != segment_ids[:-1])))
+    result[segment_ids[starts]] = ufunc.reduceat(values, starts, axis=0)
+
+    return result
+
+
+def calc_uv_bounds(num_groups, loop_groups, loop_uvs):
+    """
+    Calculate the bounding box and the average of UV coordinates in each
+    group (ex. face, island).
+    Return the minimum, maximum, average of UV coordinates and the number of
+    UV coordinates in each group.
+    """
+
+    loop_uvs = np.asarray(loop_uvs, dtype=np.float64).reshape(-1, 2)
+    min_uvs = segment_reduce(np.minimum, loop_uvs, loop_groups, num_groups,
+                             np.inf)
+    max_uvs = segment_reduce(np.maximum, loop_uvs, loop_groups, num_groups,
+                             -np.inf)
+    sum_uvs = segment_reduce(np.add, loop_uvs, loop_groups, num_groups, 0.0)
+    num_uvs = np.bincount(np.asarray(loop_groups, dtype=np.int64),
+                          minlength=num_groups)[:num_groups]
+    ave_uvs = sum_uvs / np.maximum(num_uvs, 1)[:, np.newaxis]
+
+    return min_uvs, max_uvs, ave_uvs, num_uvs
+
+
+def make_csr(item_groups, num_groups):
+    """
+    Make the compressed sparse row table which maps the group to the items.
+    Items of the i-th group are items[offsets[i]:offsets[i + 1]].
+    """
+
+    item_groups = np.asarray(item_groups, dtype=np.int64)
+    items = np.argsort(item_groups, kind='mergesort')
+    offsets = np.zeros(num_groups + 1, dtype=np.int64)
+    np.cumsum(np.bincount(item_groups, minlength=num_groups)[:num_groups],
+              out=offsets[1:])
+
+    return items, offsets
+
+
+def gather_csr(items, offsets, groups):
+    """
+    Gather the items which belong to groups from the compressed sparse row
+    table
+    """
+
+    groups = np.asarray(groups, dtype=np.int64)
+    starts = offsets[groups]
+    counts = offsets[groups + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return items[:0]
+    base = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+
+    return items[base + np.arange(total)]
+
+
+class IslandIndex:
+    """
+    Index of UV islands which is updated incrementally.
+    Keep the face -> island and island -> UV bounds tables.
+    When the UV coordinates of some loops are changed, only the islands
+    which include the changed loops or connect to the changed loops are
+    labeled again.
+    Removed islands (whose number of UV coordinates is 0) are kept in the
+    tables until they are compacted, so the island index may be changed by
+    the update.
+    """
+
+    def __init__(self, num_faces, loop_faces, loop_verts, loop_uvs,
+                 precision=5):
+        self.precision = precision
+        self.num_faces = num_faces
+        self.loop_faces = np.array(loop_faces, dtype=np.int64)
+        self.loop_verts = np.array(loop_verts, dtype=np.int64)
+        self.loop_uvs = np.array(loop_uvs, dtype=np.float64).reshape(-1, 2)
+        self.__keys = make_uv_vert_keys(self.loop_verts, self.loop_uvs,
+                                        precision)
+
+        # Topology is not changed, so these tables are built only once.
+        self.__face_loops, self.__face_loop_offsets = \
+            make_csr(self.loop_faces, num_faces)
+        num_verts = int(self.loop_verts.max()) + 1 \
+            if self.loop_verts.size else 0
+        self.__vert_loops, self.__vert_loop_offsets = \
+            make_csr(self.loop_verts, num_verts)
+
+        num_islands, self.face_islands = label_islands(
+            num_faces, self.loop_faces, self.loop_verts, self.loop_uvs,
+            precision)
+        self.face_min_uv, self.face_max_uv, self.face_ave_uv, _ = \
+            calc_uv_bounds(num_faces, self.loop_faces, self.loop_uvs)
+        self.island_min_uv, self.island_max_uv, self.island_ave_uv, \
+            self.island_num_uv = calc_uv_bounds(
+                num_islands, self.face_islands[self.loop_faces],
+                self.loop_uvs)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in vars(self).values()
+                   if isinstance(a, np.ndarray))
+
+    def get_islands(self):
+        """
+        Return the indices of the alive islands
+        """
+
+        return np.flatnonzero(self.island_num_uv > 0)
+
+    def find_loops(self, faces, verts):
+        """
+        Find the loop of faces[i] whose vertex is verts[i].
+        Return the array whose element is -1 if the loop is not found.
+        """
+
+        faces = np.asarray(faces, dtype=np.int64)
+        verts = np.asarray(verts, dtype=np.int64)
+        counts = self.__face_loop_offsets[faces + 1] - \
+            self.__face_loop_offsets[faces]
+        rows = np.repeat(np.arange(len(faces)), counts)
+        cand_loops = gather_csr(self.__face_loops, self.__face_loop_offsets,
+                                faces)
+        matched = self.loop_verts[cand_loops] == verts[rows]
+
+        loops = np.full(len(faces), -1, dtype=np.int64)
+        loops[rows[matched]] = cand_loops[matched]
+
+        return loops
+
+    def __find_connected_faces(self, loops):
+        """
+        Find the faces which share the UV vertex with loops
+        """
+
+        cand_loops = gather_csr(self.__vert_loops, self.__vert_loop_offsets,
+                                np.unique(self.loop_verts[loops]))
+        keys = np.concatenate((self.__keys[cand_loops], self.__keys[loops]))
+        order, first_rows = group_same_rows(keys)
+        row_groups = np.empty(len(keys), dtype=np.int64)
+        row_groups[order] = first_rows
+
+        shared = np.zeros(len(keys), dtype=bool)
+        shared[row_groups[len(cand_loops):]] = True
+        connected = shared[row_groups[:len(cand_loops)]]
+
+        return self.loop_faces[cand_loops[connected]]
+
+    def update_uvs(self, loops, uvs):
+        """
+        Update UV coordinates of loops, and label again the islands
+        affected by the update
+        """
+
+        loops = np.asarray(loops, dtype=np.int64)
+        uvs = np.asarray(uvs, dtype=np.float64).reshape(-1, 2)
+        if loops.size == 0:
+            return
+
+        self.loop_uvs[loops] = uvs
+        self.__keys[loops] = make_uv_vert_keys(self.loop_verts[loops], uvs,
+                                               self.precision)
+
+        # The islands which may be split (include changed faces) or merged
+        # (connect to changed loops) are affected.
+        dirty_faces = np.unique(self.loop_faces[loops])
+        affected_islands = np.unique(np.concatenate((
+            self.face_islands[dirty_faces],
+            self.face_islands[self.__find_connected_faces(loops)])))
+        is_affected = np.zeros(len(self.island_num_uv), dtype=bool)
+        is_affected[affected_islands] = True
+        affected_faces = np.flatnonzero(is_affected[self.face_islands])
+
+        # Label the affected faces.
+        sub_loops = gather_csr(self.__face_loops, self.__face_loop_offsets,
+                               affected_faces)
+        face_to_sub = np.empty(self.num_faces, dtype=np.int64)
+        face_to_sub[affected_faces] = np.arange(len(affected_faces))
+        sub_loop_faces = face_to_sub[self.loop_faces[sub_loops]]
+        num_sub_islands, sub_face_islands = label_islands(
+            len(affected_faces), sub_loop_faces, self.loop_verts[sub_loops],
+            self.loop_uvs[sub_loops], self.precision)
+
+        # Reuse the index of the affected islands, and extend the tables
+        # if the number of islands is increased.
+        num_reused = min(num_sub_islands, len(affected_islands))
+        num_new = num_sub_islands - num_reused
+        first_new = len(self.island_num_uv)
+        new_islands = np.concatenate((
+            affected_islands[:num_reused],
+            np.arange(first_new, first_new + num_new)))
+        if num_new > 0:
+            self.island_min_uv = np.concatenate(
+                (self.island_min_uv, np.full((num_new, 2), np.inf)))
+            self.island_max_uv = np.concatenate(
+                (self.island_max_uv, np.full((num_new, 2), -np.inf)))
+            self.island_ave_uv = np.concatenate(
+                (self.island_ave_uv, np.zeros((num_new, 2))))
+            self.island_num_uv = np.concatenate(
+                (self.island_num_uv,
+                 np.zeros(num_new, dtype=self.island_num_uv.dtype)))
+        removed_islands = affected_islands[num_reused:]
+        self.island_min_uv[removed_islands] = np.inf
+        self.island_max_uv[removed_islands] = -np.inf
+        self.island_ave_uv[removed_islands] = 0.0
+        self.island_num_uv[removed_islands] = 0
+
+        self.face_islands[affected_faces] = new_islands[sub_face_islands]
+
+        # Update UV bounds of the changed faces and the affected islands.
+        dirty_loops = gather_csr(self.__face_loops, self.__face_loop_offsets,
+                                 dirty_faces)
+        face_to_dirty = np.empty(self.num_faces, dtype=np.int64)
+        face_to_dirty[dirty_faces] = np.arange(len(dirty_faces))
+        min_uv, max_uv, ave_uv, _ = calc_uv_bounds(
+            len(dirty_faces), face_to_dirty[self.loop_faces[dirty_loops]],
+            self.loop_uvs[dirty_loops])
+        self.face_min_uv[dirty_faces] = min_uv
+        self.face_max_uv[dirty_faces] = max_uv
+        self.face_ave_uv[dirty_faces] = ave_uv
+
+        min_uv, max_uv, ave_uv, num_uv = calc_uv_bounds(
+            num_sub_islands, sub_face_islands[sub_loop_faces],
+            self.loop_uvs[sub_loops])
+        self.island_min_uv[new_islands] = min_uv
+        self.island_max_uv[new_islands] = max_uv
+        self.island_ave_uv[new_islands] = ave_uv
+        self.island_num_uv[new_islands] = num_uv
+
+        num_islands = len(self.island_num_uv)
+        num_removed = num_islands - np.count_nonzero(self.island_num_uv)
+        if num_removed > num_islands * _COMPACTION_RATIO:
+            self.compact()
+
+    def compact(self):
+        """
+        Remove the removed islands from the island tables
+        """
+
+        islands = self.get_islands()
+        island_map = np.full(len(self.island_num_uv), -1, dtype=np.int64)
+        island_map[islands] = np.arange(len(islands))
+        self.face_islands = island_map[self.face_islands]
+        self.island_min_uv = self.island_min_uv[islands]
+        self.island_max_uv = self.island_max_uv[islands]
+        self.island_ave_uv = self.island_ave_uv[islands]
+        self.island_num_uv = self.island_num_uv[islands]
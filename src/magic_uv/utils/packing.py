@@ -0,0 +1,258 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "6.6"
+__date__ = "22 Apr 2022"
+
+import numpy as np
+
+
+# Number of the packing tried by pack_rects to adjust the width of the
+# bin and the margin.
+_MAX_PACKING_ITERATIONS = 4
+
+# Ratio of the padding for the next packing to the padding which keeps the
+# margin of the last packing.
+_PADDING_GROWTH = 1.1
+
+
+class _Skyline:
+    """
+    Skyline of the bin whose width is fixed. The skyline is the list of
+    the horizontal segments sorted by x, and rectangles are placed on it.
+    Segments are stored in the buffers which are updated in place around
+    the placed rectangle, and the buffer of the heights is terminated by
+    -inf as the sentinel of the range maximum.
+    """
+
+    def __init__(self, width):
+        self.width = width
+        self.eps = width * 1e-9
+        self.__xs = np.zeros(16)        # left end of the segments
+        self.__ys = np.full(16, -np.inf)    # height of the segments
+        self.__ys[0] = 0.0
+        self.__num_segments = 1
+        self.height = 0.0
+
+    @property
+    def xs(self):
+        return self.__xs[:self.__num_segments]
+
+    @property
+    def ys(self):
+        return self.__ys[:self.__num_segments]
+
+    def __calc_range_max(self, firsts, lasts):
+        """
+        Calculate the maximum height of the segments from firsts[i] to
+        lasts[i]. firsts[i] <= lasts[i] must be satisfied.
+        """
+
+        # reduceat reduces the segments from indices[2i] to
+        # indices[2i + 1] - 1. indices[2i + 1] may be the number of the
+        # segments, which points to the sentinel.
+        indices = np.empty(len(firsts) * 2, dtype=np.int64)
+        indices[0::2] = firsts
+        indices[1::2] = lasts + 1
+        ys = self.__ys[:self.__num_segments + 1]
+        return np.maximum.reduceat(ys, indices)[0::2]
+
+    def find_position(self, width, height):
+        """
+        Find the bottom-left position where the rectangle is placed.
+        Rectangle lies on the highest segment under it, and the position
+        whose top is lowest (and leftmost) is chosen.
+        Return (x, y) or None if the rectangle can not be placed.
+        """
+
+        xs = self.xs
+        num_starts = int(xs.searchsorted(self.width - width + self.eps,
+                                         side='right'))
+        if num_starts == 0:
+            return None
+
+        firsts = np.arange(num_starts)
+        lasts = xs.searchsorted(xs[:num_starts] + (width - self.eps),
+                                side='left') - 1
+        tops = self.__calc_range_max(firsts, np.maximum(lasts, firsts))
+        best = int(tops.argmin())
+
+        return float(xs[best]), float(tops[best])
+
+    def place(self, x, y, width, height):
+        """
+        Place the rectangle at (x, y), and raise the skyline.
+        """
+
+        n = self.__num_segments
+        xs = self.xs
+        ys = self.ys
+        end = x + width
+        first = int(xs.searchsorted(x - self.eps, side='left'))
+        # Segment including the right end of the rectangle continues after
+        # the rectangle.
+        last = int(xs.searchsorted(end + self.eps, side='right')) - 1
+        segments = [(x, y + height)]
+        if end < self.width - self.eps and (
+                last + 1 >= n or xs[last + 1] > end + self.eps):
+            segments.append((end, float(ys[last])))
+
+        # Merge the segments at the same height with the neighbors.
+        # The other segments are not changed since they are merged
+        # already.
+        lo = max(first - 1, 0)
+        hi = min(last + 2, n)
+        segments = list(zip(xs[lo:first].tolist(), ys[lo:first].tolist())) \
+            + segments \
+            + list(zip(xs[last + 1:hi].tolist(), ys[last + 1:hi].tolist()))
+        merged = [segments[0]]
+        for seg in segments[1:]:
+            if seg[1] != merged[-1][1]:
+                merged.append(seg)
+
+        # Replace the segments from lo to hi - 1 by the merged ones.
+        new_n = n - (hi - lo) + len(merged)
+        if new_n + 1 > len(self.__xs):
+            capacity = max(len(self.__xs) * 2, new_n + 1)
+            self.__xs = np.resize(self.__xs, capacity)
+            ys_buffer = np.full(capacity, -np.inf)
+            ys_buffer[:n + 1] = self.__ys[:n + 1]
+            self.__ys = ys_buffer
+        mid = lo + len(merged)
+        self.__xs[mid:new_n] = self.__xs[hi:n]
+        self.__ys[mid:new_n + 1] = self.__ys[hi:n + 1]
+        self.__xs[lo:mid], self.__ys[lo:mid] = zip(*merged)
+        self.__num_segments = new_n
+
+        self.height = max(self.height, y + height)
+
+
+def _pack_skyline(sizes, bin_width, rotate):
+    """
+    Pack the rectangles into the bin whose width is bin_width by the
+    skyline bottom-left algorithm. Rectangles are placed in order of
+    their heights.
+    Return (positions, rotated, used width, used height).
+    """
+
+    num_rects = len(sizes)
+    if rotate:
+        order = np.lexsort((np.min(sizes, axis=1), np.max(sizes, axis=1)))
+    else:
+        order = np.lexsort((sizes[:, 0], sizes[:, 1]))
+
+    skyline = _Skyline(bin_width)
+    positions = np.zeros((num_rects, 2))
+    rotated = np.zeros(num_rects, dtype=bool)
+    used_width = 0.0
+    for i in order[::-1].tolist():
+        w, h = sizes[i].tolist()
+        best = skyline.find_position(w, h)
+        if rotate and w != h:
+            cand = skyline.find_position(h, w)
+            if best is None:
+                use_cand = True
+            else:
+                use_cand = cand is not None and cand[1] + w < best[1] + h
+            if use_cand:
+                best = cand
+                w, h = h, w
+                rotated[i] = True
+        x, y = best
+        skyline.place(x, y, w, h)
+        positions[i] = (x, y)
+        used_width = max(used_width, x + w)
+
+    return positions, rotated, used_width, skyline.height
+
+
+def pack_rects(sizes, margin=0.0, rotate=False):
+    """
+    Pack the rectangles whose sizes are sizes[i] (width, height) into the
+    unit square by the skyline algorithm.
+    Rectangles are scaled uniformly to fit in the unit square, and
+    margin is the space between the scaled rectangles (and the border).
+    When rotate is True, rectangles may be rotated by 90 degrees.
+    Return (positions, rotated, scale). i-th rectangle is scaled by
+    scale, rotated counterclockwise when rotated[i] is True, and its lower
+    left corner is placed at positions[i].
+    """
+
+    sizes = np.asarray(sizes, dtype=np.float64).reshape(-1, 2)
+    if len(sizes) == 0:
+        return np.zeros((0, 2)), np.zeros(0, dtype=bool), 1.0
+    if margin < 0.0 or margin >= 1.0:
+        raise ValueError("Invalid margin: {}".format(margin))
+
+    # Degenerated rectangles are packed as tiny ones.
+    sizes = np.maximum(sizes, max(np.max(sizes), 1.0) * 1e-6)
+    if rotate:
+        min_width = np.max(np.min(sizes, axis=1))
+    else:
+        min_width = np.max(sizes[:, 0])
+
+    # Padding is the margin in the size before scaling, and the scale is
+    # not known until packed. So the packing is repeated with the padding
+    # and the width of the bin which are adjusted by the last packing.
+    # The smallest packing which keeps the margin is chosen, or the one
+    # whose margin is closest when the margin is too large to be kept.
+    bin_width = np.sqrt(np.sum(sizes[:, 0] * sizes[:, 1]))
+    padding = margin * bin_width
+    best = None
+    best_key = None
+    for _ in range(_MAX_PACKING_ITERATIONS):
+        positions, rotated, width, height = _pack_skyline(
+            sizes + padding, max(bin_width, min_width + padding), rotate)
+        extent = max(width, height) + padding
+        if margin > 0.0:
+            kept_ratio = min(padding / (margin * extent), 1.0)
+        else:
+            kept_ratio = 1.0
+        key = (-kept_ratio, extent)
+        if best is None or key < best_key:
+            best = (positions, rotated, padding, extent)
+            best_key = key
+
+        # Make the packed area square. The padding needed for the margin
+        # grows with the padding itself, so it is overestimated to reach
+        # the margin in a few iterations.
+        bin_width = np.sqrt(width * height)
+        padding = margin * extent * _PADDING_GROWTH
+
+    positions, rotated, padding, extent = best
+    scale = 1.0 / extent
+
+    return (positions + padding) * scale, rotated, scale
+
+
+def make_packing_matrices(min_coords, max_coords, positions, rotated,
+                          scale):
+    """
+    Make the affine transform matrices whose shape is (N, 3, 3) which move
+    the boxes (min_coords[i], max_coords[i]) to the packed position (see
+    pack_rects).
+    """
+
+    min_coords = np.asarray(min_coords, dtype=np.float64).reshape(-1, 2)
+    max_coords = np.asarray(max_coords, dtype=np.float64).reshape(-1, 2)
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    rotated = np.asarray(rotated, dtype=bool)
+    heights = max_coords[:, 1] - min_coords[:, 1]
+
+    # Move the lower left corner to the origin, and rotate by 90 degrees
+    # about the origin and move to the right by the height if rotated.
+    matrices = np.zeros((len(min_coords), 3, 3))
+    matrices[:, 0, 0] = np.where(rotated, 0.0, 1.0)
+    matrices[:, 0, 1] = np.where(rotated, -1.0, 0.0)
+    matrices[:, 0, 2] = np.where(rotated, heights + min_coords[:, 1],
+                                 -min_coords[:, 0])
+    matrices[:, 1, 0] = np.where(rotated, 1.0, 0.0)
+    matrices[:, 1, 1] = np.where(rotated, 0.0, 1.0)
+    matrices[:, 1, 2] = np.where(rotated, -min_coords[:, 0],
+                                 -min_coords[:, 1])
+    matrices[:, :2, :] *= scale
+    matrices[:, :2, 2] += positions
+    matrices[:, 2, 2] = 1.0
+
+    return matrices
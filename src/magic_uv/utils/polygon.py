@@ -0,0 +1,279 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "6.6"
+__date__ = "22 Apr 2022"
+
+import numpy as np
+
+from .spatial import _expand_following, _iter_chunks
+
+
+# Clipping a convex polygon by a half plane adds at most one vertex, so the
+# triangle clipped by the three half planes of the triangle has at most
+# 3 + 3 vertices.
+MAX_PIECE_POINTS = 3 + 3
+
+
+def calc_triangle_areas(tris):
+    """
+    Calculate the signed area of 2D triangles.
+    tris is the array whose shape is (N, 3, 2).
+    """
+
+    edges_1 = tris[:, 1] - tris[:, 0]
+    edges_2 = tris[:, 2] - tris[:, 0]
+    cross_1 = edges_1[:, 0] * edges_2[:, 1]
+    cross_2 = edges_1[:, 1] * edges_2[:, 0]
+    return 0.5 * (cross_1 - cross_2)
+
+
+def is_triangle_overlapped(tris_1, tris_2, threshold=0.0):
+    """
+    Test the overlap of the pairs of 2D triangles by separating axis
+    theorem.
+    tris_1 and tris_2 are the arrays whose shape is (N, 3, 2).
+    Return True for each pair of triangles whose interiors overlap.
+    Triangles touching each other (within threshold) and degenerated
+    triangles are not treated as overlapped.
+    """
+
+    tris_1 = np.asarray(tris_1, dtype=np.float64).reshape(-1, 3, 2)
+    tris_2 = np.asarray(tris_2, dtype=np.float64).reshape(-1, 3, 2)
+
+    # Candidate of the separating axis is the normal of each edge.
+    edges = np.concatenate((np.roll(tris_1, -1, axis=1) - tris_1,
+                            np.roll(tris_2, -1, axis=1) - tris_2), axis=1)
+    axes = np.stack((-edges[:, :, 1], edges[:, :, 0]), axis=-1)
+    lengths = np.sqrt(np.sum(axes * axes, axis=-1))
+    valid = lengths > 0.0
+    axes = axes / np.where(valid, lengths, 1.0)[:, :, np.newaxis]
+
+    proj_1 = np.einsum('nak,nvk->nav', axes, tris_1)
+    proj_2 = np.einsum('nak,nvk->nav', axes, tris_2)
+    separated = (proj_1.max(axis=-1) <= proj_2.min(axis=-1) + threshold)
+    separated |= (proj_2.max(axis=-1) <= proj_1.min(axis=-1) + threshold)
+    separated &= valid
+
+    area_threshold = threshold * threshold
+    degenerated = (np.abs(calc_triangle_areas(tris_1)) <= area_threshold)
+    degenerated |= (np.abs(calc_triangle_areas(tris_2)) <= area_threshold)
+
+    return ~np.any(separated, axis=1) & ~degenerated
+
+
+def calc_polygon_areas(points, counts):
+    """
+    Calculate the signed area of 2D polygons.
+    The first counts[i] points of points[i] are the vertices of the i-th
+    polygon.
+    """
+
+    num_polygons, max_points = points.shape[:2]
+    rows = np.arange(num_polygons)[:, np.newaxis]
+    indices = np.arange(max_points)[np.newaxis, :]
+    valid = indices < counts[:, np.newaxis]
+    next_indices = np.where(indices + 1 < counts[:, np.newaxis],
+                            indices + 1, 0)
+    next_points = points[rows, next_indices]
+    cross_1 = points[:, :, 0] * next_points[:, :, 1]
+    cross_2 = points[:, :, 1] * next_points[:, :, 0]
+
+    return 0.5 * np.sum(np.where(valid, cross_1 - cross_2, 0.0), axis=1)
+
+
+def _make_triangles_ccw(tris):
+    flipped = calc_triangle_areas(tris) < 0.0
+    tris = tris.copy()
+    tris[flipped] = tris[flipped][:, ::-1]
+    return tris
+
+
+def _clip_by_half_plane(points, counts, starts, ends):
+    """
+    Clip the convex polygons by the half plane which is the left side of
+    the line from starts to ends.
+    """
+
+    num_polygons, max_points = points.shape[:2]
+    rows = np.arange(num_polygons)[:, np.newaxis]
+    indices = np.arange(max_points)[np.newaxis, :]
+    valid = indices < counts[:, np.newaxis]
+    next_indices = np.where(indices + 1 < counts[:, np.newaxis],
+                            indices + 1, 0)
+
+    edges = (ends - starts)[:, np.newaxis, :]
+    rel = points - starts[:, np.newaxis, :]
+    sides = edges[:, :, 0] * rel[:, :, 1] - edges[:, :, 1] * rel[:, :, 0]
+    next_points = points[rows, next_indices]
+    next_sides = sides[rows, next_indices]
+
+    # Keep the inside points, and add the intersection when the edge
+    # crosses the line.
+    inside = valid & (sides >= 0.0)
+    entering = (sides < 0.0) & (next_sides > 0.0)
+    exiting = (sides > 0.0) & (next_sides < 0.0)
+    crossing = valid & (entering | exiting)
+    denom = np.where(crossing, sides - next_sides, 1.0)
+    params = (sides / denom)[:, :, np.newaxis]
+    intersections = points + params * (next_points - points)
+
+    # Pack the kept points to the front.
+    new_points = np.stack((points, intersections), axis=2).reshape(
+        num_polygons, 2 * max_points, 2)
+    keep = np.stack((inside, crossing), axis=2).reshape(
+        num_polygons, 2 * max_points)
+    new_counts = np.sum(keep, axis=1)
+    order = np.argsort(~keep, axis=1, kind='mergesort')
+    new_max_points = max(int(new_counts.max()) if num_polygons else 0, 1)
+    new_points = new_points[rows, order[:, :new_max_points]]
+
+    return new_points, new_counts
+
+
+def clip_triangles(tris_1, tris_2):
+    """
+    Clip each triangle in tris_2 by the corresponding triangle in tris_1
+    with Sutherland-Hodgman algorithm.
+    Return (points, counts). The first counts[i] points of points[i] are
+    the vertices of the i-th intersection in counter-clockwise order.
+    counts[i] is not larger than MAX_PIECE_POINTS.
+    """
+
+    tris_1 = _make_triangles_ccw(
+        np.asarray(tris_1, dtype=np.float64).reshape(-1, 3, 2))
+    tris_2 = _make_triangles_ccw(
+        np.asarray(tris_2, dtype=np.float64).reshape(-1, 3, 2))
+
+    points = tris_2
+    counts = np.full(len(tris_2), 3, dtype=np.int64)
+    for i in range(3):
+        points, counts = _clip_by_half_plane(
+            points, counts, tris_1[:, i], tris_1[:, (i + 1) % 3])
+
+    return points, counts
+
+
+def _enumerate_triangle_pairs(tri_offsets, polygons_1, polygons_2,
+                              max_candidates):
+    """
+    Enumerate all pairs of triangles in the pairs of polygons.
+    Pairs are yielded by chunks whose size is limited by max_candidates.
+    """
+
+    num_tris = np.diff(tri_offsets)
+    counts_1 = num_tris[polygons_1]
+    counts_2 = num_tris[polygons_2]
+    counts = counts_1 * counts_2
+
+    for start, end in _iter_chunks(counts, max_candidates):
+        # Local index of the pair of triangles in the pair of polygons.
+        pairs, locals_ = _expand_following(np.arange(start, end),
+                                           counts[start:end])
+        locals_ -= pairs + 1
+        tris_1 = tri_offsets[polygons_1[pairs]] + locals_ // counts_2[pairs]
+        tris_2 = tri_offsets[polygons_2[pairs]] + locals_ % counts_2[pairs]
+        yield pairs, tris_1, tris_2
+
+
+def is_polygon_overlapped(tris, tri_offsets, polygons_1, polygons_2,
+                          threshold=0.0, max_candidates=1000000):
+    """
+    Test the overlap of the pairs of polygons which are triangulated.
+    Triangles of the i-th polygon are
+    tris[tri_offsets[i]:tri_offsets[i + 1]].
+    Pairs of polygons are (polygons_1[i], polygons_2[i]), and the polygons
+    are overlapped when any pair of their triangles are overlapped.
+    max_candidates limits the number of triangle pairs tested at once.
+    """
+
+    polygons_1 = np.asarray(polygons_1, dtype=np.int64)
+    polygons_2 = np.asarray(polygons_2, dtype=np.int64)
+
+    overlapped = np.zeros(len(polygons_1), dtype=bool)
+    for pairs, tris_1, tris_2 in _enumerate_triangle_pairs(
+            tri_offsets, polygons_1, polygons_2, max_candidates):
+        result = is_triangle_overlapped(tris[tris_1], tris[tris_2],
+                                        threshold)
+        overlapped[pairs[result]] = True
+
+    return overlapped
+
+
+def clip_polygons(tris, tri_offsets, polygons_1, polygons_2,
+                  threshold=0.0, max_candidates=1000000):
+    """
+    Calculate the intersection of the pairs of polygons which are
+    triangulated. Arguments are same as is_polygon_overlapped.
+    The intersection is returned as the convex pieces
+    (piece_pairs, piece_points, piece_counts). Each piece is the
+    intersection of a pair of triangles, so the intersection of the pair of
+    polygons is split into the pieces along the triangles.
+    piece_points is the array whose shape is (num_pieces, MAX_PIECE_POINTS,
+    2). The first piece_counts[j] points of piece_points[j] are the
+    vertices of the j-th piece in counter-clockwise order, and the rest
+    are zero. The j-th piece is a part of the intersection of the
+    piece_pairs[j]-th pair. Pieces are sorted by piece_pairs.
+    """
+
+    polygons_1 = np.asarray(polygons_1, dtype=np.int64)
+    polygons_2 = np.asarray(polygons_2, dtype=np.int64)
+
+    piece_pairs = [np.empty(0, dtype=np.int64)]
+    piece_points = [np.empty((0, MAX_PIECE_POINTS, 2))]
+    piece_counts = [np.empty(0, dtype=np.int64)]
+    for pairs, tris_1, tris_2 in _enumerate_triangle_pairs(
+            tri_offsets, polygons_1, polygons_2, max_candidates):
+        # Clip only the overlapped triangles.
+        overlapped = is_triangle_overlapped(tris[tris_1], tris[tris_2],
+                                            threshold)
+        pairs = pairs[overlapped]
+        points, counts = clip_triangles(tris[tris_1[overlapped]],
+                                        tris[tris_2[overlapped]])
+
+        # Remove the degenerated pieces.
+        valid = (counts >= 3)
+        valid &= calc_polygon_areas(points, counts) > threshold * threshold
+        assert points.shape[1] <= MAX_PIECE_POINTS
+        padded = np.zeros((np.count_nonzero(valid), MAX_PIECE_POINTS, 2))
+        padded[:, :points.shape[1]] = points[valid]
+        piece_pairs.append(pairs[valid])
+        piece_points.append(padded)
+        piece_counts.append(counts[valid])
+
+    return (np.concatenate(piece_pairs), np.concatenate(piece_points),
+            np.concatenate(piece_counts))
+
+
+def is_point_in_polygons(points, edge_starts, edge_ends, edge_offsets,
+                         polygons):
+    """
+    Test whether points[i] is inside the polygons[i]-th polygon by
+    crossing number algorithm.
+    Edges of the j-th polygon are from edge_starts[k] to edge_ends[k]
+    where edge_offsets[j] <= k < edge_offsets[j + 1].
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    polygons = np.asarray(polygons, dtype=np.int64)
+    counts = np.diff(edge_offsets)[polygons]
+
+    # Enumerate all pairs of the point and the edge of the polygon.
+    pairs = np.repeat(np.arange(len(polygons)), counts)
+    local = np.arange(len(pairs)) - np.repeat(np.cumsum(counts) - counts,
+                                              counts)
+    edges = edge_offsets[polygons[pairs]] + local
+    starts = edge_starts[edges]
+    ends = edge_ends[edges]
+    pts = points[pairs]
+
+    # Count the edges which cross the ray from the point to +X direction.
+    crossing = (starts[:, 1] > pts[:, 1]) != (ends[:, 1] > pts[:, 1])
+    dy = np.where(crossing, ends[:, 1] - starts[:, 1], 1.0)
+    params = (pts[:, 1] - starts[:, 1]) / dy
+    cross_x = starts[:, 0] + params * (ends[:, 0] - starts[:, 0])
+    crossing &= pts[:, 0] < cross_x
+    num_crossings = np.bincount(pairs[crossing], minlength=len(polygons))
+
+    return num_crossings % 2 == 1
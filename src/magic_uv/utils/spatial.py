@@ -0,0 +1,548 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "6.6"
+__date__ = "22 Apr 2022"
+
+import itertools
+
+import numpy as np
+
+
+def _empty_pairs():
+    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+
+def _sort_pairs(indices_1, indices_2):
+    order = np.lexsort((indices_2, indices_1))
+    return indices_1[order], indices_2[order]
+
+
+def is_box_overlapped(min_1, max_1, min_2, max_2):
+    """
+    Return True for each pair of boxes which overlap each other.
+    Boxes touching each other are treated as overlapped.
+    """
+
+    return np.all((min_1 <= max_2) & (min_2 <= max_1), axis=-1)
+
+
+def _iter_chunks(counts, max_candidates):
+    """
+    Split the items into chunks so that the sum of counts in each chunk
+    does not exceed max_candidates (except the chunk which has only one
+    item)
+    """
+
+    accum_counts = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        offset = accum_counts[start - 1] if start > 0 else 0
+        end = int(np.searchsorted(accum_counts, offset + max_candidates,
+                                  side='right'))
+        end = max(end, start + 1)
+        yield start, end
+        start = end
+
+
+def _expand_following(starts, counts):
+    """
+    Expand (starts[i], counts[i]) to the pairs
+    (starts[i], starts[i] + 1), ..., (starts[i], starts[i] + counts[i])
+    """
+
+    total = int(counts.sum())
+    firsts = np.repeat(starts, counts)
+    seconds = firsts + 1 + np.arange(total) - np.repeat(
+        np.cumsum(counts) - counts, counts)
+
+    return firsts, seconds
+
+
+def find_overlapped_boxes(min_coords, max_coords, max_candidates=4000000):
+    """
+    Broad phase of the overlap detection by sort and sweep.
+    Boxes are sorted along the axis in which boxes are spread most widely,
+    and only the boxes whose ranges on the axis overlap are tested.
+    max_candidates limits the number of candidate pairs tested at once.
+    Return the pairs (indices_1[i], indices_2[i]) of the overlapped boxes
+    where indices_1[i] < indices_2[i]. Pairs are sorted.
+    """
+
+    min_coords = np.asarray(min_coords, dtype=np.float64)
+    max_coords = np.asarray(max_coords, dtype=np.float64)
+    num_boxes = len(min_coords)
+    if num_boxes < 2:
+        return _empty_pairs()
+
+    # Choose the axis where the boxes are separated best.
+    extent = max_coords.max(axis=0) - min_coords.min(axis=0)
+    mean_size = np.mean(max_coords - min_coords, axis=0)
+    axis = int(np.argmax(extent / (mean_size + 1e-12)))
+
+    order = np.argsort(min_coords[:, axis], kind='mergesort')
+    sorted_min = min_coords[order, axis]
+    sorted_max = max_coords[order, axis]
+
+    # Boxes sorted after i-th box and starting before the end of i-th box
+    # are the candidates.
+    ends = np.searchsorted(sorted_min, sorted_max, side='right')
+    counts = np.maximum(ends - np.arange(1, num_boxes + 1), 0)
+
+    result_1 = []
+    result_2 = []
+    for start, end in _iter_chunks(counts, max_candidates):
+        firsts, seconds = _expand_following(np.arange(start, end),
+                                            counts[start:end])
+        boxes_1 = order[firsts]
+        boxes_2 = order[seconds]
+        overlapped = is_box_overlapped(
+            min_coords[boxes_1], max_coords[boxes_1],
+            min_coords[boxes_2], max_coords[boxes_2])
+        boxes_1 = boxes_1[overlapped]
+        boxes_2 = boxes_2[overlapped]
+        result_1.append(np.minimum(boxes_1, boxes_2))
+        result_2.append(np.maximum(boxes_1, boxes_2))
+
+    if not result_1:
+        return _empty_pairs()
+
+    return _sort_pairs(np.concatenate(result_1), np.concatenate(result_2))
+
+
+# Grid cells which have more boxes than this are subdivided into 4 cells.
+_MAX_CELL_BOXES = 32
+
+# Cells are not subdivided more than this depth.
+_MAX_CELL_DEPTH = 16
+
+
+def _expand_cells(items, cell_min, cell_max):
+    """
+    Expand each item to the grid cells from cell_min to cell_max which it
+    covers. Return the item and the cell of each registration.
+    """
+
+    widths = cell_max - cell_min + 1
+    num_cells = widths[:, 0] * widths[:, 1]
+    regs = np.repeat(np.arange(len(items)), num_cells)
+    local = np.arange(len(regs)) - np.repeat(
+        np.cumsum(num_cells) - num_cells, num_cells)
+    cells = np.stack((cell_min[regs, 0] + local % widths[regs, 0],
+                      cell_min[regs, 1] + local // widths[regs, 0]), axis=1)
+
+    return items[regs], cells
+
+
+def _group_cells(levels, cells):
+    """
+    Group the registrations in the same cell.
+    Return the sort order, the group index of each sorted registration and
+    the offsets of the groups.
+    """
+
+    order = np.lexsort((cells[:, 1], cells[:, 0], levels))
+    sorted_cells = cells[order]
+    boundary = np.ones(len(order), dtype=bool)
+    boundary[1:] = np.any(sorted_cells[1:] != sorted_cells[:-1], axis=1)
+    boundary[1:] |= levels[order][1:] != levels[order][:-1]
+    group_ids = np.cumsum(boundary) - 1
+    offsets = np.append(np.flatnonzero(boundary), len(order))
+
+    return order, group_ids, offsets
+
+
+def _subdivide_cells(scaled_min, scaled_max, boxes, levels, cells):
+    """
+    Subdivide the cells which have more than _MAX_CELL_BOXES boxes into 4
+    cells, until the number of boxes in each cell is bounded.
+    Coordinates are scaled so that the size of the cell is 1 at level 0,
+    and the size of the cell at level l is 1 / 2^l.
+    """
+
+    for level in range(_MAX_CELL_DEPTH):
+        at_level = np.flatnonzero(levels == level)
+        order, group_ids, offsets = _group_cells(
+            levels[at_level], cells[at_level])
+        counts = np.diff(offsets)
+        regs = at_level[order]
+        dense = counts[group_ids] > _MAX_CELL_BOXES
+        if not np.any(dense):
+            break
+        regs = regs[dense]
+        group_ids = group_ids[dense]
+
+        # Register boxes to the child cells which they cover.
+        scale = float(1 << (level + 1))
+        first_child = cells[regs] * 2
+        child_min = np.clip(
+            np.floor(scaled_min[boxes[regs]] * scale).astype(np.int64),
+            first_child, first_child + 1)
+        child_max = np.clip(
+            np.floor(scaled_max[boxes[regs]] * scale).astype(np.int64),
+            first_child, first_child + 1)
+
+        # Subdivide only the cells where most of boxes are smaller than
+        # the child cell, otherwise the registrations just increase.
+        widths = child_max - child_min + 1
+        num_children = np.bincount(group_ids,
+                                   weights=widths[:, 0] * widths[:, 1],
+                                   minlength=len(counts))
+        divided = (num_children <= 2 * counts)[group_ids]
+        if not np.any(divided):
+            break
+        regs = regs[divided]
+
+        child_regs, child_cells = _expand_cells(
+            regs, child_min[divided], child_max[divided])
+        kept = np.ones(len(boxes), dtype=bool)
+        kept[regs] = False
+        boxes = np.concatenate((boxes[kept], boxes[child_regs]))
+        levels = np.concatenate(
+            (levels[kept], np.full(len(child_regs), level + 1)))
+        cells = np.concatenate((cells[kept], child_cells))
+
+    return boxes, levels, cells
+
+
+def find_overlapped_boxes_by_grid(min_coords, max_coords, cell_size=None,
+                                  max_candidates=4000000):
+    """
+    Broad phase of the overlap detection by the adaptive grid.
+    Each 2D box is registered to the grid cells which it covers, and only
+    the boxes registered to the same cell are tested.
+    Size of the cell is the average size of the boxes by default, and is
+    enlarged when too many cells are covered by boxes. The dense cells are
+    subdivided like the quadtree, so the number of the tested pairs does not
+    grow quadratically even if boxes are concentrated in the small region.
+    max_candidates limits the number of candidate pairs tested at once.
+    Return the pairs (indices_1[i], indices_2[i]) of the overlapped boxes
+    where indices_1[i] < indices_2[i]. Pairs are sorted.
+    """
+
+    min_coords = np.asarray(min_coords, dtype=np.float64).reshape(-1, 2)
+    max_coords = np.asarray(max_coords, dtype=np.float64).reshape(-1, 2)
+    num_boxes = len(min_coords)
+    if num_boxes < 2:
+        return _empty_pairs()
+
+    origin = min_coords.min(axis=0)
+    extent = np.maximum(max_coords.max(axis=0) - origin, 1e-12)
+    if cell_size is None:
+        cell_size = np.mean(max_coords - min_coords, axis=0)
+    cell_size = np.asarray(cell_size, dtype=np.float64) * np.ones(2)
+    cell_size = np.maximum(cell_size, extent / (1 << 20))
+
+    # Enlarge the cell until the number of registrations is bounded.
+    while True:
+        scaled_min = (min_coords - origin) / cell_size
+        scaled_max = (max_coords - origin) / cell_size
+        cell_min = np.floor(scaled_min).astype(np.int64)
+        cell_max = np.floor(scaled_max).astype(np.int64)
+        widths = cell_max - cell_min + 1
+        if np.sum(widths[:, 0] * widths[:, 1]) <= 4 * num_boxes + 16:
+            break
+        cell_size = cell_size * 2.0
+
+    # Register boxes to cells.
+    boxes, cells = _expand_cells(np.arange(num_boxes), cell_min, cell_max)
+    levels = np.zeros(len(boxes), dtype=np.int64)
+    boxes, levels, cells = _subdivide_cells(scaled_min, scaled_max,
+                                            boxes, levels, cells)
+
+    order, group_ids, offsets = _group_cells(levels, cells)
+    boxes = boxes[order]
+    levels = levels[order]
+    cells = cells[order]
+    counts = offsets[group_ids + 1] - np.arange(1, len(boxes) + 1)
+
+    result_1 = []
+    result_2 = []
+    for start, end in _iter_chunks(counts, max_candidates):
+        firsts, seconds = _expand_following(np.arange(start, end),
+                                            counts[start:end])
+        boxes_1 = boxes[firsts]
+        boxes_2 = boxes[seconds]
+        overlapped = is_box_overlapped(min_coords[boxes_1],
+                                       max_coords[boxes_1],
+                                       min_coords[boxes_2],
+                                       max_coords[boxes_2])
+
+        # Report the pair only in the cell which includes the minimum
+        # corner of the intersection, so that each pair is reported once.
+        corners = np.maximum(scaled_min[boxes_1], scaled_min[boxes_2])
+        scales = np.left_shift(1, levels[firsts])[:, np.newaxis]
+        corner_cells = np.floor(corners * scales).astype(np.int64)
+        reported = overlapped
+        reported &= np.all(corner_cells == cells[firsts], axis=1)
+
+        boxes_1 = boxes_1[reported]
+        boxes_2 = boxes_2[reported]
+        result_1.append(np.minimum(boxes_1, boxes_2))
+        result_2.append(np.maximum(boxes_1, boxes_2))
+
+    if not result_1:
+        return _empty_pairs()
+
+    return _sort_pairs(np.concatenate(result_1), np.concatenate(result_2))
+
+
+def _calc_orientations(starts, ends, points):
+    edges = ends - starts
+    rel = points - starts
+    cross_1 = edges[:, 0] * rel[:, 1]
+    cross_2 = edges[:, 1] * rel[:, 0]
+    return np.sign(cross_1 - cross_2)
+
+
+def find_intersected_segments(starts, ends, max_candidates=4000000):
+    """
+    Find the pairs of 2D segments which intersect each other.
+    Segments intersect when they cross at the point which is not the end
+    point of either segment, or they overlap on the same line with the
+    positive length. Segments touching only at the end point and segments
+    sharing the end point are not treated as intersected.
+    Candidates are found by the adaptive grid over the bounding boxes of
+    segments (see find_overlapped_boxes_by_grid).
+    Return the pairs (indices_1[i], indices_2[i]) of the intersected
+    segments where indices_1[i] < indices_2[i]. Pairs are sorted.
+    """
+
+    starts = np.asarray(starts, dtype=np.float64).reshape(-1, 2)
+    ends = np.asarray(ends, dtype=np.float64).reshape(-1, 2)
+    indices_1, indices_2 = find_overlapped_boxes_by_grid(
+        np.minimum(starts, ends), np.maximum(starts, ends),
+        max_candidates=max_candidates)
+
+    starts_1 = starts[indices_1]
+    ends_1 = ends[indices_1]
+    starts_2 = starts[indices_2]
+    ends_2 = ends[indices_2]
+
+    # Segments cross when the end points of each segment are on the
+    # opposite sides of the other segment.
+    sides_1s = _calc_orientations(starts_1, ends_1, starts_2)
+    sides_1e = _calc_orientations(starts_1, ends_1, ends_2)
+    sides_2s = _calc_orientations(starts_2, ends_2, starts_1)
+    sides_2e = _calc_orientations(starts_2, ends_2, ends_1)
+    crossed = (sides_1s * sides_1e < 0) & (sides_2s * sides_2e < 0)
+
+    # Segments on the same line overlap when their projections on the
+    # axis along the line overlap.
+    collinear = (sides_1s == 0) & (sides_1e == 0)
+    rows = np.arange(len(indices_1))
+    axes = np.argmax(np.abs(ends_1 - starts_1), axis=1)
+    ranges_1 = np.sort(np.stack((starts_1[rows, axes], ends_1[rows, axes]),
+                                axis=1), axis=1)
+    ranges_2 = np.sort(np.stack((starts_2[rows, axes], ends_2[rows, axes]),
+                                axis=1), axis=1)
+    overlapped = collinear
+    overlapped &= np.maximum(ranges_1[:, 0], ranges_2[:, 0]) < \
+        np.minimum(ranges_1[:, 1], ranges_2[:, 1])
+
+    shared = np.all(starts_1 == starts_2, axis=1)
+    shared |= np.all(starts_1 == ends_2, axis=1)
+    shared |= np.all(ends_1 == starts_2, axis=1)
+    shared |= np.all(ends_1 == ends_2, axis=1)
+    intersected = crossed | (overlapped & ~shared)
+
+    return indices_1[intersected], indices_2[intersected]
+
+
+def group_close_points(points, tolerances, labels=None):
+    """
+    Group the points greedily. The first point which is not grouped yet
+    becomes the seed of the new group, and the points which are not
+    grouped yet and differ from the seed by less than tolerances on all
+    axes (and have the same label as the seed) join the group.
+    Points are bucketed by the grid whose cell size is twice the
+    tolerance, so only 2 buckets per axis are searched for each seed.
+    Return (groups, num_groups). groups[i] is the group index of the i-th
+    point, and groups are numbered in order of their seeds.
+    """
+
+    points = np.asarray(points, dtype=np.float64)
+    num_points, num_axes = points.shape
+    tolerances = np.asarray(tolerances, dtype=np.float64) * np.ones(num_axes)
+    if np.any(tolerances <= 0.0):
+        raise ValueError("Invalid tolerances: {}".format(tolerances))
+    if labels is None:
+        labels = [0] * num_points
+    else:
+        labels = np.asarray(labels).tolist()
+
+    # Points within the tolerance are in the lower or the upper neighbor
+    # bucket, which is decided by the half of the cell where the seed is.
+    scaled = points / (2.0 * tolerances)
+    cells = np.floor(scaled).astype(np.int64)
+    sides = np.where(scaled - cells < 0.5, -1, 1).tolist()
+    cells = [tuple(c) for c in cells.tolist()]
+
+    buckets = {}    # { (label, cell): [point index] }
+    for i, (label, cell) in enumerate(zip(labels, cells)):
+        buckets.setdefault((label, cell), []).append(i)
+
+    points = points.tolist()
+    tolerances = tolerances.tolist()
+    neighbor_offsets = list(itertools.product((0, 1), repeat=num_axes))
+    groups = [-1] * num_points
+    num_groups = 0
+    for seed in range(num_points):
+        if groups[seed] != -1:
+            continue
+        groups[seed] = num_groups
+
+        seed_point = points[seed]
+        for offsets in neighbor_offsets:
+            key = (labels[seed],
+                   tuple(c + s * o for c, s, o
+                         in zip(cells[seed], sides[seed], offsets)))
+            bucket = buckets.get(key)
+            if bucket is None:
+                continue
+
+            remaining = []
+            for i in bucket:
+                if groups[i] != -1:
+                    continue
+                if all(abs(a - b) < t for a, b, t
+                       in zip(points[i], seed_point, tolerances)):
+                    groups[i] = num_groups
+                else:
+                    remaining.append(i)
+            # Grouped points are not searched again.
+            if remaining:
+                buckets[key] = remaining
+            else:
+                del buckets[key]
+
+        num_groups += 1
+
+    return np.array(groups, dtype=np.int64), num_groups
+
+
+def _make_ring_offsets(ring):
+    """
+    Make the offsets of the grid cells whose Chebyshev distance from the
+    center cell is ring
+    """
+
+    if ring == 0:
+        return np.zeros((1, 2), dtype=np.int64)
+
+    side = np.arange(-ring, ring + 1, dtype=np.int64)
+    inner = side[1:-1]
+    return np.concatenate((
+        np.stack((side, np.full_like(side, -ring)), axis=1),
+        np.stack((side, np.full_like(side, ring)), axis=1),
+        np.stack((np.full_like(inner, -ring), inner), axis=1),
+        np.stack((np.full_like(inner, ring), inner), axis=1),
+    ))
+
+
+def find_nearest_points(points, queries, point_groups=None,
+                        query_groups=None):
+    """
+    Find the nearest 2D point of each query point.
+    When groups are specified, the nearest point is searched from the
+    points in the same group as the query.
+    Points are registered to the uniform grid, and the cells around the
+    queries are searched ring by ring until the nearest point is found.
+    Return the index of the nearest point for each query (-1 if there is
+    no point in the group). When some points are at the same distance,
+    the point with the smallest index is returned.
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    queries = np.asarray(queries, dtype=np.float64).reshape(-1, 2)
+    num_points = len(points)
+    num_queries = len(queries)
+    if point_groups is None:
+        point_groups = np.zeros(num_points, dtype=np.int64)
+    if query_groups is None:
+        query_groups = np.zeros(num_queries, dtype=np.int64)
+    point_groups = np.asarray(point_groups, dtype=np.int64)
+    query_groups = np.asarray(query_groups, dtype=np.int64)
+
+    nearest = np.full(num_queries, -1, dtype=np.int64)
+    if num_points == 0 or num_queries == 0:
+        return nearest
+
+    # Cell is sized so that each group has about one point per cell.
+    # Grid covers the queries as well, so that the number of rings to be
+    # searched is bounded.
+    num_groups = int(max(point_groups.max(), query_groups.max())) + 1
+    origin = np.minimum(points.min(axis=0), queries.min(axis=0))
+    extent = np.maximum(points.max(axis=0), queries.max(axis=0)) - origin
+    points_per_group = num_points / num_groups
+    cell_size = max(np.sqrt(extent[0] * extent[1] / points_per_group),
+                    extent.max() / points_per_group, 1e-12)
+
+    point_cells = np.floor((points - origin) / cell_size).astype(np.int64)
+    query_cells = np.floor((queries - origin) / cell_size).astype(np.int64)
+    num_cols, num_rows = (np.maximum(point_cells.max(axis=0),
+                                     query_cells.max(axis=0)) + 1).tolist()
+    keys = (point_groups * num_rows + point_cells[:, 1]) * num_cols
+    keys += point_cells[:, 0]
+    order = np.argsort(keys, kind='mergesort')
+    sorted_keys = keys[order]
+
+    # All cells are searched until this ring.
+    last_rings = np.max(np.stack((
+        query_cells[:, 0], num_cols - 1 - query_cells[:, 0],
+        query_cells[:, 1], num_rows - 1 - query_cells[:, 1],
+    )), axis=0)
+
+    nearest_dists = np.full(num_queries, np.inf)
+    active = np.arange(num_queries)
+    ring = 0
+    while len(active) > 0:
+        offsets = _make_ring_offsets(ring)
+        cand_queries = np.repeat(active, len(offsets))
+        cells = query_cells[cand_queries] + np.tile(offsets,
+                                                    (len(active), 1))
+        valid = np.all((cells >= 0) & (cells < [num_cols, num_rows]),
+                       axis=1)
+        cand_queries = cand_queries[valid]
+        cells = cells[valid]
+        cell_keys = (query_groups[cand_queries] * num_rows + cells[:, 1])
+        cell_keys = cell_keys * num_cols + cells[:, 0]
+        starts = np.searchsorted(sorted_keys, cell_keys, side='left')
+        counts = np.searchsorted(sorted_keys, cell_keys, side='right')
+        counts -= starts
+
+        # Expand to the pairs of the query and the point in the cell.
+        total = int(counts.sum())
+        if total > 0:
+            local = np.arange(total) - np.repeat(np.cumsum(counts) - counts,
+                                                 counts)
+            cand_queries = np.repeat(cand_queries, counts)
+            cand_points = order[np.repeat(starts, counts) + local]
+            dists = np.sum((points[cand_points] - queries[cand_queries]) ** 2,
+                           axis=1)
+
+            # Choose the nearest candidate of each query.
+            cand_order = np.lexsort((cand_points, dists, cand_queries))
+            cand_queries = cand_queries[cand_order]
+            first = np.ones(total, dtype=bool)
+            first[1:] = cand_queries[1:] != cand_queries[:-1]
+            cand_queries = cand_queries[first]
+            cand_points = cand_points[cand_order][first]
+            dists = dists[cand_order][first]
+
+            current_dists = nearest_dists[cand_queries]
+            current = nearest[cand_queries]
+            closer = dists < current_dists
+            closer |= (dists == current_dists) & (cand_points < current)
+            nearest[cand_queries[closer]] = cand_points[closer]
+            nearest_dists[cand_queries[closer]] = dists[closer]
+
+        # Points in the cells out of the ring are farther than
+        # ring * cell_size.
+        finished = nearest_dists[active] < (ring * cell_size) ** 2
+        finished |= last_rings[active] <= ring
+        active = active[~finished]
+        ring += 1
+
+    return nearest
@@ -0,0 +1,137 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "6.6"
+__date__ = "22 Apr 2022"
+
+import numpy as np
+
+from .island import segment_reduce
+
+
+# How to calculate the anchor from the UV coordinates on each axis.
+# 'MIN', 'MAX' and 'MEAN' mean the minimum, maximum and average of
+# the coordinates.
+_ANCHOR_METHODS = {
+    'CENTER': ('MEAN', 'MEAN'),
+    'LEFT_TOP': ('MIN', 'MAX'),
+    'LEFT_CENTER': ('MIN', 'MEAN'),
+    'LEFT_BOTTOM': ('MIN', 'MIN'),
+    'CENTER_TOP': ('MEAN', 'MAX'),
+    'CENTER_BOTTOM': ('MEAN', 'MIN'),
+    'RIGHT_TOP': ('MAX', 'MAX'),
+    'RIGHT_CENTER': ('MAX', 'MEAN'),
+    'RIGHT_BOTTOM': ('MAX', 'MIN'),
+}
+
+
+def is_valid_anchor(anchor):
+    return anchor in _ANCHOR_METHODS
+
+
+def calc_group_anchors(uvs, groups, num_groups, anchor):
+    """
+    Calculate the anchor point (ex. 'CENTER', 'LEFT_TOP') of the UV
+    coordinates in each group.
+    groups[i] is the group index (0 to num_groups-1) of uvs[i].
+    Return the array whose shape is (num_groups, 2).
+    """
+
+    if anchor not in _ANCHOR_METHODS:
+        raise ValueError("Invalid anchor: {}".format(anchor))
+
+    uvs = np.asarray(uvs, dtype=np.float64).reshape(-1, 2)
+    groups = np.asarray(groups, dtype=np.int64)
+    anchors = np.zeros((num_groups, 2))
+    for axis, method in enumerate(_ANCHOR_METHODS[anchor]):
+        if method == 'MIN':
+            anchors[:, axis] = segment_reduce(
+                np.minimum, uvs[:, axis], groups, num_groups, 0.0)
+        elif method == 'MAX':
+            anchors[:, axis] = segment_reduce(
+                np.maximum, uvs[:, axis], groups, num_groups, 0.0)
+        else:
+            sums = np.bincount(groups, weights=uvs[:, axis],
+                               minlength=num_groups)
+            counts = np.bincount(groups, minlength=num_groups)
+            anchors[:, axis] = sums / np.maximum(counts, 1)
+
+    return anchors
+
+
+def to_uv_matrix(matrix):
+    """
+    Convert the matrix to the 3x3 affine transform matrix of 2D UV
+    coordinates.
+    matrix is the 3x3 matrix, or the 4x4 matrix (ex. mathutils.Matrix)
+    which transforms the points on the XY plane.
+    """
+
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.shape == (3, 3):
+        return matrix
+    if matrix.shape == (4, 4):
+        return matrix[np.ix_([0, 1, 3], [0, 1, 3])]
+
+    raise ValueError("Invalid shape of matrix: {}".format(matrix.shape))
+
+
+def make_translation_matrices(offsets):
+    """
+    Make the translation matrices whose shape is (N, 3, 3) from offsets
+    whose shape is (N, 2)
+    """
+
+    offsets = np.asarray(offsets, dtype=np.float64).reshape(-1, 2)
+    matrices = np.zeros((len(offsets), 3, 3))
+    matrices[:, 0, 0] = 1.0
+    matrices[:, 1, 1] = 1.0
+    matrices[:, 2, 2] = 1.0
+    matrices[:, :2, 2] = offsets
+
+    return matrices
+
+
+def make_scale_matrices(factors, origins):
+    """
+    Make the matrices whose shape is (N, 3, 3) which scale about
+    origins[i] by factors[i]. factors[i] is the scalar or (x, y) scaling
+    factor.
+    """
+
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 2)
+    factors = np.asarray(factors, dtype=np.float64)
+    if factors.ndim == 1:
+        factors = factors[:, np.newaxis]
+    factors = factors * np.ones((1, 2))
+
+    matrices = np.zeros((len(origins), 3, 3))
+    matrices[:, 0, 0] = factors[:, 0]
+    matrices[:, 1, 1] = factors[:, 1]
+    matrices[:, 2, 2] = 1.0
+    matrices[:, :2, 2] = origins - origins * factors
+
+    return matrices
+
+
+def transform_uvs(uvs, matrices, groups=None):
+    """
+    Apply the affine transform to UV coordinates whose shape is (N, 2).
+    matrices is the 3x3 matrix applied to all UV coordinates, or the array
+    of 3x3 matrices whose i-th matrix is applied to the UV coordinates
+    whose group (groups[j]) is i.
+    Return the transformed UV coordinates.
+    """
+
+    uvs = np.asarray(uvs, dtype=np.float64).reshape(-1, 2)
+    matrices = np.asarray(matrices, dtype=np.float64)
+    if matrices.ndim == 2:
+        linear = matrices[:2, :2]
+        return np.dot(uvs, linear.T) + matrices[:2, 2]
+
+    matrices = matrices[np.asarray(groups, dtype=np.int64)]
+    result = np.einsum('nij,nj->ni', matrices[:, :2, :2], uvs)
+    result += matrices[:, :2, 2]
+
+    return result
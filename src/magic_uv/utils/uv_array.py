@@ -0,0 +1,310 @@
+# SPDX-License-Identifier: GPL-2.0-or-later
+
+__author__ = "Nutti <nutti.metro@gmail.com>"
+__status__ = "production"
+__version__ = "6.6"
+__date__ = "22 Apr 2022"
+
+import bpy
+import bmesh
+import numpy as np
+
+
+# Write back the dirty data range by range when the number of dirty items
+# is less than 1/_PARTIAL_WRITE_RATIO of all items. Otherwise, the whole
+# array is written back by foreach_set.
+_PARTIAL_WRITE_RATIO = 8
+
+# name: (collection, RNA property name, dtype, number of components)
+_LOOP_ATTRIBUTES = {
+    'UV': ('UV_LAYER', "uv", np.float32, 2),
+    'UV_SELECT': ('UV_LAYER', "select", bool, 1),
+    'PIN_UV': ('UV_LAYER', "pin_uv", bool, 1),
+}
+_FACE_ATTRIBUTES = {
+    'FACE_SELECT': ('POLYGONS', "select", bool, 1),
+}
+_ATTRIBUTES = dict(_LOOP_ATTRIBUTES, **_FACE_ATTRIBUTES)
+
+
+def calc_dirty_ranges(dirty):
+    """
+    Convert the mask of dirty items to the ranges.
+    Return (starts, ends). Items from starts[i] to ends[i] - 1 are dirty.
+    """
+
+    dirty = np.concatenate(([False], np.asarray(dirty, dtype=bool), [False]))
+    changes = np.flatnonzero(dirty[1:] != dirty[:-1])
+    return changes[0::2], changes[1::2]
+
+
+def _foreach_get(collection, prop, dtype, num_components):
+    data = np.empty(len(collection) * num_components, dtype=dtype)
+    collection.foreach_get(prop, data)
+    if num_components == 1:
+        return data
+    return data.reshape(-1, num_components)
+
+
+def _get_collection(mesh, uv_layer_name, collection):
+    if collection == 'UV_LAYER':
+        return mesh.uv_layers[uv_layer_name].data
+    if collection == 'POLYGONS':
+        return mesh.polygons
+    raise ValueError("Invalid collection: {}".format(collection))
+
+
+def _read_mesh(mesh, uv_layer_name):
+    data = {}
+    for name, (collection, prop, dtype, num_components) in \
+            _ATTRIBUTES.items():
+        data[name] = _foreach_get(
+            _get_collection(mesh, uv_layer_name, collection),
+            prop, dtype, num_components)
+    data['LOOP_VERTS'] = _foreach_get(mesh.loops, "vertex_index",
+                                      np.int32, 1)
+    starts = _foreach_get(mesh.polygons, "loop_start", np.int32, 1)
+    totals = _foreach_get(mesh.polygons, "loop_total", np.int32, 1)
+    data['FACE_LOOP_STARTS'] = starts
+    data['FACE_LOOP_TOTALS'] = totals
+
+    # Loops of the face are stored contiguously from loop_start.
+    loop_faces = np.empty(len(data['LOOP_VERTS']), dtype=np.int32)
+    offsets = np.cumsum(totals) - totals
+    loop_indices = np.repeat(starts - offsets, totals)
+    loop_indices += np.arange(len(loop_indices), dtype=np.int32)
+    loop_faces[loop_indices] = np.repeat(
+        np.arange(len(starts), dtype=np.int32), totals)
+    data['LOOP_FACES'] = loop_faces
+
+    return data
+
+
+def read_bmesh(bm, uv_layer_name):
+    """
+    Read the arrays of UVLayerArray from BMesh through the temporary mesh,
+    because BMesh has no bulk getter.
+    The face index of the arrays is BMFace.index after this call, and the
+    loops of the face are stored from the first loop of BMFace.loops.
+    """
+
+    bm.faces.index_update()
+    mesh = bpy.data.meshes.new("MUV_UVLayerArray")
+    try:
+        bm.to_mesh(mesh)
+        return _read_mesh(mesh, uv_layer_name)
+    finally:
+        bpy.data.meshes.remove(mesh)
+
+
+class UVLayerArray:
+    """
+    Access the UV layer of the mesh object through contiguous arrays.
+    Arrays are indexed by the loop index (or the face index) of the mesh.
+    In object mode, data is read and written by foreach_get/foreach_set.
+    In edit mode, data is read from the edit mesh (see read_bmesh) without
+    changing the mesh, and only the modified data is written back to the
+    edit mesh because BMesh has no bulk setter. The face index is
+    BMFace.index in this case.
+    Modified data must be notified by mark_dirty before write_back.
+    Topology of the mesh must not be changed until write_back.
+    """
+
+    def __init__(self, obj, uv_layer_name=None):
+        mesh = obj.data
+        if uv_layer_name is None:
+            if not mesh.uv_layers.active:
+                raise RuntimeError(
+                    "Object '{}' has no UV layer".format(obj.name))
+            uv_layer_name = mesh.uv_layers.active.name
+        if uv_layer_name not in mesh.uv_layers:
+            raise ValueError(
+                "Invalid UV layer name: {}".format(uv_layer_name))
+
+        self.__object = obj
+        self.__uv_layer_name = uv_layer_name
+        self.__is_edit_mode = (obj.mode == 'EDIT')
+        self.__data = {}
+        self.__dirty = {}
+        self.read()
+
+    @property
+    def object(self):
+        return self.__object
+
+    @property
+    def uv_layer_name(self):
+        return self.__uv_layer_name
+
+    @property
+    def is_edit_mode(self):
+        return self.__is_edit_mode
+
+    @property
+    def num_loops(self):
+        return len(self.__data['LOOP_VERTS'])
+
+    @property
+    def num_faces(self):
+        return len(self.__data['FACE_LOOP_STARTS'])
+
+    @property
+    def uvs(self):
+        """
+        UV coordinates of loops whose shape is (num_loops, 2)
+        """
+        return self.__data['UV']
+
+    @property
+    def uv_select(self):
+        return self.__data['UV_SELECT']
+
+    @property
+    def pin_uv(self):
+        return self.__data['PIN_UV']
+
+    @property
+    def face_select(self):
+        return self.__data['FACE_SELECT']
+
+    @property
+    def loop_verts(self):
+        return self.__data['LOOP_VERTS']
+
+    @property
+    def loop_faces(self):
+        return self.__data['LOOP_FACES']
+
+    @property
+    def face_loop_starts(self):
+        return self.__data['FACE_LOOP_STARTS']
+
+    @property
+    def face_loop_totals(self):
+        return self.__data['FACE_LOOP_TOTALS']
+
+    def get_face_loops(self, face_indices):
+        """
+        Return the loop indices of faces. Loops of each face are
+        concatenated in order of face_indices.
+        """
+
+        face_indices = np.asarray(face_indices, dtype=np.int64)
+        starts = self.face_loop_starts[face_indices]
+        counts = self.face_loop_totals[face_indices].astype(np.int64)
+        total = int(counts.sum())
+        base = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+
+        return base + np.arange(total)
+
+    def read(self):
+        """
+        Read all data from the mesh, and discard the modification which is
+        not written back
+        """
+
+        if self.__is_edit_mode:
+            bm = bmesh.from_edit_mesh(self.__object.data)
+            data = read_bmesh(bm, self.__uv_layer_name)
+        else:
+            data = _read_mesh(self.__object.data, self.__uv_layer_name)
+
+        self.__data = data
+        self.__dirty = {
+            name: np.zeros(len(data[name]), dtype=bool)
+            for name in _ATTRIBUTES
+        }
+
+    def mark_dirty(self, name, indices=None):
+        """
+        Notify that the data is modified.
+        name is 'UV', 'UV_SELECT', 'PIN_UV' or 'FACE_SELECT'.
+        indices is the loop (or face) indices of the modified data, or
+        the boolean mask. All data is marked when indices is None.
+        """
+
+        if name not in self.__dirty:
+            raise ValueError("Invalid attribute: {}".format(name))
+
+        if indices is None:
+            self.__dirty[name][:] = True
+        else:
+            self.__dirty[name][indices] = True
+
+    def is_dirty(self):
+        return any(np.any(d) for d in self.__dirty.values())
+
+    def get_dirty_ranges(self, name):
+        return calc_dirty_ranges(self.__dirty[name])
+
+    def write_back(self, update=True):
+        """
+        Write back the modified data to the mesh.
+        The mesh is updated when update is True.
+        Return True if any data is written back.
+        """
+
+        if not self.is_dirty():
+            return False
+
+        if self.__is_edit_mode:
+            self.__write_back_to_edit_mesh()
+        else:
+            self.__write_back_to_mesh()
+
+        for dirty in self.__dirty.values():
+            dirty[:] = False
+
+        if update:
+            if self.__is_edit_mode:
+                bmesh.update_edit_mesh(self.__object.data)
+            else:
+                self.__object.data.update()
+
+        return True
+
+    def __write_back_to_mesh(self):
+        mesh = self.__object.data
+        for name, (collection, prop, _, _) in _ATTRIBUTES.items():
+            dirty = self.__dirty[name]
+            num_dirty = np.count_nonzero(dirty)
+            if num_dirty == 0:
+                continue
+
+            items = _get_collection(mesh, self.__uv_layer_name, collection)
+            values = self.__data[name]
+            if num_dirty * _PARTIAL_WRITE_RATIO >= len(dirty):
+                items.foreach_set(prop, values.ravel())
+                continue
+
+            # foreach_set can not write the part of the collection, so
+            # the items in the dirty ranges are written one by one.
+            starts, ends = calc_dirty_ranges(dirty)
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                for i, value in enumerate(values[start:end].tolist(),
+                                          start):
+                    setattr(items[i], prop, value)
+
+    def __write_back_to_edit_mesh(self):
+        bm = bmesh.from_edit_mesh(self.__object.data)
+        bm.faces.ensure_lookup_table()
+        uv_layer = bm.loops.layers.uv[self.__uv_layer_name]
+
+        loop_faces = self.__data['LOOP_FACES']
+        loop_starts = self.__data['FACE_LOOP_STARTS']
+        for name, (_, prop, _, _) in _LOOP_ATTRIBUTES.items():
+            loop_indices = np.flatnonzero(self.__dirty[name])
+            if len(loop_indices) == 0:
+                continue
+
+            faces = loop_faces[loop_indices]
+            corners = loop_indices - loop_starts[faces]
+            values = self.__data[name][loop_indices].tolist()
+            for fidx, cidx, value in zip(faces.tolist(), corners.tolist(),
+                                         values):
+                setattr(bm.faces[fidx].loops[cidx][uv_layer], prop, value)
+
+        face_indices = np.flatnonzero(self.__dirty['FACE_SELECT'])
+        values = self.__data['FACE_SELECT'][face_indices].tolist()
+        for fidx, value in zip(face_indices.tolist(), values):
+            bm.faces[fidx].select_set(value)
@@ -0,0 +1,160 @@
+import importlib
+
+import bmesh
+from mathutils import Vector
+import numpy as np
+
+from . import common
+
+
+class TestCommonIslandCache(common.TestBase):
+    module_name = "common"
+    submodule_name = "island_cache"
+    idname = []
+
+    def setUpEachMethod(self):
+        self.common = importlib.import_module("magic_uv.common")
+        self.cache = self.common.IslandCache
+        self.cache.clear()
+        self.max_memory_size = self.cache.max_memory_size
+        self.bmeshes = []
+
+    def tearDownEachMethod(self):
+        self.cache.max_memory_size = self.max_memory_size
+        self.cache.clear()
+        for bm in self.bmeshes:
+            bm.free()
+
+    def __make_grid(self, segments=4):
+        bm = bmesh.new()
+        bmesh.ops.create_grid(bm, x_segments=segments, y_segments=segments,
+                              size=1.0)
+        uv_layer = bm.loops.layers.uv.new("UVMap")
+        for f in bm.faces:
+            for l in f.loops:
+                l[uv_layer].uv = (l.vert.co.x, l.vert.co.y)
+        bm.faces.ensure_lookup_table()
+        self.bmeshes.append(bm)
+        return bm, uv_layer
+
+    def __get_islands(self, bm, only_selected=False):
+        info = self.common.get_island_info_from_bmesh(bm, only_selected)
+        return sorted(
+            (tuple(sorted(f["face"].index for f in isl["faces"])),
+             tuple(np.round(isl["min"], 6)), tuple(np.round(isl["max"], 6)))
+            for isl in info)
+
+    def __get_fresh_islands(self, bm, only_selected=False):
+        self.cache.clear()
+        return self.__get_islands(bm, only_selected)
+
+    def __assert_cache_info(self, hits, misses, num_entries):
+        info = self.cache.cache_info()
+        self.assertEqual(info["hits"], hits)
+        self.assertEqual(info["misses"], misses)
+        self.assertEqual(info["num_entries"], num_entries)
+
+    def test_hit(self):
+        print("[TEST] Hit")
+        bm, _ = self.__make_grid()
+        islands = self.__get_islands(bm)
+        self.assertEqual(len(islands), 1)
+        self.__assert_cache_info(hits=0, misses=1, num_entries=1)
+
+        self.assertListEqual(self.__get_islands(bm), islands)
+        self.__assert_cache_info(hits=1, misses=1, num_entries=1)
+
+    def test_miss(self):
+        print("[TEST] Miss")
+        bm, _ = self.__make_grid()
+        self.__get_islands(bm)
+
+        # Topology is changed.
+        bmesh.ops.delete(bm, geom=[bm.faces[0]], context='FACES_ONLY')
+        bm.faces.ensure_lookup_table()
+        islands = self.__get_islands(bm)
+        self.__assert_cache_info(hits=0, misses=2, num_entries=1)
+        self.assertListEqual(islands, self.__get_fresh_islands(bm))
+
+    def test_uv_change(self):
+        print("[TEST] UV Change")
+        bm, uv_layer = self.__make_grid()
+        self.__get_islands(bm)
+
+        # UV coordinates are changed without notifying the cache.
+        for l in bm.faces[0].loops:
+            l[uv_layer].uv += Vector((2.0, 0.0))
+        islands = self.__get_islands(bm)
+        self.__assert_cache_info(hits=1, misses=1, num_entries=1)
+        self.assertEqual(len(islands), 2)
+        self.assertListEqual(islands, self.__get_fresh_islands(bm))
+
+        # UV coordinates are changed and the cache is notified.
+        loops = list(bm.faces[1].loops)
+        for l in loops:
+            l[uv_layer].uv += Vector((0.0, 2.0))
+        self.common.update_island_cache(bm, uv_layer, loops)
+        islands = self.__get_islands(bm)
+        self.__assert_cache_info(hits=2, misses=1, num_entries=1)
+        self.assertEqual(len(islands), 3)
+
+        self.cache.clear()
+        self.__get_islands(bm)
+        for l in loops:
+            l[uv_layer].uv -= Vector((0.0, 2.0))
+        self.common.update_island_cache(bm, uv_layer, loops)
+        islands = self.__get_islands(bm)
+        self.assertEqual(len(islands), 2)
+        self.assertListEqual(islands, self.__get_fresh_islands(bm))
+
+    def test_selection_change(self):
+        print("[TEST] Selection Change")
+        bm, _ = self.__make_grid()
+        for f in bm.faces:
+            f.select = f.index < 2
+        islands = self.__get_islands(bm, only_selected=True)
+        self.assertEqual(sum(len(isl[0]) for isl in islands), 2)
+
+        for f in bm.faces:
+            f.select = f.index >= 2
+        islands = self.__get_islands(bm, only_selected=True)
+        self.__assert_cache_info(hits=0, misses=2, num_entries=1)
+        self.assertEqual(sum(len(isl[0]) for isl in islands),
+                         len(bm.faces) - 2)
+        self.assertListEqual(islands,
+                             self.__get_fresh_islands(bm, only_selected=True))
+
+        # Entries are separated by whether only selected faces are used.
+        self.__get_islands(bm, only_selected=False)
+        self.__assert_cache_info(hits=0, misses=3, num_entries=2)
+
+    def test_lru_eviction(self):
+        print("[TEST] LRU Eviction")
+        bms = [self.__make_grid()[0] for _ in range(3)]
+        self.__get_islands(bms[0])
+        memory_size = self.cache.cache_info()["memory_size"]
+        self.cache.max_memory_size = memory_size * 2
+
+        self.__get_islands(bms[1])
+        self.__get_islands(bms[0])      # bms[1] is least recently used.
+        self.__get_islands(bms[2])
+        self.__assert_cache_info(hits=1, misses=3, num_entries=2)
+        self.assertLessEqual(self.cache.cache_info()["memory_size"],
+                             self.cache.max_memory_size)
+
+        self.__get_islands(bms[0])
+        self.__assert_cache_info(hits=2, misses=3, num_entries=2)
+        self.__get_islands(bms[1])
+        self.__assert_cache_info(hits=2, misses=4, num_entries=2)
+
+    def test_memory_cap(self):
+        print("[TEST] Memory Cap")
+        self.cache.max_memory_size = 1
+        bm, _ = self.__make_grid()
+        islands = self.__get_islands(bm)
+        self.assertEqual(len(islands), 1)
+        self.__assert_cache_info(hits=0, misses=1, num_entries=0)
+        self.assertEqual(self.cache.cache_info()["memory_size"], 0)
+
+        self.assertListEqual(self.__get_islands(bm), islands)
+        self.__assert_cache_info(hits=0, misses=2, num_entries=0)
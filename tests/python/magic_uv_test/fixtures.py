@@ -0,0 +1,309 @@
+"""
+Procedural mesh/UV fixtures for scaling tests.
+
+All layouts are built from grids of quads by NumPy, and the object is
+created by foreach_set, so that fixtures with millions of faces can be
+built quickly. Random values are generated from the seed, so that the same
+arguments always produce the same mesh.
+
+    data = fixtures.generate('IDENTICAL_ISLANDS', 10000, num_islands=100)
+    obj = fixtures.create_object("Fixture", data)
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+
+# Mesh data of the fixture. Each face is a quad which has 4 loops.
+#   vert_cos: (num_verts, 3) coordinates of vertices
+#   loop_verts: (num_faces * 4) vertex indices of loops
+#   loop_uvs: (num_faces * 4, 2) UV coordinates of loops
+#   face_islands: (num_faces) index of the grid which the face belongs to
+MeshData = namedtuple("MeshData",
+                      ["vert_cos", "loop_verts", "loop_uvs", "face_islands"])
+
+LAYOUTS = [
+    # Separated islands laid out in [0, 1].
+    'ISLANDS',
+    # Islands which have the same topology and UV shape (for Pack UV).
+    'IDENTICAL_ISLANDS',
+    # Islands overlapping each other (for UV Inspection).
+    'OVERLAPPED_ISLANDS',
+    # Grids with faces whose UVs are flipped (for UV Inspection).
+    'FLIPPED_FACES',
+    # Long strips of quads with noisy UVs (for Align UV and Smooth UV).
+    'EDGE_LOOPS',
+    # Grids symmetric about X=0 whose -X half has noisy UVs (for Mirror UV).
+    'MIRRORED_HALVES',
+]
+
+
+def _split_faces(num_faces, num_islands):
+    num_islands = max(min(num_islands, num_faces), 1)
+    face_counts = np.full(num_islands, num_faces // num_islands,
+                          dtype=np.int64)
+    face_counts[:num_faces % num_islands] += 1
+    return face_counts
+
+
+def _make_grids(face_counts, cols):
+    """
+    Make the grid of quads for each island. The island i has
+    face_counts[i] faces in cols[i] columns (last row may be partial).
+    Return (vert_islands, grid_x, grid_y, loop_verts, face_islands).
+    grid_x and grid_y are the position of the vertex in the grid.
+    """
+
+    rows = (face_counts + cols - 1) // cols
+
+    vert_counts = (cols + 1) * (rows + 1)
+    vert_offsets = np.cumsum(vert_counts) - vert_counts
+    vert_islands = np.repeat(np.arange(len(face_counts)), vert_counts)
+    local = np.arange(vert_counts.sum()) - vert_offsets[vert_islands]
+    grid_x = local % (cols[vert_islands] + 1)
+    grid_y = local // (cols[vert_islands] + 1)
+
+    face_islands = np.repeat(np.arange(len(face_counts)), face_counts)
+    local = np.arange(face_counts.sum()) - np.repeat(
+        np.cumsum(face_counts) - face_counts, face_counts)
+    face_cols = cols[face_islands]
+    v0 = vert_offsets[face_islands] + (local // face_cols) * (face_cols + 1)
+    v0 += local % face_cols
+    loop_verts = np.stack(
+        (v0, v0 + 1, v0 + face_cols + 2, v0 + face_cols + 1), axis=1).ravel()
+
+    return vert_islands, grid_x, grid_y, loop_verts, face_islands
+
+
+def _square_cols(face_counts):
+    return np.ceil(np.sqrt(face_counts)).astype(np.int64)
+
+
+def _place_on_atlas(vert_islands, grid_x, grid_y, cols, rows, num_islands):
+    """
+    Place the islands on the grid both in 3D space and on the UV map.
+    Return (vert_cos, vert_uvs).
+    """
+
+    num_atlas_cols = int(np.ceil(np.sqrt(num_islands)))
+    atlas_x = vert_islands % num_atlas_cols
+    atlas_y = vert_islands // num_atlas_cols
+
+    spacing = int(max(cols.max(), rows.max())) + 2
+    cos = np.zeros((len(vert_islands), 3))
+    cos[:, 0] = atlas_x * spacing + grid_x
+    cos[:, 1] = atlas_y * spacing + grid_y
+
+    cell_size = 1.0 / num_atlas_cols
+    scale = 0.9 * cell_size / np.maximum(cols, rows)[vert_islands]
+    uvs = np.empty((len(vert_islands), 2))
+    uvs[:, 0] = atlas_x * cell_size + grid_x * scale
+    uvs[:, 1] = atlas_y * cell_size + grid_y * scale
+
+    return cos, uvs
+
+
+def _islands(num_faces, num_islands, _):
+    face_counts = _split_faces(num_faces, num_islands)
+    cols = _square_cols(face_counts)
+    rows = (face_counts + cols - 1) // cols
+    vert_islands, grid_x, grid_y, loop_verts, face_islands = \
+        _make_grids(face_counts, cols)
+    cos, uvs = _place_on_atlas(vert_islands, grid_x, grid_y, cols, rows,
+                               len(face_counts))
+
+    return MeshData(cos, loop_verts, uvs[loop_verts], face_islands)
+
+
+def _identical_islands(num_faces, num_islands, rng):
+    if num_faces % num_islands != 0:
+        raise ValueError("num_faces must be a multiple of num_islands")
+
+    face_counts = _split_faces(num_faces, num_islands)
+    cols = _square_cols(face_counts)
+    rows = (face_counts + cols - 1) // cols
+    vert_islands, grid_x, grid_y, loop_verts, face_islands = \
+        _make_grids(face_counts, cols)
+    cos, uvs = _place_on_atlas(vert_islands, grid_x, grid_y, cols, rows,
+                               len(face_counts))
+
+    # All islands share the same distortion of UVs.
+    verts_per_island = (cols[0] + 1) * (rows[0] + 1)
+    num_atlas_cols = int(np.ceil(np.sqrt(len(face_counts))))
+    grid_size = 0.9 / num_atlas_cols / max(cols[0], rows[0])
+    noise = rng.uniform(-0.2, 0.2, (verts_per_island, 2)) * grid_size
+    uvs += np.tile(noise, (len(face_counts), 1))
+
+    return MeshData(cos, loop_verts, uvs[loop_verts], face_islands)
+
+
+def _overlapped_islands(num_faces, num_islands, rng):
+    face_counts = _split_faces(num_faces, num_islands)
+    cols = _square_cols(face_counts)
+    rows = (face_counts + cols - 1) // cols
+    vert_islands, grid_x, grid_y, loop_verts, face_islands = \
+        _make_grids(face_counts, cols)
+    cos, _ = _place_on_atlas(vert_islands, grid_x, grid_y, cols, rows,
+                             len(face_counts))
+
+    # Each island covers the half of [0, 1], and is shifted randomly.
+    offsets = rng.uniform(0.0, 0.5, (len(face_counts), 2))
+    scale = 0.5 / np.maximum(cols, rows)
+    uvs = np.empty((len(vert_islands), 2))
+    uvs[:, 0] = offsets[vert_islands, 0] + grid_x * scale[vert_islands]
+    uvs[:, 1] = offsets[vert_islands, 1] + grid_y * scale[vert_islands]
+
+    return MeshData(cos, loop_verts, uvs[loop_verts], face_islands)
+
+
+def _flipped_faces(num_faces, num_islands, rng, flipped_ratio=0.1):
+    data = _islands(num_faces, num_islands, rng)
+
+    # Mirror UVs of the face about its center to flip the winding.
+    loop_uvs = data.loop_uvs.reshape(-1, 4, 2).copy()
+    flipped = rng.rand(num_faces) < flipped_ratio
+    centers = loop_uvs[flipped, :, 0].mean(axis=1)
+    loop_uvs[flipped, :, 0] = 2.0 * centers[:, np.newaxis] - \
+        loop_uvs[flipped, :, 0]
+
+    return data._replace(loop_uvs=loop_uvs.reshape(-1, 2))
+
+
+def _edge_loops(num_faces, num_islands, rng, noise=0.3):
+    face_counts = _split_faces(num_faces, num_islands)
+    # 1 row of quads, which has 2 long edge loops.
+    cols = face_counts.copy()
+    vert_islands, grid_x, grid_y, loop_verts, face_islands = \
+        _make_grids(face_counts, cols)
+
+    cos = np.zeros((len(vert_islands), 3))
+    cos[:, 0] = grid_x
+    cos[:, 1] = vert_islands * 3 + grid_y
+
+    # Strips are stacked on the UV map, and UVs are shaken along V.
+    strip_height = 1.0 / len(face_counts)
+    scale_x = 1.0 / cols[vert_islands]
+    uvs = np.empty((len(vert_islands), 2))
+    uvs[:, 0] = grid_x * scale_x
+    uvs[:, 1] = (vert_islands + grid_y * 0.5) * strip_height
+    uvs[:, 1] += rng.uniform(-noise, noise, len(vert_islands)) * \
+        strip_height * 0.25
+
+    return MeshData(cos, loop_verts, uvs[loop_verts], face_islands)
+
+
+def _mirrored_halves(num_faces, num_islands, rng, noise=0.2):
+    if num_faces % (2 * num_islands) != 0:
+        raise ValueError("num_faces must be a multiple of 2 * num_islands")
+
+    # Even number of columns which divides the number of faces, so that
+    # the grid is split at X=0 and has no partial row.
+    face_counts = _split_faces(num_faces, num_islands)
+    count = int(face_counts[0])
+    num_cols = max(c for c in range(2, int(np.sqrt(count)) * 2 + 1, 2)
+                   if count % c == 0)
+    cols = np.full(len(face_counts), num_cols, dtype=np.int64)
+    rows = (face_counts + cols - 1) // cols
+    vert_islands, grid_x, grid_y, loop_verts, face_islands = \
+        _make_grids(face_counts, cols)
+
+    # Grids are stacked along Y to keep the symmetry about X=0.
+    half = cols[vert_islands] // 2
+    row_offsets = np.cumsum(rows + 2) - (rows + 2)
+    cos = np.zeros((len(vert_islands), 3))
+    cos[:, 0] = grid_x - half
+    cos[:, 1] = row_offsets[vert_islands] + grid_y
+
+    island_height = 1.0 / len(face_counts)
+    scale = island_height * 0.9 / np.maximum(cols, rows)[vert_islands]
+    uvs = np.empty((len(vert_islands), 2))
+    uvs[:, 0] = grid_x * scale
+    uvs[:, 1] = vert_islands * island_height + grid_y * scale
+    negative = cos[:, 0] < 0.0
+    uvs[negative] += rng.uniform(-noise, noise, (np.count_nonzero(negative),
+                                                 2)) * scale[negative, None]
+
+    return MeshData(cos, loop_verts, uvs[loop_verts], face_islands)
+
+
+_GENERATORS = {
+    'ISLANDS': _islands,
+    'IDENTICAL_ISLANDS': _identical_islands,
+    'OVERLAPPED_ISLANDS': _overlapped_islands,
+    'FLIPPED_FACES': _flipped_faces,
+    'EDGE_LOOPS': _edge_loops,
+    'MIRRORED_HALVES': _mirrored_halves,
+}
+
+
+def generate(layout, num_faces, num_islands=1, seed=0, **options):
+    """
+    Generate the mesh data of the layout which has num_faces faces.
+    options are the layout specific parameters (flipped_ratio for
+    'FLIPPED_FACES', noise for 'EDGE_LOOPS' and 'MIRRORED_HALVES').
+    """
+
+    if layout not in _GENERATORS:
+        raise ValueError("Invalid layout: {}".format(layout))
+    if num_faces <= 0:
+        raise ValueError("num_faces must be positive")
+
+    rng = np.random.RandomState(seed)
+    data = _GENERATORS[layout](num_faces, num_islands, rng, **options)
+
+    return MeshData(data.vert_cos.astype(np.float32),
+                    data.loop_verts.astype(np.int32),
+                    data.loop_uvs.astype(np.float32),
+                    data.face_islands.astype(np.int32))
+
+
+def create_mesh(name, data):
+    import bpy
+    from . import compatibility as compat
+
+    num_faces = len(data.loop_verts) // 4
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(data.vert_cos))
+    mesh.vertices.foreach_set("co", data.vert_cos.ravel())
+    mesh.loops.add(len(data.loop_verts))
+    mesh.loops.foreach_set("vertex_index", data.loop_verts)
+    mesh.polygons.add(num_faces)
+    mesh.polygons.foreach_set(
+        "loop_start", np.arange(0, num_faces * 4, 4, dtype=np.int32))
+    mesh.polygons.foreach_set(
+        "loop_total", np.full(num_faces, 4, dtype=np.int32))
+    if compat.check_version(2, 80, 0) < 0:
+        mesh.uv_textures.new()
+    else:
+        mesh.uv_layers.new()
+    mesh.uv_layers.active.data.foreach_set("uv", data.loop_uvs.ravel())
+    mesh.update(calc_edges=True)
+
+    return mesh
+
+
+def create_object(name, data):
+    """
+    Create the mesh object from the data, and make it active and selected
+    """
+
+    import bpy
+    from . import compatibility as compat
+
+    obj = bpy.data.objects.new(name, create_mesh(name, data))
+    if compat.check_version(2, 80, 0) < 0:
+        bpy.context.scene.objects.link(obj)
+        obj.select = True
+    else:
+        bpy.context.scene.collection.objects.link(obj)
+        obj.select_set(True)
+    compat.set_active_object(obj)
+
+    return obj
+
+
+def create_fixture(name, layout, num_faces, num_islands=1, seed=0,
+                   **options):
+    return create_object(
+        name, generate(layout, num_faces, num_islands, seed, **options))
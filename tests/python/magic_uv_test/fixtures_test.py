@@ -0,0 +1,161 @@
+import importlib
+import itertools
+
+import bpy
+import bmesh
+import numpy as np
+
+from . import common
+from . import fixtures
+
+
+def calc_signed_uv_areas(data):
+    uvs = data.loop_uvs.reshape(-1, 4, 2).astype(np.float64)
+    rolled = np.roll(uvs, -1, axis=1)
+    cross = uvs[:, :, 0] * rolled[:, :, 1]
+    cross -= rolled[:, :, 0] * uvs[:, :, 1]
+    return 0.5 * np.sum(cross, axis=1)
+
+
+class TestFixtures(common.TestBase):
+    module_name = "fixtures"
+    idname = [
+        # Mirror UV
+        ('OPERATOR', 'uv.muv_mirror_uv'),
+    ]
+
+    def setUpEachMethod(self):
+        self.common = importlib.import_module("magic_uv.common")
+
+    def __create_bmesh(self, name, data):
+        obj = fixtures.create_object(name, data)
+        common.select_object_only(name)
+        bpy.ops.object.mode_set(mode='EDIT')
+        bm = bmesh.from_edit_mesh(obj.data)
+        bm.faces.ensure_lookup_table()
+        return obj, bm, bm.loops.layers.uv.verify()
+
+    def test_same_seed(self):
+        print("[TEST] Same Seed")
+        for layout in fixtures.LAYOUTS:
+            data_1 = fixtures.generate(layout, 120, 3, seed=7)
+            data_2 = fixtures.generate(layout, 120, 3, seed=7)
+            for array_1, array_2 in zip(data_1, data_2):
+                np.testing.assert_array_equal(array_1, array_2)
+
+        # Random layouts differ by the seed.
+        for layout in ('IDENTICAL_ISLANDS', 'OVERLAPPED_ISLANDS',
+                       'FLIPPED_FACES', 'EDGE_LOOPS', 'MIRRORED_HALVES'):
+            data_1 = fixtures.generate(layout, 120, 3, seed=7)
+            data_2 = fixtures.generate(layout, 120, 3, seed=8)
+            self.assertFalse(np.array_equal(data_1.loop_uvs,
+                                            data_2.loop_uvs))
+
+    def test_face_counts(self):
+        print("[TEST] Face Counts")
+        cases = [(1, 1), (101, 7), (120, 3), (120, 200)]
+        for layout, (num_faces, num_islands) in itertools.product(
+                fixtures.LAYOUTS, cases):
+            if layout == 'IDENTICAL_ISLANDS' and num_faces % num_islands:
+                with self.assertRaises(ValueError):
+                    fixtures.generate(layout, num_faces, num_islands)
+                continue
+            if layout == 'MIRRORED_HALVES' and \
+                    num_faces % (2 * num_islands):
+                with self.assertRaises(ValueError):
+                    fixtures.generate(layout, num_faces, num_islands)
+                continue
+
+            data = fixtures.generate(layout, num_faces, num_islands)
+            expected_islands = min(num_islands, num_faces)
+            self.assertEqual(len(data.loop_verts), num_faces * 4)
+            self.assertEqual(data.loop_uvs.shape, (num_faces * 4, 2))
+            self.assertEqual(len(data.face_islands), num_faces)
+            self.assertLess(data.loop_verts.max(), len(data.vert_cos))
+
+            # Faces are split into the islands as evenly as possible.
+            counts = np.bincount(data.face_islands)
+            self.assertEqual(len(counts), expected_islands)
+            self.assertLessEqual(counts.max() - counts.min(), 1)
+
+    def test_overlapped_islands(self):
+        print("[TEST] Overlapped Islands")
+        num_islands = 4
+        for layout, overlapped in (('OVERLAPPED_ISLANDS', True),
+                                   ('ISLANDS', False)):
+            data = fixtures.generate(layout, 64, num_islands, seed=3)
+            _, bm, uv_layer = self.__create_bmesh(layout, data)
+            result = self.common.get_overlapped_uv_info(
+                [bm], [list(bm.faces)], [uv_layer], 'FACE',
+                only_selected=False)
+            islands = data.face_islands
+            pairs = {tuple(sorted((islands[i["clip_face"].index],
+                                   islands[i["subject_face"].index])))
+                     for i in result}
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+            # Every pair of islands overlaps, and faces in the same island
+            # do not overlap.
+            if overlapped:
+                self.assertSetEqual(
+                    pairs,
+                    set(itertools.combinations(range(num_islands), 2)))
+            else:
+                self.assertSetEqual(pairs, set())
+
+    def test_flipped_faces(self):
+        print("[TEST] Flipped Faces")
+        for layout, ratio in (('FLIPPED_FACES', 0.1), ('ISLANDS', 0.0)):
+            data = fixtures.generate(layout, 200, 4, seed=5)
+            expected = np.flatnonzero(calc_signed_uv_areas(data) < 0.0)
+            if ratio > 0.0:
+                self.assertGreater(len(expected), 0)
+                self.assertLess(len(expected), 200 * ratio * 2)
+            else:
+                self.assertEqual(len(expected), 0)
+
+            _, bm, uv_layer = self.__create_bmesh(layout, data)
+            result = self.common.get_flipped_uv_info(
+                [bm], [list(bm.faces)], [uv_layer])
+            actual = sorted(info["face"].index for info in result)
+            bpy.ops.object.mode_set(mode='OBJECT')
+            self.assertListEqual(actual, expected.tolist())
+
+    def test_mirrored_halves(self):
+        print("[TEST] Mirrored Halves")
+        data = fixtures.generate('MIRRORED_HALVES', 120, 3, seed=9)
+        cos = data.vert_cos
+        vert_to_index = {tuple(co): i for i, co in enumerate(cos.tolist())}
+        mirrored = np.array([vert_to_index[(-x, y, z)]
+                             for x, y, z in cos.tolist()])
+        negative = cos[:, 0] < 0.0
+
+        # Each face has the mirrored face, and only the -X half has noise.
+        faces = data.loop_verts.reshape(-1, 4)
+        face_keys = {frozenset(f) for f in faces.tolist()}
+        for f in faces.tolist():
+            self.assertIn(frozenset(mirrored[f].tolist()), face_keys)
+        # V of the vertex is same as the mirrored vertex without noise.
+        vert_uvs = np.zeros((len(cos), 2), dtype=np.float32)
+        vert_uvs[data.loop_verts] = data.loop_uvs
+        diffs = np.abs(vert_uvs[:, 1] - vert_uvs[mirrored, 1])
+        self.assertGreater(diffs[negative].max(), 1e-4)
+
+        # Mirror UV copies UVs of +X half to -X half.
+        obj = fixtures.create_object("Mirrored", data)
+        negative_faces = cos[faces].mean(axis=1)[:, 0] < 0.0
+        obj.data.polygons.foreach_set("select", negative_faces)
+        common.select_object_only("Mirrored")
+        bpy.ops.object.mode_set(mode='EDIT')
+        result = bpy.ops.uv.muv_mirror_uv(axis='X', origin='LOCAL')
+        self.assertSetEqual(result, {'FINISHED'})
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        loop_uvs = np.empty(len(data.loop_verts) * 2, dtype=np.float32)
+        obj.data.uv_layers.active.data.foreach_get("uv", loop_uvs)
+        loop_uvs = loop_uvs.reshape(-1, 2)
+        negative_loops = np.repeat(negative_faces, 4)
+        expected = data.loop_uvs.copy()
+        expected[negative_loops] = \
+            vert_uvs[mirrored[data.loop_verts[negative_loops]]]
+        np.testing.assert_allclose(loop_uvs, expected, atol=1e-6)
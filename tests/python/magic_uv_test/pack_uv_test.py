@@ -1,6 +1,8 @@
 import unittest
 
 import bpy
+import bmesh
+import numpy as np
 
 from . import common
 from . import compatibility as compat
@@ -60,6 +62,77 @@ class TestPackUV(common.TestBase):
         )
         self.assertSetEqual(result, {'FINISHED'})
 
+    def __setup_same_islands(self):
+        """
+        Split faces into islands, and make 2 groups of the same islands.
+        Return the face indices of each group.
+        """
+
+        bpy.ops.mesh.select_all(action='SELECT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.mesh.split()
+
+        obj = compat.get_active_object(bpy.context)
+        bm = bmesh.from_edit_mesh(obj.data)
+        uv_layer = bm.loops.layers.uv.verify()
+        bm.faces.ensure_lookup_table()
+        # (center, half size) of each group
+        squares = [((0.3, 0.3), (0.1, 0.1)), ((0.6, 0.7), (0.2, 0.1))]
+        corners = [(-1.0, -1.0), (1.0, -1.0), (1.0, 1.0), (-1.0, 1.0)]
+        groups = [[], []]
+        for f in bm.faces:
+            group = 0 if f.index < len(bm.faces) // 2 else 1
+            (cx, cy), (hx, hy) = squares[group]
+            for l, (sx, sy) in zip(f.loops, corners):
+                l[uv_layer].uv = (cx + sx * hx, cy + sy * hy)
+            groups[group].append(f.index)
+        bmesh.update_edit_mesh(obj.data)
+
+        return groups
+
+    def __get_face_uvs(self):
+        obj = compat.get_active_object(bpy.context)
+        bm = bmesh.from_edit_mesh(obj.data)
+        uv_layer = bm.loops.layers.uv.verify()
+        bm.faces.ensure_lookup_table()
+        return [np.array([l[uv_layer].uv.to_tuple() for l in f.loops])
+                for f in bm.faces]
+
+    def test_ok_builtin_pack_method(self):
+        print("[TEST] (OK) Built-in pack method")
+        groups = self.__setup_same_islands()
+        margin = 0.03
+        result = bpy.ops.uv.muv_pack_uv(
+            rotate=True,
+            margin=margin,
+            pack_method='BUILTIN',
+        )
+        self.assertSetEqual(result, {'FINISHED'})
+
+        face_uvs = self.__get_face_uvs()
+        eps = 1e-5
+
+        # Islands are packed in the unit square.
+        for uvs in face_uvs:
+            self.assertGreaterEqual(uvs.min(), -eps)
+            self.assertLessEqual(uvs.max(), 1.0 + eps)
+
+        # Same islands receive UVs of the representative island.
+        for group in groups:
+            rep = face_uvs[group[0]]
+            for fidx in group[1:]:
+                np.testing.assert_allclose(
+                    np.array(sorted(face_uvs[fidx].tolist())),
+                    np.array(sorted(rep.tolist())), atol=eps)
+
+        # Representative islands do not overlap and keep the margin.
+        min_0, max_0 = face_uvs[groups[0][0]].min(axis=0), \
+            face_uvs[groups[0][0]].max(axis=0)
+        min_1, max_1 = face_uvs[groups[1][0]].min(axis=0), \
+            face_uvs[groups[1][0]].max(axis=0)
+        gap = np.max(np.maximum(min_1 - max_0, min_0 - max_1))
+        self.assertGreaterEqual(gap, margin - eps)
+
     @unittest.skipIf(compat.check_version(2, 80, 0) < 0,
                      "Not supported in <2.80")
     def test_ok_multiple_objects(self):
@@ -0,0 +1,142 @@
+import importlib
+import json
+import os
+import shutil
+import tempfile
+
+import bpy
+
+from . import common
+
+
+class TestProfiler(common.TestBase):
+    module_name = "profiler"
+    idname = [
+        # Profiler
+        ('OPERATOR', 'uv.muv_profiler_clear_records'),
+        ('OPERATOR', 'uv.muv_profiler_dump_chrome_trace'),
+    ]
+
+    def setUpEachMethod(self):
+        self.common = importlib.import_module("magic_uv.common")
+        self.profiler = self.common.Profiler
+        self.profiler.clear()
+        self.common.enable_profile_mode()
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDownEachMethod(self):
+        self.common.disable_profile_mode()
+        self.profiler.clear()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_profile_span(self):
+        print("[TEST] Profile Span")
+        for _ in range(3):
+            with self.common.profile_span('compute'):
+                pass
+        with self.common.profile_span('Operator', category='operator'):
+            pass
+
+        stats = {(s["category"], s["name"]): s
+                 for s in self.profiler.get_statistics()}
+        self.assertSetEqual(set(stats.keys()),
+                            {('phase', 'compute'), ('operator', 'Operator')})
+        self.assertEqual(stats[('phase', 'compute')]["count"], 3)
+        self.assertEqual(stats[('operator', 'Operator')]["count"], 1)
+        self.assertEqual(self.profiler.num_events(), 4)
+
+        # Spans are not recorded when profiling mode is disabled.
+        self.common.disable_profile_mode()
+        with self.common.profile_span('compute'):
+            pass
+        self.assertEqual(self.profiler.num_events(), 4)
+
+    def test_get_statistics(self):
+        print("[TEST] Get Statistics")
+        for i in range(1, 101):
+            self.profiler.record('phase', 'compute', 0.0, i * 0.001)
+        self.profiler.record('phase', 'extract', 0.0, 1.0)
+
+        stats = self.profiler.get_statistics(percentiles=(50, 90))
+        self.assertEqual([s["name"] for s in stats], ['compute', 'extract'])
+        s = stats[0]
+        self.assertEqual(s["count"], 100)
+        self.assertAlmostEqual(s["total"], 5.05)
+        self.assertAlmostEqual(s["mean"], 0.0505)
+        self.assertAlmostEqual(s["max"], 0.1)
+        self.assertAlmostEqual(s["percentiles"]["50"], 0.0505)
+        self.assertAlmostEqual(s["percentiles"]["90"], 0.0901)
+
+        # Statistics are updated by the new record.
+        self.profiler.record('phase', 'compute', 0.0, 0.5)
+        stats = self.profiler.get_statistics(percentiles=(50, 90))
+        self.assertEqual(stats[0]["count"], 101)
+        self.assertAlmostEqual(stats[0]["max"], 0.5)
+
+    def test_get_statistics_reservoir(self):
+        print("[TEST] Get Statistics (Reservoir)")
+        reservoir_size = self.profiler.reservoir_size
+        try:
+            self.profiler.reservoir_size = 10
+            for i in range(1, 1001):
+                self.profiler.record('phase', 'compute', 0.0, i * 0.001)
+        finally:
+            self.profiler.reservoir_size = reservoir_size
+
+        # Count, total, mean and max are exact, and percentiles are
+        # estimated from the recorded durations.
+        s = self.profiler.get_statistics(percentiles=(0, 50, 100))[0]
+        self.assertEqual(s["count"], 1000)
+        self.assertAlmostEqual(s["total"], 500.5)
+        self.assertAlmostEqual(s["mean"], 0.5005)
+        self.assertAlmostEqual(s["max"], 1.0)
+        for p in ("0", "50", "100"):
+            self.assertGreaterEqual(s["percentiles"][p], 0.001)
+            self.assertLessEqual(s["percentiles"][p], 1.0)
+
+    def test_dump_chrome_trace(self):
+        print("[TEST] Dump Chrome Trace")
+        max_events = self.profiler.max_events
+        try:
+            self.profiler.max_events = 2
+            self.profiler.record('operator', 'Operator', 1.0, 3.0)
+            self.profiler.record('phase', 'compute', 1.0, 2.0)
+            self.profiler.record('phase', 'write-back', 2.0, 3.0)
+        finally:
+            self.profiler.max_events = max_events
+        self.assertEqual(self.profiler.num_events(), 2)
+        self.assertEqual(self.profiler.num_dropped_events(), 1)
+
+        filepath = os.path.join(self.tmp_dir, "trace.json")
+        self.profiler.dump_chrome_trace(filepath)
+        with open(filepath) as f:
+            trace = json.load(f)
+
+        events = trace["traceEvents"]
+        self.assertEqual([(e["cat"], e["name"]) for e in events],
+                         [('operator', 'Operator'), ('phase', 'compute')])
+        for e in events:
+            self.assertEqual(e["ph"], "X")
+            self.assertEqual(e["pid"], os.getpid())
+        self.assertAlmostEqual(events[0]["dur"], 2000000.0)
+        self.assertAlmostEqual(events[1]["dur"], 1000000.0)
+        self.assertAlmostEqual(events[1]["ts"], events[0]["ts"])
+        self.assertEqual(trace["otherData"]["dropped_events"], 1)
+
+        # Dropped events are still counted in the statistics.
+        stats = self.profiler.get_statistics()
+        self.assertEqual(len(stats), 3)
+
+    def test_ok_operators(self):
+        print("[TEST] (OK) Operators")
+        self.profiler.record('phase', 'compute', 0.0, 1.0)
+
+        filepath = os.path.join(self.tmp_dir, "trace.json")
+        result = bpy.ops.uv.muv_profiler_dump_chrome_trace(filepath=filepath)
+        self.assertSetEqual(result, {'FINISHED'})
+        self.assertTrue(os.path.exists(filepath))
+
+        result = bpy.ops.uv.muv_profiler_clear_records()
+        self.assertSetEqual(result, {'FINISHED'})
+        self.assertEqual(self.profiler.num_events(), 0)
+        self.assertListEqual(self.profiler.get_statistics(), [])
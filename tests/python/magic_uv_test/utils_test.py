@@ -0,0 +1,961 @@
+import importlib
+import itertools
+
+import bpy
+import bmesh
+from mathutils import Matrix, Vector
+import numpy as np
+
+from . import common
+from . import compatibility as compat
+
+
+def make_random_grid_uvs(rng, size, num_offsets):
+    """
+    Make the loop arrays of the grid mesh whose faces are split into UV
+    islands randomly. Faces are connected when they have same offset.
+    """
+
+    faces = np.arange(size * size)
+    rows, cols = faces // size, faces % size
+    v0 = rows * (size + 1) + cols
+    loop_verts = np.stack(
+        [v0, v0 + 1, v0 + size + 2, v0 + size + 1], axis=1).reshape(-1)
+    loop_faces = np.repeat(faces, 4)
+    loop_uvs = np.stack([(loop_verts % (size + 1)) / size,
+                         (loop_verts // (size + 1)) / size], axis=1)
+    offsets = rng.randint(0, num_offsets, size * size) * 2.0
+    loop_uvs[:, 0] += np.repeat(offsets, 4)
+
+    return len(faces), loop_faces, loop_verts, loop_uvs
+
+
+def make_graph(graph_module, num_nodes, edges, keys=None):
+    """
+    Make the graph whose nodes are keyed by keys[i] (i by default), and
+    whose edges are (keys[i], keys[j]) for (i, j) in edges.
+    """
+
+    if keys is None:
+        keys = list(range(num_nodes))
+    graph = graph_module.Graph()
+    for k in keys:
+        graph.add_node(graph_module.Node(k))
+    for i, j in edges:
+        graph.add_edge(graph.get_node(keys[i]), graph.get_node(keys[j]))
+
+    return graph
+
+
+def make_grid_edges(width, height):
+    edges = []
+    for y in range(height):
+        for x in range(width):
+            i = y * width + x
+            if x + 1 < width:
+                edges.append((i, i + 1))
+            if y + 1 < height:
+                edges.append((i, i + width))
+
+    return edges
+
+
+class TestUtilsIsland(common.TestBase):
+    module_name = "utils"
+    submodule_name = "island"
+    idname = []
+
+    def setUpEachMethod(self):
+        self.island = importlib.import_module("magic_uv.utils.island")
+
+    def __assert_same_index(self, index, expected):
+        # Island index may be different, so compare the partition of faces
+        # and the values of the island which each face belongs to.
+        same_1 = index.face_islands[:, None] == index.face_islands[None, :]
+        same_2 = expected.face_islands[:, None] == \
+            expected.face_islands[None, :]
+        self.assertTrue(np.array_equal(same_1, same_2))
+        self.assertEqual(len(index.get_islands()),
+                         len(expected.get_islands()))
+
+        for name in ("island_min_uv", "island_max_uv", "island_ave_uv",
+                     "island_num_uv"):
+            actual = getattr(index, name)[index.face_islands]
+            desired = getattr(expected, name)[expected.face_islands]
+            self.assertTrue(np.allclose(actual, desired), name)
+        for name in ("face_min_uv", "face_max_uv", "face_ave_uv"):
+            self.assertTrue(np.allclose(getattr(index, name),
+                                        getattr(expected, name)), name)
+
+    def test_update_uvs_random(self):
+        print("[TEST] Incremental Update (Random Mesh)")
+        rng = np.random.RandomState(0)
+        for _ in range(50):
+            num_faces, loop_faces, loop_verts, loop_uvs = \
+                make_random_grid_uvs(rng, rng.randint(2, 9), 3)
+            index = self.island.IslandIndex(num_faces, loop_faces,
+                                            loop_verts, loop_uvs)
+            for _ in range(5):
+                loops = rng.choice(len(loop_faces), rng.randint(1, 6),
+                                   replace=False)
+                uvs = loop_uvs[loops].copy()
+                mode = rng.randint(0, 3)
+                if mode == 0:
+                    # Split from the island.
+                    uvs += 5.0
+                elif mode == 1:
+                    # Connect to the other loop of the same vertex.
+                    for i, l in enumerate(loops):
+                        same = np.flatnonzero(loop_verts == loop_verts[l])
+                        uvs[i] = loop_uvs[rng.choice(same)]
+                else:
+                    uvs = np.round(uvs)
+                loop_uvs[loops] = uvs
+
+                index.update_uvs(loops, uvs)
+                expected = self.island.IslandIndex(
+                    num_faces, loop_faces, loop_verts, loop_uvs)
+                self.__assert_same_index(index, expected)
+
+                # Removed islands are compacted.
+                self.assertLessEqual(len(index.island_num_uv),
+                                     2 * len(index.get_islands()))
+
+    def test_compact(self):
+        print("[TEST] Compact")
+        rng = np.random.RandomState(0)
+        num_faces, loop_faces, loop_verts, loop_uvs = \
+            make_random_grid_uvs(rng, 6, 3)
+        index = self.island.IslandIndex(num_faces, loop_faces, loop_verts,
+                                        loop_uvs)
+
+        # Split faces from islands one by one, and merge them back.
+        for offset in (5.0, -5.0):
+            for f in range(num_faces):
+                loops = np.flatnonzero(loop_faces == f)
+                loop_uvs[loops] += offset
+                index.update_uvs(loops, loop_uvs[loops])
+                self.assertLessEqual(len(index.island_num_uv),
+                                     2 * len(index.get_islands()))
+        expected = self.island.IslandIndex(num_faces, loop_faces, loop_verts,
+                                           loop_uvs)
+        self.__assert_same_index(index, expected)
+
+        index.compact()
+        self.assertEqual(len(index.island_num_uv), len(index.get_islands()))
+        self.__assert_same_index(index, expected)
+
+    def test_find_loops(self):
+        print("[TEST] Find Loops")
+        rng = np.random.RandomState(0)
+        num_faces, loop_faces, loop_verts, loop_uvs = \
+            make_random_grid_uvs(rng, 4, 2)
+        index = self.island.IslandIndex(num_faces, loop_faces, loop_verts,
+                                        loop_uvs)
+
+        loops = rng.permutation(len(loop_faces))
+        found = index.find_loops(loop_faces[loops], loop_verts[loops])
+        self.assertTrue(np.array_equal(found, loops))
+
+        # Vertex 0 is used only by face 0.
+        found = index.find_loops([1, 0], [0, 0])
+        self.assertEqual(found.tolist(), [-1, 0])
+
+
+def find_overlapped_boxes_brute_force(min_coords, max_coords):
+    overlapped = np.all(min_coords[:, np.newaxis] <= max_coords, axis=-1)
+    overlapped &= np.all(min_coords <= max_coords[:, np.newaxis], axis=-1)
+    return np.nonzero(np.triu(overlapped, 1))
+
+
+def is_segment_intersected_brute_force(p1, p2, p3, p4):
+    """
+    Test the intersection of the segment p1-p2 and p3-p4 whose coordinates
+    are integers
+    """
+
+    if {p1, p2} & {p3, p4}:
+        return False
+
+    def orient(a, b, c):
+        cross = (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+        return (cross > 0) - (cross < 0)
+
+    o1, o2 = orient(p1, p2, p3), orient(p1, p2, p4)
+    o3, o4 = orient(p3, p4, p1), orient(p3, p4, p2)
+    if o1 * o2 < 0 and o3 * o4 < 0:
+        return True
+    if o1 != 0 or o2 != 0:
+        return False
+
+    # Collinear segments overlap with the positive length.
+    d = (p2[0] - p1[0], p2[1] - p1[1])
+    length = d[0] * d[0] + d[1] * d[1]
+    if length == 0:
+        return False
+    t3 = (p3[0] - p1[0]) * d[0] + (p3[1] - p1[1]) * d[1]
+    t4 = (p4[0] - p1[0]) * d[0] + (p4[1] - p1[1]) * d[1]
+    return max(0, min(t3, t4)) < min(length, max(t3, t4))
+
+
+def group_close_points_brute_force(points, tolerances, labels):
+    groups = [-1] * len(points)
+    num_groups = 0
+    for seed in range(len(points)):
+        if groups[seed] != -1:
+            continue
+        for i in range(seed, len(points)):
+            if groups[i] == -1 and labels[i] == labels[seed] and \
+                    np.all(np.abs(points[i] - points[seed]) < tolerances):
+                groups[i] = num_groups
+        num_groups += 1
+
+    return groups, num_groups
+
+
+def find_nearest_points_brute_force(points, queries, point_groups,
+                                    query_groups):
+    nearest = []
+    for q, g in zip(queries, query_groups):
+        cands = np.flatnonzero(point_groups == g)
+        if len(cands) == 0:
+            nearest.append(-1)
+            continue
+        dists = np.sum((points[cands] - q) ** 2, axis=1)
+        # np.argmin returns the first index of the minimum.
+        nearest.append(int(cands[np.argmin(dists)]))
+
+    return nearest
+
+
+class TestUtilsSpatial(common.TestBase):
+    module_name = "utils"
+    submodule_name = "spatial"
+    idname = []
+
+    def setUpEachMethod(self):
+        self.spatial = importlib.import_module("magic_uv.utils.spatial")
+
+    def __to_pairs(self, indices):
+        return list(zip(*[i.tolist() for i in indices]))
+
+    def __make_random_boxes(self, rng, num_boxes):
+        # Integer coordinates make many boxes touching each other.
+        if rng.randint(0, 2) == 0:
+            min_coords = rng.uniform(0.0, 1.0, (num_boxes, 2))
+            max_coords = min_coords + rng.uniform(0.0, 0.2, (num_boxes, 2))
+        else:
+            min_coords = rng.randint(0, 8, (num_boxes, 2)).astype(float)
+            max_coords = min_coords + rng.randint(0, 3, (num_boxes, 2))
+        return min_coords, max_coords
+
+    def test_find_overlapped_boxes_random(self):
+        print("[TEST] Find Overlapped Boxes (Random)")
+        rng = np.random.RandomState(0)
+        for num_boxes in [0, 1, 2] + rng.randint(3, 200, 30).tolist():
+            min_coords, max_coords = self.__make_random_boxes(rng,
+                                                              num_boxes)
+            actual = self.spatial.find_overlapped_boxes(
+                min_coords, max_coords, max_candidates=rng.randint(1, 1000))
+            expected = find_overlapped_boxes_brute_force(min_coords,
+                                                         max_coords)
+            self.assertListEqual(self.__to_pairs(actual),
+                                 self.__to_pairs(expected))
+
+    def test_find_overlapped_boxes_by_grid_random(self):
+        print("[TEST] Find Overlapped Boxes by Grid (Random)")
+        rng = np.random.RandomState(0)
+        for num_boxes in [0, 1, 2] + rng.randint(3, 200, 30).tolist():
+            min_coords, max_coords = self.__make_random_boxes(rng,
+                                                              num_boxes)
+            cell_size = None if rng.randint(0, 2) == 0 \
+                else rng.uniform(0.01, 2.0)
+            actual = self.spatial.find_overlapped_boxes_by_grid(
+                min_coords, max_coords, cell_size=cell_size,
+                max_candidates=rng.randint(1, 1000))
+            expected = find_overlapped_boxes_brute_force(min_coords,
+                                                         max_coords)
+            self.assertListEqual(self.__to_pairs(actual),
+                                 self.__to_pairs(expected))
+
+        # Boxes whose sizes are 0 (points) are also found.
+        points = rng.randint(0, 4, (50, 2)).astype(float)
+        actual = self.spatial.find_overlapped_boxes_by_grid(points, points)
+        expected = find_overlapped_boxes_brute_force(points, points)
+        self.assertListEqual(self.__to_pairs(actual),
+                             self.__to_pairs(expected))
+
+    def test_find_overlapped_boxes_by_grid_dense(self):
+        print("[TEST] Find Overlapped Boxes by Grid (Dense)")
+        rng = np.random.RandomState(0)
+        for _ in range(20):
+            # Small boxes are concentrated in the small region, and some
+            # large boxes cover them.
+            num_boxes = rng.randint(100, 400)
+            min_coords = rng.uniform(0.0, 0.01, (num_boxes, 2))
+            max_coords = min_coords + rng.uniform(0.0, 0.001, (num_boxes, 2))
+            min_coords[:5] = rng.uniform(0.0, 1.0, (5, 2))
+            max_coords[:5] = min_coords[:5] + rng.uniform(0.0, 0.5, (5, 2))
+
+            actual = self.spatial.find_overlapped_boxes_by_grid(
+                min_coords, max_coords, max_candidates=rng.randint(1, 1000))
+            expected = find_overlapped_boxes_brute_force(min_coords,
+                                                         max_coords)
+            self.assertListEqual(self.__to_pairs(actual),
+                                 self.__to_pairs(expected))
+
+    def test_group_close_points_random(self):
+        print("[TEST] Group Close Points (Random)")
+        rng = np.random.RandomState(0)
+        for _ in range(30):
+            num_points = rng.randint(1, 100)
+            num_axes = rng.randint(1, 4)
+            points = rng.uniform(0.0, 1.0, (num_points, num_axes))
+            # Some points are duplicated.
+            dups = rng.randint(0, num_points, num_points // 3)
+            points[rng.randint(0, num_points, len(dups))] = points[dups]
+            tolerances = rng.uniform(0.01, 0.3, num_axes)
+            labels = rng.randint(0, 3, num_points)
+
+            groups, num_groups = self.spatial.group_close_points(
+                points, tolerances, labels)
+            expected, expected_num = group_close_points_brute_force(
+                points, tolerances, labels)
+            self.assertEqual(groups.tolist(), expected)
+            self.assertEqual(num_groups, expected_num)
+
+        with self.assertRaises(ValueError):
+            self.spatial.group_close_points([[0.0, 0.0]], [0.1, 0.0])
+
+    def test_find_nearest_points_random(self):
+        print("[TEST] Find Nearest Points (Random)")
+        rng = np.random.RandomState(0)
+        for _ in range(30):
+            num_points = rng.randint(0, 100)
+            num_queries = rng.randint(0, 50)
+            num_groups = rng.randint(1, 4)
+            # Integer coordinates make many points at the same distance.
+            if rng.randint(0, 2) == 0:
+                points = rng.randint(0, 5, (num_points, 2)).astype(float)
+                queries = rng.randint(-2, 7, (num_queries, 2)).astype(float)
+            else:
+                points = rng.uniform(0.0, 1.0, (num_points, 2))
+                queries = rng.uniform(-0.5, 1.5, (num_queries, 2))
+            point_groups = rng.randint(0, num_groups, num_points)
+            query_groups = rng.randint(0, num_groups, num_queries)
+
+            nearest = self.spatial.find_nearest_points(
+                points, queries, point_groups, query_groups)
+            expected = find_nearest_points_brute_force(
+                points, queries, point_groups, query_groups)
+            self.assertEqual(nearest.tolist(), expected)
+
+    def test_find_intersected_segments_random(self):
+        print("[TEST] Find Intersected Segments (Random)")
+        rng = np.random.RandomState(0)
+        for _ in range(30):
+            # Small integer coordinates make many touching, collinear and
+            # shared end points.
+            num_segments = rng.randint(2, 60)
+            starts = rng.randint(0, 6, (num_segments, 2))
+            ends = rng.randint(0, 6, (num_segments, 2))
+
+            actual = self.spatial.find_intersected_segments(
+                starts, ends, max_candidates=rng.randint(1, 100))
+            points = [(tuple(s), tuple(e))
+                      for s, e in zip(starts.tolist(), ends.tolist())]
+            expected = [
+                (i, j) for i, j in itertools.combinations(
+                    range(num_segments), 2)
+                if is_segment_intersected_brute_force(*points[i], *points[j])
+            ]
+            self.assertListEqual(self.__to_pairs(actual), expected)
+
+    def test_find_intersected_segments_touching(self):
+        print("[TEST] Find Intersected Segments (Touching)")
+        starts = [(0.0, 0.0), (1.0, 0.0), (0.5, 0.0), (0.0, 0.5),
+                  (0.0, 0.0), (2.0, 0.0), (0.8, 0.0)]
+        ends = [(1.0, 0.0), (1.0, 1.0), (0.5, -1.0), (1.0, -1.0),
+                (0.5, 0.0), (3.0, 0.0), (1.5, 0.0)]
+        actual = self.spatial.find_intersected_segments(starts, ends)
+
+        # Shared end points (0-1, 0-4 on the same line) and T-junctions
+        # (0-2, 1-6) are not intersections, but crossings (0-3, 2-3, 3-4)
+        # and the overlap on the same line (0-6) are.
+        self.assertListEqual(self.__to_pairs(actual),
+                             [(0, 3), (0, 6), (2, 3), (3, 4)])
+
+
+class TestUtilsTransform(common.TestBase):
+    module_name = "utils"
+    submodule_name = "transform"
+    idname = []
+
+    def setUpEachMethod(self):
+        self.transform = importlib.import_module("magic_uv.utils.transform")
+
+    def __transform_brute_force(self, uvs, matrices, groups):
+        result = []
+        for uv, g in zip(uvs, groups):
+            p = np.dot(matrices[g], [uv[0], uv[1], 1.0])
+            result.append(p[:2])
+        return np.array(result).reshape(-1, 2)
+
+    def test_calc_group_anchors(self):
+        print("[TEST] Calculate Group Anchors")
+        rng = np.random.RandomState(0)
+        methods = {'MIN': np.min, 'MAX': np.max, 'MEAN': np.mean}
+        anchors = {
+            'CENTER': ('MEAN', 'MEAN'),
+            'LEFT_TOP': ('MIN', 'MAX'),
+            'LEFT_CENTER': ('MIN', 'MEAN'),
+            'LEFT_BOTTOM': ('MIN', 'MIN'),
+            'CENTER_TOP': ('MEAN', 'MAX'),
+            'CENTER_BOTTOM': ('MEAN', 'MIN'),
+            'RIGHT_TOP': ('MAX', 'MAX'),
+            'RIGHT_CENTER': ('MAX', 'MEAN'),
+            'RIGHT_BOTTOM': ('MAX', 'MIN'),
+        }
+        uvs = rng.uniform(-1.0, 1.0, (100, 2))
+        # Group 5 has no UV coordinate.
+        groups = rng.randint(0, 5, 100)
+        groups[groups == 4] = 6
+        for anchor, (method_x, method_y) in anchors.items():
+            self.assertTrue(self.transform.is_valid_anchor(anchor))
+            actual = self.transform.calc_group_anchors(uvs, groups, 7,
+                                                       anchor)
+            self.assertEqual(actual.shape, (7, 2))
+            for g in range(7):
+                members = uvs[groups == g]
+                if len(members) == 0:
+                    expected = [0.0, 0.0]
+                else:
+                    expected = [methods[method_x](members[:, 0]),
+                                methods[method_y](members[:, 1])]
+                self.assertTrue(np.allclose(actual[g], expected),
+                                "{} {}".format(anchor, g))
+
+        self.assertFalse(self.transform.is_valid_anchor('INVALID'))
+        with self.assertRaises(ValueError):
+            self.transform.calc_group_anchors(uvs, groups, 7, 'INVALID')
+
+    def test_make_matrices(self):
+        print("[TEST] Make Matrices")
+        rng = np.random.RandomState(0)
+        uvs = rng.uniform(-1.0, 1.0, (10, 2))
+        origins = rng.uniform(-1.0, 1.0, (10, 2))
+        offsets = rng.uniform(-1.0, 1.0, (10, 2))
+
+        matrices = self.transform.make_translation_matrices(offsets)
+        self.assertEqual(matrices.shape, (10, 3, 3))
+        self.assertTrue(np.allclose(
+            self.__transform_brute_force(uvs, matrices, range(10)),
+            uvs + offsets))
+
+        # Scalar factors and (x, y) factors.
+        for factors in (rng.uniform(0.1, 2.0, 10),
+                        rng.uniform(-2.0, 2.0, (10, 2))):
+            matrices = self.transform.make_scale_matrices(factors, origins)
+            self.assertEqual(matrices.shape, (10, 3, 3))
+            scales = factors.reshape(10, -1) * np.ones((1, 2))
+            self.assertTrue(np.allclose(
+                self.__transform_brute_force(uvs, matrices, range(10)),
+                origins + (uvs - origins) * scales))
+            self.assertTrue(np.allclose(
+                self.__transform_brute_force(origins, matrices, range(10)),
+                origins))
+
+    def test_transform_uvs(self):
+        print("[TEST] Transform UVs")
+        rng = np.random.RandomState(0)
+        uvs = rng.uniform(-1.0, 1.0, (50, 2))
+        matrices = np.zeros((4, 3, 3))
+        matrices[:, :2, :] = rng.uniform(-2.0, 2.0, (4, 2, 3))
+        matrices[:, 2, 2] = 1.0
+
+        # One matrix is applied to all UV coordinates.
+        actual = self.transform.transform_uvs(uvs, matrices[0])
+        expected = self.__transform_brute_force(uvs, matrices, [0] * 50)
+        self.assertTrue(np.allclose(actual, expected))
+
+        # Matrix of the group is applied.
+        groups = rng.randint(0, 4, 50)
+        actual = self.transform.transform_uvs(uvs, matrices, groups)
+        expected = self.__transform_brute_force(uvs, matrices, groups)
+        self.assertTrue(np.allclose(actual, expected))
+
+        actual = self.transform.transform_uvs(np.empty((0, 2)), matrices,
+                                              np.empty(0, dtype=int))
+        self.assertEqual(actual.shape, (0, 2))
+
+    def test_to_uv_matrix(self):
+        print("[TEST] To UV Matrix")
+        matrix = compat.matmul(
+            Matrix.Translation((0.5, -0.25, 0.0)),
+            compat.matmul(Matrix.Rotation(0.3, 4, 'Z'), Matrix.Scale(2.0, 4)))
+        uv_matrix = self.transform.to_uv_matrix(matrix)
+        self.assertEqual(uv_matrix.shape, (3, 3))
+
+        rng = np.random.RandomState(0)
+        uvs = rng.uniform(-1.0, 1.0, (10, 2))
+        actual = self.transform.transform_uvs(uvs, uv_matrix)
+        for uv, a in zip(uvs, actual):
+            expected = compat.matmul(matrix, Vector((uv[0], uv[1], 0.0)))
+            self.assertAlmostEqual(a[0], expected.x)
+            self.assertAlmostEqual(a[1], expected.y)
+
+        # 3x3 matrix is returned as it is.
+        self.assertTrue(np.array_equal(self.transform.to_uv_matrix(
+            uv_matrix), uv_matrix))
+        with self.assertRaises(ValueError):
+            self.transform.to_uv_matrix(np.identity(2))
+
+
+class TestUtilsGraph(common.TestBase):
+    module_name = "utils"
+    submodule_name = "graph"
+    idname = []
+
+    def setUpEachMethod(self):
+        self.graph = importlib.import_module("magic_uv.utils.graph")
+
+    def __make_graph(self, num_nodes, edges, keys=None):
+        return make_graph(self.graph, num_nodes, edges, keys)
+
+    def __is_isomorphic_by_brute_force(self, num_nodes, edges_1, edges_2):
+        edges_2 = {frozenset(e) for e in edges_2}
+        for perm in itertools.permutations(range(num_nodes)):
+            if {frozenset((perm[i], perm[j])) for i, j in edges_1} == \
+                    edges_2:
+                return True
+        return False
+
+    def __assert_isomorphism(self, graph_1, graph_2, node_pairs):
+        # Mapping must be the bijection which preserves the edges.
+        self.assertEqual(len(node_pairs), len(graph_1.nodes))
+        self.assertEqual(len(set(node_pairs.values())), len(graph_2.nodes))
+        edges_2 = {frozenset((e.node_1, e.node_2)) for e in graph_2.edges}
+        for e in graph_1.edges:
+            self.assertIn(frozenset((node_pairs[e.node_1],
+                                     node_pairs[e.node_2])), edges_2)
+
+    def test_isomorphic_permuted_grid(self):
+        print("[TEST] Isomorphic (Permuted Grid)")
+        rng = np.random.RandomState(0)
+        edges = make_grid_edges(5, 4)
+        graph_1 = self.__make_graph(20, edges)
+        for _ in range(5):
+            keys = rng.permutation(20).tolist()
+            graph_2 = self.__make_graph(20, edges, keys)
+            result, node_pairs = self.graph.graph_is_isomorphic(graph_1,
+                                                                graph_2)
+            self.assertTrue(result)
+            self.__assert_isomorphism(graph_1, graph_2, node_pairs)
+            self.assertEqual(self.graph.calc_graph_signature(graph_1),
+                             self.graph.calc_graph_signature(graph_2))
+
+    def test_isomorphic_same_graph(self):
+        print("[TEST] Isomorphic (Same Graph)")
+        # Copy of the same graph is matched as it is.
+        edges = make_grid_edges(3, 3)
+        graph_1 = self.__make_graph(9, edges)
+        graph_2 = self.__make_graph(9, edges)
+        result, node_pairs = self.graph.graph_is_isomorphic(graph_1, graph_2)
+        self.assertTrue(result)
+        self.assertEqual({n1.key: n2.key for n1, n2 in node_pairs.items()},
+                         {i: i for i in range(9)})
+
+        result, node_pairs = self.graph.graph_is_isomorphic(
+            self.graph.Graph(), self.graph.Graph())
+        self.assertTrue(result)
+        self.assertEqual(node_pairs, {})
+
+    def test_not_isomorphic_same_degrees(self):
+        print("[TEST] Not Isomorphic (Same Degree Sequence)")
+        # Leaf is attached to the second or the third node of the path.
+        path = [(0, 1), (1, 2), (2, 3), (3, 4)]
+        graph_1 = self.__make_graph(6, path + [(1, 5)])
+        graph_2 = self.__make_graph(6, path + [(2, 5)])
+        result, node_pairs = self.graph.graph_is_isomorphic(graph_1, graph_2)
+        self.assertFalse(result)
+        self.assertEqual(node_pairs, {})
+        self.assertNotEqual(self.graph.calc_graph_signature(graph_1),
+                            self.graph.calc_graph_signature(graph_2))
+
+        # Complete bipartite graph K3,3 and the prism are 3-regular, so
+        # they can not be distinguished by the color refinement.
+        graph_1 = self.__make_graph(
+            6, [(i, j) for i in range(3) for j in range(3, 6)])
+        graph_2 = self.__make_graph(
+            6, [(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3),
+                (0, 3), (1, 4), (2, 5)])
+        result, _ = self.graph.graph_is_isomorphic(graph_1, graph_2)
+        self.assertFalse(result)
+
+    def test_disconnected(self):
+        print("[TEST] Disconnected Graph")
+        rng = np.random.RandomState(0)
+        # Two grids and an isolated node.
+        edges = make_grid_edges(3, 2) + \
+            [(i + 6, j + 6) for i, j in make_grid_edges(2, 2)]
+        graph_1 = self.__make_graph(11, edges)
+        graph_2 = self.__make_graph(11, edges, rng.permutation(11).tolist())
+        result, node_pairs = self.graph.graph_is_isomorphic(graph_1, graph_2)
+        self.assertTrue(result)
+        self.__assert_isomorphism(graph_1, graph_2, node_pairs)
+        self.assertEqual(self.graph.calc_graph_signature(graph_1),
+                         self.graph.calc_graph_signature(graph_2))
+
+        # Cycle of 6 nodes and two triangles.
+        graph_1 = self.__make_graph(6, [(i, (i + 1) % 6) for i in range(6)])
+        graph_2 = self.__make_graph(
+            6, [(0, 1), (1, 2), (2, 0), (3, 4), (4, 5), (5, 3)])
+        result, _ = self.graph.graph_is_isomorphic(graph_1, graph_2)
+        self.assertFalse(result)
+
+    def test_signature_labels(self):
+        print("[TEST] Signature with Labels")
+        edges = make_grid_edges(3, 2)
+        graph = self.__make_graph(6, edges)
+        signature = self.graph.calc_graph_signature(
+            graph, node_labels={i: i % 2 for i in range(6)},
+            edge_labels=[0] * len(edges))
+        self.assertEqual(signature, self.graph.calc_graph_signature(
+            graph, node_labels={i: i % 2 for i in range(6)},
+            edge_labels=[0] * len(edges)))
+        self.assertNotEqual(signature, self.graph.calc_graph_signature(
+            graph, node_labels={i: int(i < 3) for i in range(6)},
+            edge_labels=[0] * len(edges)))
+        self.assertNotEqual(signature, self.graph.calc_graph_signature(
+            graph, node_labels={i: i % 2 for i in range(6)},
+            edge_labels=[1] + [0] * (len(edges) - 1)))
+
+    def test_random_small_graphs(self):
+        print("[TEST] Random Small Graphs (Brute Force)")
+        rng = np.random.RandomState(0)
+        for _ in range(300):
+            num_nodes = rng.randint(1, 7)
+            all_edges = list(itertools.combinations(range(num_nodes), 2))
+            num_edges = rng.randint(0, len(all_edges) + 1)
+            edges_1 = [all_edges[i] for i in rng.choice(
+                len(all_edges), num_edges, replace=False)]
+            if rng.randint(2) == 0:
+                perm = rng.permutation(num_nodes)
+                edges_2 = [(perm[i], perm[j]) for i, j in edges_1]
+            else:
+                edges_2 = [all_edges[i] for i in rng.choice(
+                    len(all_edges), num_edges, replace=False)]
+
+            graph_1 = self.__make_graph(num_nodes, edges_1)
+            graph_2 = self.__make_graph(num_nodes, edges_2)
+            expected = self.__is_isomorphic_by_brute_force(
+                num_nodes, edges_1, edges_2)
+            result, node_pairs = self.graph.graph_is_isomorphic(graph_1,
+                                                                graph_2)
+            self.assertEqual(result, expected)
+            if expected:
+                self.__assert_isomorphism(graph_1, graph_2, node_pairs)
+                self.assertEqual(self.graph.calc_graph_signature(graph_1),
+                                 self.graph.calc_graph_signature(graph_2))
+
+    def test_signature_random_small_graphs(self):
+        print("[TEST] Signature of Random Small Graphs (Brute Force)")
+        rng = np.random.RandomState(1)
+        num_rejected = 0
+        for _ in range(300):
+            num_nodes = rng.randint(1, 7)
+            all_edges = list(itertools.combinations(range(num_nodes), 2))
+            num_edges = rng.randint(0, len(all_edges) + 1)
+            edges_1 = [all_edges[i] for i in rng.choice(
+                len(all_edges), num_edges, replace=False)]
+            edges_2 = [all_edges[i] for i in rng.choice(
+                len(all_edges), num_edges, replace=False)]
+
+            # Graphs whose signatures are different are not isomorphic.
+            signature_1 = self.graph.calc_graph_signature(
+                self.__make_graph(num_nodes, edges_1))
+            signature_2 = self.graph.calc_graph_signature(
+                self.__make_graph(num_nodes, edges_2))
+            if signature_1 != signature_2:
+                num_rejected += 1
+                self.assertFalse(self.__is_isomorphic_by_brute_force(
+                    num_nodes, edges_1, edges_2))
+        self.assertGreater(num_rejected, 0)
+
+
+class TestUtilsPacking(common.TestBase):
+    module_name = "utils"
+    submodule_name = "packing"
+    idname = []
+
+    def setUpEachMethod(self):
+        self.packing = importlib.import_module("magic_uv.utils.packing")
+
+    def __assert_packed(self, sizes, margin, rotate):
+        positions, rotated, scale = self.packing.pack_rects(sizes, margin,
+                                                            rotate)
+        if not rotate:
+            self.assertFalse(np.any(rotated))
+        packed_sizes = np.where(rotated[:, None], sizes[:, ::-1], sizes)
+        mins = positions
+        maxs = positions + packed_sizes * scale
+
+        # Rectangles are inside the unit square with the margin.
+        eps = 1e-9
+        self.assertTrue(np.all(mins >= margin - eps))
+        self.assertTrue(np.all(maxs <= 1.0 - margin + eps))
+
+        # Rectangles do not overlap, and are apart by the margin.
+        for i in range(len(sizes)):
+            gaps = np.maximum(mins[i] - maxs, mins - maxs[i])
+            gaps = np.delete(gaps, i, axis=0)
+            self.assertTrue(np.all(np.max(gaps, axis=1) >= margin - eps))
+
+        return positions, rotated, scale
+
+    def test_pack_rects_random(self):
+        print("[TEST] Pack Rects (Random)")
+        rng = np.random.RandomState(0)
+        for _ in range(20):
+            sizes = rng.uniform(0.1, 2.0, (rng.randint(1, 60), 2))
+            for rotate in (False, True):
+                self.__assert_packed(sizes, 0.0, rotate)
+                self.__assert_packed(sizes, 0.005, rotate)
+
+    def test_pack_rects_same_size(self):
+        print("[TEST] Pack Rects (Same Size)")
+        # 16 squares are packed to the 4x4 grid.
+        sizes = np.ones((16, 2))
+        _, _, scale = self.__assert_packed(sizes, 0.0, False)
+        self.assertAlmostEqual(scale, 0.25)
+
+    def test_pack_rects_empty(self):
+        print("[TEST] Pack Rects (Empty)")
+        positions, rotated, scale = self.packing.pack_rects([])
+        self.assertEqual(positions.shape, (0, 2))
+        self.assertEqual(rotated.shape, (0,))
+        self.assertEqual(scale, 1.0)
+
+    def test_pack_rects_invalid_margin(self):
+        print("[TEST] Pack Rects (Invalid Margin)")
+        with self.assertRaises(ValueError):
+            self.packing.pack_rects([[1.0, 1.0]], margin=-0.1)
+        with self.assertRaises(ValueError):
+            self.packing.pack_rects([[1.0, 1.0]], margin=1.0)
+
+    def test_make_packing_matrices(self):
+        print("[TEST] Make Packing Matrices")
+        rng = np.random.RandomState(0)
+        min_coords = rng.uniform(-3.0, 3.0, (40, 2))
+        max_coords = min_coords + rng.uniform(0.1, 2.0, (40, 2))
+        sizes = max_coords - min_coords
+        positions, rotated, scale = self.__assert_packed(sizes, 0.01, True)
+        self.assertTrue(np.any(rotated))
+        matrices = self.packing.make_packing_matrices(
+            min_coords, max_coords, positions, rotated, scale)
+        self.assertEqual(matrices.shape, (40, 3, 3))
+
+        # Corners of the box are moved to the packed rectangle, and the
+        # rotated box is rotated counterclockwise.
+        for i in range(40):
+            (x0, y0), (x1, y1) = min_coords[i], max_coords[i]
+            corners = np.array([[x0, y0, 1.0], [x1, y0, 1.0],
+                                [x1, y1, 1.0], [x0, y1, 1.0]])
+            moved = (matrices[i] @ corners.T).T[:, :2]
+            self.assertTrue(np.allclose(matrices[i][2], [0.0, 0.0, 1.0]))
+            w, h = sizes[i] * scale
+            px, py = positions[i]
+            if rotated[i]:
+                expected = [[px + h, py], [px + h, py + w],
+                            [px, py + w], [px, py]]
+            else:
+                expected = [[px, py], [px + w, py],
+                            [px + w, py + h], [px, py + h]]
+            self.assertTrue(np.allclose(moved, expected))
+
+
+class TestUtilsUVArray(common.TestBase):
+    module_name = "utils"
+    submodule_name = "uv_array"
+    idname = []
+
+    def setUpEachMethod(self):
+        self.uv_array = importlib.import_module("magic_uv.utils.uv_array")
+
+        obj_name = "Cube"
+        common.select_object_only(obj_name)
+        compat.set_active_object(bpy.data.objects[obj_name])
+        self.active_obj = compat.get_active_object(bpy.context)
+
+    def __get_mesh_uvs(self):
+        data = self.active_obj.data.uv_layers.active.data
+        return np.array([d.uv[:] for d in data], dtype=np.float32)
+
+    def test_ng_no_uv_layer(self):
+        print("[TEST] (NG) No UV Layer")
+        common.delete_all_uv_maps(self.active_obj)
+        with self.assertRaises(RuntimeError):
+            self.uv_array.UVLayerArray(self.active_obj)
+
+    def test_ng_invalid_uv_layer_name(self):
+        print("[TEST] (NG) Invalid UV Layer Name")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.object.mode_set(mode='OBJECT')
+        with self.assertRaises(ValueError):
+            self.uv_array.UVLayerArray(self.active_obj, "__invalid")
+
+    def test_ok_object_mode(self):
+        print("[TEST] (OK) Object Mode")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        mesh = self.active_obj.data
+        uv_array = self.uv_array.UVLayerArray(self.active_obj)
+        self.assertFalse(uv_array.is_edit_mode)
+        self.assertEqual(uv_array.uv_layer_name, mesh.uv_layers.active.name)
+        self.assertEqual(uv_array.num_loops, len(mesh.loops))
+        self.assertEqual(uv_array.num_faces, len(mesh.polygons))
+        self.assertTrue(np.array_equal(uv_array.uvs, self.__get_mesh_uvs()))
+        for poly in mesh.polygons:
+            for li in poly.loop_indices:
+                self.assertEqual(uv_array.loop_faces[li], poly.index)
+                self.assertEqual(uv_array.loop_verts[li],
+                                 mesh.loops[li].vertex_index)
+            self.assertEqual(uv_array.face_loop_starts[poly.index],
+                             poly.loop_start)
+            self.assertEqual(uv_array.face_loop_totals[poly.index],
+                             poly.loop_total)
+
+    def test_ok_edit_mode(self):
+        print("[TEST] (OK) Edit Mode")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+
+        # UVs which are modified but not synced to the mesh are read.
+        bm = bmesh.from_edit_mesh(self.active_obj.data)
+        uv_layer = bm.loops.layers.uv.verify()
+        for f in bm.faces:
+            for l in f.loops:
+                l[uv_layer].uv.x += 2.0
+        bmesh.update_edit_mesh(self.active_obj.data)
+
+        uv_array = self.uv_array.UVLayerArray(self.active_obj)
+        self.assertTrue(uv_array.is_edit_mode)
+        self.assertTrue(np.all(uv_array.uvs[:, 0] >= 2.0))
+        # Mesh is not synced with the edit mesh by reading.
+        self.assertTrue(np.all(self.__get_mesh_uvs()[:, 0] < 2.0))
+
+        bpy.ops.object.mode_set(mode='OBJECT')
+        self.assertTrue(np.array_equal(uv_array.uvs, self.__get_mesh_uvs()))
+
+    def test_calc_dirty_ranges(self):
+        print("[TEST] Calculate Dirty Ranges")
+        starts, ends = self.uv_array.calc_dirty_ranges(
+            [True, True, False, False, True, False, True, True])
+        self.assertEqual(starts.tolist(), [0, 4, 6])
+        self.assertEqual(ends.tolist(), [2, 5, 8])
+
+        starts, ends = self.uv_array.calc_dirty_ranges([False, False])
+        self.assertEqual(starts.tolist(), [])
+        self.assertEqual(ends.tolist(), [])
+
+    def test_ok_get_face_loops(self):
+        print("[TEST] (OK) Get Face Loops")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        mesh = self.active_obj.data
+        uv_array = self.uv_array.UVLayerArray(self.active_obj)
+        faces = [3, 0, 5]
+        expected = [li for f in faces for li in mesh.polygons[f].loop_indices]
+        self.assertEqual(uv_array.get_face_loops(faces).tolist(), expected)
+        self.assertEqual(uv_array.get_face_loops([]).tolist(), [])
+
+    def __write_back_object_mode(self, loops):
+        mesh = self.active_obj.data
+        uv_array = self.uv_array.UVLayerArray(self.active_obj)
+        self.assertFalse(uv_array.write_back())
+
+        uv_array.uvs[loops] += 1.0
+        uv_array.mark_dirty('UV', loops)
+        uv_array.pin_uv[loops] = True
+        uv_array.mark_dirty('PIN_UV', loops)
+        uv_array.face_select[0] = True
+        uv_array.mark_dirty('FACE_SELECT', [0])
+        self.assertTrue(uv_array.is_dirty())
+        self.assertEqual(uv_array.get_dirty_ranges('UV')[0].tolist(),
+                         self.uv_array.calc_dirty_ranges(
+                             np.isin(np.arange(uv_array.num_loops),
+                                     loops))[0].tolist())
+        self.assertTrue(uv_array.write_back())
+        self.assertFalse(uv_array.is_dirty())
+
+        self.assertTrue(np.array_equal(uv_array.uvs, self.__get_mesh_uvs()))
+        pin_uv = [d.pin_uv for d in mesh.uv_layers.active.data]
+        self.assertEqual(pin_uv, uv_array.pin_uv.tolist())
+        self.assertTrue(mesh.polygons[0].select)
+
+        # Data which is read again is same as the written data.
+        expected = uv_array.uvs.copy()
+        uv_array.read()
+        self.assertTrue(np.array_equal(uv_array.uvs, expected))
+
+    def test_ok_object_mode_write_back_partial(self):
+        print("[TEST] (OK) Object Mode Write Back (Partial)")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        # Less than 1/8 of loops are written back item by item.
+        self.__write_back_object_mode([1, 2])
+
+    def test_ok_object_mode_write_back_all(self):
+        print("[TEST] (OK) Object Mode Write Back (All)")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        # Whole array is written back by foreach_set.
+        self.__write_back_object_mode(
+            np.arange(len(self.active_obj.data.loops)))
+
+    def test_ok_edit_mode_write_back(self):
+        print("[TEST] (OK) Edit Mode Write Back")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+
+        uv_array = self.uv_array.UVLayerArray(self.active_obj)
+        loops = uv_array.get_face_loops([1])
+        uv_array.uvs[loops] += 3.0
+        uv_array.mark_dirty('UV', loops)
+        uv_array.uv_select[loops] = True
+        uv_array.mark_dirty('UV_SELECT', loops)
+        uv_array.pin_uv[loops] = True
+        uv_array.mark_dirty('PIN_UV', loops)
+        self.assertTrue(uv_array.write_back())
+
+        bm = bmesh.from_edit_mesh(self.active_obj.data)
+        bm.faces.ensure_lookup_table()
+        uv_layer = bm.loops.layers.uv.verify()
+        for f in bm.faces:
+            moved = (f.index == 1)
+            for l in f.loops:
+                self.assertEqual(l[uv_layer].uv.x >= 3.0, moved)
+                self.assertEqual(l[uv_layer].pin_uv, moved)
+        self.assertTrue(all(l[uv_layer].select for l in bm.faces[1].loops))
+
+        bpy.ops.object.mode_set(mode='OBJECT')
+        self.assertTrue(np.array_equal(uv_array.uvs, self.__get_mesh_uvs()))
+
+    def test_ng_mark_dirty(self):
+        print("[TEST] (NG) Mark Dirty")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+        uv_array = self.uv_array.UVLayerArray(self.active_obj)
+        with self.assertRaises(ValueError):
+            uv_array.mark_dirty('LOOP_VERTS')
@@ -1,6 +1,9 @@
+import importlib
 import unittest
 
 import bpy
+import bmesh
+import numpy as np
 
 from . import common
 from . import compatibility as compat
@@ -34,6 +37,36 @@ class TestUVInspection(common.TestBase):
         result = bpy.ops.uv.muv_uv_inspection_update()
         self.assertSetEqual(result, {'FINISHED'})
 
+    def test_ok_update_edge_detection(self):
+        print("[TEST] Detection Method = Edge (OK)")
+        sc = bpy.context.scene
+        props = sc.muv_props.uv_inspection
+        bpy.ops.mesh.select_all(action='SELECT')
+        bpy.ops.mesh.uv_texture_add()
+
+        # Move the UVs of the first face away from the other faces.
+        obj = compat.get_active_object(bpy.context)
+        bm = bmesh.from_edit_mesh(obj.data)
+        bm.faces.ensure_lookup_table()
+        uv_layer = bm.loops.layers.uv.verify()
+        for l in bm.faces[0].loops:
+            l[uv_layer].uv.x += 2.0
+        bmesh.update_edit_mesh(obj.data)
+
+        overlapped_faces = {}
+        for method in ('ISLAND', 'EDGE'):
+            sc.muv_uv_inspection_detection_method = method
+            result = bpy.ops.uv.muv_uv_inspection_update()
+            self.assertSetEqual(result, {'FINISHED'})
+            overlapped_faces[method] = {
+                (info["clip_face"].index, info["subject_face"].index)
+                for info in props.overlapped_info
+            }
+
+        self.assertTrue(overlapped_faces['ISLAND'])
+        self.assertSetEqual(overlapped_faces['EDGE'],
+                            overlapped_faces['ISLAND'])
+
     @unittest.skipIf(compat.check_version(2, 80, 0) < 0,
                      "Not supported in <2.80")
     def test_ok_update_multiple_objects(self):
@@ -116,3 +149,160 @@ class TestUVInspectionPaintUVIsland(common.TestBase):
         # Paint UV Island needs 'IMAGE_EDITOR' space and 'VIEW_3D' space,
         # but we can not setup such environment in this test.
         self.assertSetEqual(result, {'CANCELLED'})
+
+
+class TestUVInspectionOverlappedPolygons(common.TestBase):
+    module_name = "uv_inspection"
+    submodule_name = "overlapped_polygons"
+    idname = []
+
+    def __calc_area(self, points):
+        area = 0.0
+        for i, p1 in enumerate(points):
+            p2 = points[(i + 1) % len(points)]
+            area += p1.x * p2.y - p1.y * p2.x
+        return abs(area) * 0.5
+
+    def __create_bmesh(self, polygons):
+        bm = bmesh.new()
+        uv_layer = bm.loops.layers.uv.new()
+        for uvs in polygons:
+            verts = [bm.verts.new((uv[0], uv[1], 0.0)) for uv in uvs]
+            face = bm.faces.new(verts)
+            for l, uv in zip(face.loops, uvs):
+                l[uv_layer].uv = uv
+        bm.verts.index_update()
+        bm.faces.index_update()
+        bm.faces.ensure_lookup_table()
+        return bm, uv_layer
+
+    def __check_overlapped(self, polygons, expected):
+        """
+        expected is the list of (index of clip face, index of subject face,
+        area of the overlapped region)
+        """
+
+        muv_common = importlib.import_module("magic_uv.common")
+
+        bm, uv_layer = self.__create_bmesh(polygons)
+        faces = list(bm.faces)
+        for method in ('ISLAND', 'EDGE'):
+            result = muv_common.get_overlapped_uv_info(
+                [bm], [faces], [uv_layer], 'PART',
+                detection_method=method, only_selected=False)
+
+            actual = []
+            for info in result:
+                area = sum([self.__calc_area(p) for p in info["polygons"]])
+                actual.append((info["clip_face"].index,
+                               info["subject_face"].index, area))
+
+            self.assertEqual(len(actual), len(expected), method)
+            for (c1, s1, a1), (c2, s2, a2) in zip(sorted(actual),
+                                                  sorted(expected)):
+                self.assertEqual((c1, s1), (c2, s2), method)
+                self.assertAlmostEqual(a1, a2, places=5, msg=method)
+        bm.free()
+
+    def __make_random_convex_polygons(self, rng, num_polygons):
+        polygons = []
+        for _ in range(num_polygons):
+            num_points = rng.randint(3, 7)
+            angles = np.sort(rng.uniform(0.0, 2.0 * np.pi, num_points))
+            center = rng.uniform(0.3, 0.7, 2)
+            radius = rng.uniform(0.05, 0.3)
+            polygons.append(center + radius * np.stack(
+                (np.cos(angles), np.sin(angles)), axis=1))
+        return polygons
+
+    def __rasterize(self, polygon, resolution):
+        """
+        Reference implementation which returns the mask of the pixels whose
+        center is inside the convex polygon
+        """
+
+        centers = (np.arange(resolution) + 0.5) / resolution
+        xs, ys = np.meshgrid(centers, centers)
+        inside = np.ones(xs.shape, dtype=bool)
+        for p1, p2 in zip(polygon, np.roll(polygon, -1, axis=0)):
+            cross = (p2[0] - p1[0]) * (ys - p1[1]) - \
+                (p2[1] - p1[1]) * (xs - p1[0])
+            inside &= cross >= 0.0
+        return inside
+
+    def test_random_compare_with_rasterized_area(self):
+        print("[TEST] Random (Compare with Rasterized Area)")
+        muv_polygon = importlib.import_module("magic_uv.utils.polygon")
+        rng = np.random.RandomState(0)
+        resolution = 512
+        pixel_area = 1.0 / (resolution * resolution)
+
+        polygons = self.__make_random_convex_polygons(rng, 12)
+        tris = np.array([(p[0], p[i], p[i + 1]) for p in polygons
+                         for i in range(1, len(p) - 1)])
+        tri_offsets = np.concatenate(
+            ([0], np.cumsum([len(p) - 2 for p in polygons])))
+        pairs = [(i, j) for i in range(len(polygons))
+                 for j in range(i + 1, len(polygons))]
+        polygons_1 = np.array([i for i, _ in pairs])
+        polygons_2 = np.array([j for _, j in pairs])
+
+        piece_pairs, piece_points, piece_counts = muv_polygon.clip_polygons(
+            tris, tri_offsets, polygons_1, polygons_2)
+        self.assertEqual(piece_points.shape[1:],
+                         (muv_polygon.MAX_PIECE_POINTS, 2))
+        self.assertTrue(np.all(piece_counts >= 3))
+        self.assertTrue(np.all(piece_counts <= muv_polygon.MAX_PIECE_POINTS))
+        areas = muv_polygon.calc_polygon_areas(piece_points, piece_counts)
+        self.assertTrue(np.all(areas > 0.0))
+        pair_areas = np.bincount(piece_pairs, weights=areas,
+                                 minlength=len(pairs))
+
+        masks = [self.__rasterize(p, resolution) for p in polygons]
+        num_overlapped = 0
+        for k, (i, j) in enumerate(pairs):
+            expected = np.count_nonzero(masks[i] & masks[j]) * pixel_area
+            self.assertAlmostEqual(pair_areas[k], expected, delta=0.002)
+            if expected > 0.002:
+                num_overlapped += 1
+        self.assertGreater(num_overlapped, 0)
+
+    def test_partially_overlapped(self):
+        print("[TEST] Partially Overlapped")
+        self.__check_overlapped([
+            [(0.0, 0.0), (0.5, 0.0), (0.5, 0.5), (0.0, 0.5)],
+            [(0.25, 0.25), (0.75, 0.25), (0.75, 0.75), (0.25, 0.75)],
+            [(0.6, 0.1), (0.9, 0.4), (0.6, 0.7)],
+        ], [(0, 1, 0.0625), (1, 2, 0.05625)])
+
+    def test_included(self):
+        print("[TEST] Included")
+        self.__check_overlapped([
+            [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)],
+            [(0.2, 0.2), (0.4, 0.2), (0.4, 0.4), (0.2, 0.4)],
+        ], [(0, 1, 0.04)])
+
+    def test_included_without_crossing(self):
+        print("[TEST] Included without Edge Crossing")
+        # Edges of the inner faces touch the edges of the outer face, but
+        # do not cross them.
+        self.__check_overlapped([
+            [(0.0, 0.0), (1.0, 0.0), (1.0, 1.0), (0.0, 1.0)],
+            [(0.0, 0.0), (0.5, 0.0), (0.5, 0.5), (0.0, 0.5)],
+            [(0.5, 0.5), (1.0, 0.5), (1.0, 1.0)],
+        ], [(0, 1, 0.25), (0, 2, 0.125)])
+
+    def test_same_polygon(self):
+        print("[TEST] Same Polygon")
+        self.__check_overlapped([
+            [(0.0, 0.0), (0.5, 0.0), (0.5, 0.5), (0.0, 0.5)],
+            [(0.0, 0.0), (0.5, 0.0), (0.5, 0.5), (0.0, 0.5)],
+        ], [(0, 1, 0.25)])
+
+    def test_not_overlapped(self):
+        print("[TEST] Not Overlapped")
+        self.__check_overlapped([
+            [(0.0, 0.0), (0.5, 0.0), (0.5, 0.5), (0.0, 0.5)],
+            [(0.5, 0.0), (1.0, 0.0), (1.0, 0.5), (0.5, 0.5)],
+            [(0.0, 0.6), (0.5, 0.6), (0.5, 1.0), (0.0, 1.0)],
+        ], [])
@@ -1,3 +1,9 @@
+import csv
+import importlib
+import json
+import os
+import shutil
+import tempfile
 import unittest
 
 import bpy
@@ -326,3 +332,144 @@ class TestWorldScaleUVProportionalToMesh(common.TestBase):
             only_selected=True
         )
         self.assertSetEqual(result, {'FINISHED'})
+
+
+class TestWorldScaleUVReportDensity(common.TestBase):
+    module_name = "world_scale_uv"
+    submodule_name = "report_density"
+    idname = [
+        # World Scale UV
+        ('OPERATOR', 'uv.muv_world_scale_uv_report_density'),
+    ]
+
+    def setUpEachMethod(self):
+        obj_name = "Cube"
+
+        common.select_object_only(obj_name)
+        compat.set_active_object(bpy.data.objects[obj_name])
+        self.active_obj = compat.get_active_object(bpy.context)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDownEachMethod(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def __setup_uv_and_texture(self):
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.mesh.select_all(action='SELECT')
+        common.assign_new_image(self.active_obj, "Test")
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    def test_ng_no_collection(self):
+        # Warning: Collection is not found
+        print("[TEST] (NG) No Collection")
+        result = bpy.ops.uv.muv_world_scale_uv_report_density(
+            target='COLLECTION',
+            collection="NotFound"
+        )
+        self.assertSetEqual(result, {'CANCELLED'})
+
+    def __get_skip_reason(self):
+        muv_common = importlib.import_module("magic_uv.common")
+        report = muv_common.measure_texel_density([self.active_obj])
+        self.assertEqual(len(report["objects"]), 0)
+        self.assertEqual(len(report["skipped_objects"]), 1)
+        return report["skipped_objects"][0]["reason"]
+
+    def test_ng_no_uv(self):
+        # Warning: No texel density is measured
+        print("[TEST] (NG) No UV")
+        self.assertEqual(self.__get_skip_reason(), "Object has no UV map")
+
+        filepath = os.path.join(self.tmp_dir, "report.json")
+        result = bpy.ops.uv.muv_world_scale_uv_report_density(
+            target='SELECTED',
+            filepath=filepath
+        )
+        self.assertSetEqual(result, {'CANCELLED'})
+        self.assertFalse(os.path.exists(filepath))
+
+    def test_ng_no_texture(self):
+        # Warning: No texel density is measured
+        print("[TEST] (NG) No Texture")
+        bpy.ops.object.mode_set(mode='EDIT')
+        bpy.ops.mesh.uv_texture_add()
+        bpy.ops.object.mode_set(mode='OBJECT')
+        self.assertEqual(self.__get_skip_reason(), "Texture is not found")
+
+        result = bpy.ops.uv.muv_world_scale_uv_report_density(
+            target='SELECTED',
+            tex_selection_method='AVERAGE'
+        )
+        self.assertSetEqual(result, {'CANCELLED'})
+
+        # Texture is not needed when the texture size is specified.
+        result = bpy.ops.uv.muv_world_scale_uv_report_density(
+            target='SELECTED',
+            tex_selection_method='USER_SPECIFIED',
+            tgt_texture_size=(512, 512)
+        )
+        self.assertSetEqual(result, {'FINISHED'})
+
+    def test_ok_first(self):
+        print("[TEST] (OK) First")
+        self.__setup_uv_and_texture()
+        filepath = os.path.join(self.tmp_dir, "report.json")
+        result = bpy.ops.uv.muv_world_scale_uv_report_density(
+            target='SELECTED',
+            tex_selection_method='FIRST',
+            filepath=filepath
+        )
+        self.assertSetEqual(result, {'FINISHED'})
+
+        with open(filepath) as f:
+            report = json.load(f)
+        self.assertEqual(report["tex_selection_method"], 'FIRST')
+        self.assertEqual(len(report["objects"]), 1)
+        self.assertGreater(report["objects"][0]["density"], 0.0)
+
+    def test_ok_json(self):
+        print("[TEST] (OK) JSON")
+        self.__setup_uv_and_texture()
+        filepath = os.path.join(self.tmp_dir, "report.json")
+        result = bpy.ops.uv.muv_world_scale_uv_report_density(
+            target='SCENE',
+            tex_selection_method='AVERAGE',
+            include_faces=True,
+            file_format='JSON',
+            filepath=filepath
+        )
+        self.assertSetEqual(result, {'FINISHED'})
+
+        with open(filepath) as f:
+            report = json.load(f)
+        self.assertEqual(len(report["objects"]), 1)
+        obj = report["objects"][0]
+        self.assertEqual(obj["name"], "Cube")
+        self.assertEqual(len(obj["faces"]["density"]), obj["num_faces"])
+        self.assertEqual(len(obj["islands"]["density"]), obj["num_islands"])
+        self.assertGreater(obj["density"], 0.0)
+        stats = report["statistics"]["face"]
+        self.assertEqual(stats["count"], obj["num_faces"])
+        self.assertLessEqual(stats["min"], stats["percentiles"]["50"])
+        self.assertLessEqual(stats["percentiles"]["50"], stats["max"])
+
+    def test_ok_csv(self):
+        print("[TEST] (OK) CSV")
+        self.__setup_uv_and_texture()
+        filepath = os.path.join(self.tmp_dir, "report.csv")
+        result = bpy.ops.uv.muv_world_scale_uv_report_density(
+            target='SELECTED',
+            tex_selection_method='USER_SPECIFIED',
+            tgt_texture_size=(512, 512),
+            file_format='CSV',
+            filepath=filepath
+        )
+        self.assertSetEqual(result, {'FINISHED'})
+
+        with open(filepath) as f:
+            rows = list(csv.reader(f))
+        levels = [r[0] for r in rows[1:]]
+        self.assertEqual(levels.count("OBJECT"), 1)
+        self.assertIn("ISLAND", levels)
+        self.assertIn("STATISTICS", levels)
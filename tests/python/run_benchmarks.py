@@ -0,0 +1,570 @@
+"""
+Performance benchmark of Magic UV operators.
+
+Run on Blender in background mode:
+
+    MUV_CONSOLE_MODE=true blender --factory-startup --background -noaudio \
+        --python tests/python/run_benchmarks.py -- \
+        --sizes 1000 10000 --islands 1 100 --output result.json \
+        --baseline baseline.json
+
+The benchmark mesh (magic_uv_test.fixtures) is generated for each pair of
+the number of faces and the number of UV islands, and every registered
+MUV_OT_* operator whose poll() passes is executed on it. Modal operators
+are driven by simulated mouse events after execute(). Operators which only
+implement invoke() (e.g. UV Bounding Box, UV Sculpt) are invoked by
+INVOKE_DEFAULT instead, and are recorded as SKIPPED with the reason when
+they can not run without a window (i.e. in background mode).
+Results (wall time and peak memory) are written to the JSON file, and are
+compared with the baseline when --baseline is specified.
+
+Results can also be compared without Blender:
+
+    python tests/python/run_benchmarks.py --compare result.json baseline.json
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+BENCHMARK_OBJECT_NAME = "MUV_Benchmark"
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+DEFAULT_ISLANDS = [1, 100]
+
+
+# ----------------------------------------------------------------------------
+# Comparison with the baseline (does not depend on Blender)
+# ----------------------------------------------------------------------------
+
+def _result_key(result):
+    return (result["operator"], result["faces"], result["islands"])
+
+
+def compare_results(results, baseline, time_threshold=0.2,
+                    memory_threshold=0.2, min_time=0.005):
+    """
+    Compare the results with the baseline.
+    The result is regressed when the time (or the peak memory) increases
+    more than the threshold ratio. Differences of time less than min_time
+    [sec] are ignored as noise.
+    Return the list of the regressions.
+    """
+
+    baseline_results = {_result_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        base = baseline_results.get(_result_key(result))
+        if base is None:
+            continue
+        if result["status"] != "OK" or base["status"] != "OK":
+            continue
+
+        checks = [
+            ("time", result["time"]["min"], base["time"]["min"],
+             time_threshold, min_time),
+            ("peak_memory", result.get("peak_memory"),
+             base.get("peak_memory"), memory_threshold, 0),
+        ]
+        if result.get("modal_time") and base.get("modal_time"):
+            checks.append(("modal_time", result["modal_time"]["min"],
+                           base["modal_time"]["min"], time_threshold,
+                           min_time))
+        for metric, value, base_value, threshold, min_diff in checks:
+            if value is None or base_value is None:
+                continue
+            if value - base_value <= min_diff:
+                continue
+            if value <= base_value * (1.0 + threshold):
+                continue
+            regressions.append({
+                "operator": result["operator"],
+                "faces": result["faces"],
+                "islands": result["islands"],
+                "metric": metric,
+                "value": value,
+                "baseline": base_value,
+                "ratio": value / base_value if base_value else math.inf,
+            })
+
+    return regressions
+
+
+def print_comparison(results, baseline, regressions):
+    baseline_results = {_result_key(r): r for r in baseline["results"]}
+
+    print("{:<40} {:>9} {:>8} {:>12} {:>12} {:>8}".format(
+        "operator", "faces", "islands", "time [s]", "base [s]", "ratio"))
+    for result in results["results"]:
+        if result["status"] != "OK":
+            continue
+        base = baseline_results.get(_result_key(result))
+        if base is None or base["status"] != "OK":
+            base_str = "{:>12} {:>8}".format("-", "-")
+        else:
+            t = result["time"]["min"]
+            bt = base["time"]["min"]
+            base_str = "{:12.4f} {:8.2f}".format(
+                bt, t / bt if bt > 0.0 else math.inf)
+        print("{:<40} {:>9} {:>8} {:12.4f} {}".format(
+            result["operator"], result["faces"], result["islands"],
+            result["time"]["min"], base_str))
+
+    for r in regressions:
+        print("[REGRESSION] {} (faces={}, islands={}) {}: {:g} -> {:g} "
+              "(x{:.2f})".format(r["operator"], r["faces"], r["islands"],
+                                 r["metric"], r["baseline"], r["value"],
+                                 r["ratio"]))
+
+
+def load_json(filepath):
+    with open(filepath, "r") as f:
+        return json.load(f)
+
+
+# ----------------------------------------------------------------------------
+# Benchmark (runs on Blender)
+# ----------------------------------------------------------------------------
+
+class BenchmarkScene:
+    def __init__(self, num_faces, num_islands, layout, seed):
+        import bpy
+        from magic_uv_test import fixtures
+
+        for obj in list(bpy.data.objects):
+            bpy.data.objects.remove(obj, do_unlink=True)
+
+        data = fixtures.generate(layout, num_faces, num_islands, seed)
+        self.object = fixtures.create_object(BENCHMARK_OBJECT_NAME, data)
+        self.num_faces = num_faces
+        self.num_islands = num_islands
+        self.initial_uvs = data.loop_uvs.ravel()
+
+    def reset(self, mode):
+        """
+        Restore the UVs and select all faces
+        """
+
+        import bpy
+
+        bpy.ops.object.mode_set(mode='OBJECT')
+        mesh = self.object.data
+        mesh.uv_layers.active.data.foreach_set("uv", self.initial_uvs)
+        mesh.polygons.foreach_set("select", [True] * len(mesh.polygons))
+        mesh.update()
+        bpy.context.scene.tool_settings.use_uv_select_sync = True
+        if mode == 'EDIT':
+            bpy.ops.object.mode_set(mode='EDIT')
+            bpy.ops.mesh.select_all(action='SELECT')
+
+
+class SimulatedEvent:
+    def __init__(self, type_, value, x, y):
+        self.type = type_
+        self.value = value
+        self.mouse_region_x = x
+        self.mouse_region_y = y
+        self.mouse_x = x
+        self.mouse_y = y
+        self.mouse_prev_x = x
+        self.mouse_prev_y = y
+        self.shift = False
+        self.ctrl = False
+        self.alt = False
+        self.oskey = False
+
+
+def make_modal_events(num_steps, use_timer=False):
+    """
+    Events to drive the modal operator: click to start the operation,
+    move the mouse, and cancel by right click.
+    The timer event follows each mouse move when use_timer is True, because
+    some operators (e.g. UV Bounding Box) update UVs only on the timer event.
+    """
+
+    events = [
+        SimulatedEvent('MOUSEMOVE', 'NOTHING', 100, 100),
+        SimulatedEvent('LEFTMOUSE', 'RELEASE', 100, 100),
+    ]
+    for i in range(num_steps):
+        x, y = 100 + i * 5, 100 + i * 3
+        events.append(SimulatedEvent('MOUSEMOVE', 'NOTHING', x, y))
+        if use_timer:
+            events.append(SimulatedEvent('TIMER', 'NOTHING', x, y))
+    events.append(SimulatedEvent('RIGHTMOUSE', 'PRESS', 100, 100))
+
+    return events
+
+
+def get_operator_classes(patterns):
+    from magic_uv.utils.bl_class_registry import BlClassRegistry
+
+    classes = {}
+    for class_ in BlClassRegistry.class_list:
+        cls = class_["class"]
+        if not cls.__name__.startswith("MUV_OT_"):
+            continue
+        if patterns and not any(fnmatch.fnmatch(cls.bl_idname, p)
+                                for p in patterns):
+            continue
+        classes[cls.bl_idname] = cls
+
+    return [classes[k] for k in sorted(classes)]
+
+
+def get_operator(bl_idname):
+    import bpy
+
+    category, name = bl_idname.split(".")
+    return getattr(getattr(bpy.ops, category), name)
+
+
+def get_entry_method(cls):
+    """
+    Return the method called first by running the operator:
+    'execute', 'invoke' (operators which only implement invoke()) or None
+    """
+
+    for name in ('execute', 'invoke'):
+        # Skip the callbacks of bpy.types.Operator.
+        if any(name in c.__dict__ for c in cls.__mro__
+               if not c.__module__.startswith("bpy")):
+            return name
+    return None
+
+
+def get_skip_reason(cls):
+    """
+    Return the reason why the operator can not be measured, or None
+    """
+
+    import bpy
+
+    method = get_entry_method(cls)
+    if method is None:
+        return "Neither execute() nor invoke() is implemented"
+    if method == 'invoke' and hasattr(cls, "modal") and \
+            bpy.context.window is None:
+        return ("Modal operator which only implements invoke() needs "
+                "a window (Blender runs in background mode)")
+    return None
+
+
+class OperatorRunner:
+    """
+    Run the operator and capture its instance to simulate the modal steps.
+    The operator is run by EXEC_DEFAULT, or by INVOKE_DEFAULT when it only
+    implements invoke().
+    """
+
+    def __init__(self, cls, num_modal_steps):
+        self.cls = cls
+        self.op = get_operator(cls.bl_idname)
+        self.num_modal_steps = num_modal_steps
+        self.method = get_entry_method(cls)
+        self.instances = []
+        self.__orig_method = None
+
+    def __enter__(self):
+        if self.method is None or not hasattr(self.cls, "modal"):
+            return self
+
+        self.__orig_method = self.cls.__dict__.get(self.method)
+        if self.__orig_method is None:
+            return self
+        orig_method = self.__orig_method
+        instances = self.instances
+
+        def method(op_self, *args):
+            instances.append(op_self)
+            return orig_method(op_self, *args)
+
+        setattr(self.cls, self.method, method)
+        return self
+
+    def __exit__(self, *_):
+        if self.__orig_method is not None:
+            setattr(self.cls, self.method, self.__orig_method)
+
+    def __stop(self, context):
+        # Operators toggled by invoke() keep running after the modal steps,
+        # and they must be stopped before the next run.
+        is_running = getattr(self.cls, "is_running", None)
+        handle_remove = getattr(self.cls, "handle_remove", None)
+        if is_running is None or handle_remove is None:
+            return
+        if is_running(context):
+            handle_remove(context)
+
+    def run(self):
+        """
+        Return (result, execute time, modal time)
+        """
+
+        import bpy
+
+        del self.instances[:]
+        start = time.perf_counter()
+        if self.method == 'invoke':
+            result = self.op('INVOKE_DEFAULT')
+        else:
+            result = self.op('EXEC_DEFAULT')
+        execute_time = time.perf_counter() - start
+
+        modal_time = None
+        if 'RUNNING_MODAL' in result and self.instances:
+            instance = self.instances[-1]
+            events = make_modal_events(self.num_modal_steps,
+                                       use_timer=(self.method == 'invoke'))
+            start = time.perf_counter()
+            for event in events:
+                ret = instance.modal(bpy.context, event)
+                if ('FINISHED' in ret) or ('CANCELLED' in ret):
+                    break
+            modal_time = time.perf_counter() - start
+            if self.method == 'invoke':
+                self.__stop(bpy.context)
+
+        return sorted(result), execute_time, modal_time
+
+
+def get_max_rss():
+    if resource is None:
+        return None
+    # ru_maxrss is KB on Linux, and bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return rss
+    return rss * 1024
+
+
+def find_runnable_mode(op):
+    import bpy
+
+    for mode in ('EDIT', 'OBJECT'):
+        bpy.ops.object.mode_set(mode=mode)
+        if op.poll():
+            return mode
+    return None
+
+
+def summarize_times(times):
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "max": max(times),
+        "runs": times,
+    }
+
+
+def benchmark_operator(scene, cls, args):
+    result = {
+        "operator": cls.bl_idname,
+        "class": cls.__name__,
+        "faces": scene.num_faces,
+        "islands": scene.num_islands,
+        "status": "OK",
+        "message": "",
+    }
+
+    reason = get_skip_reason(cls)
+    if reason is not None:
+        result["status"] = "SKIPPED"
+        result["message"] = reason
+        return result
+
+    scene.reset('EDIT')
+    op = get_operator(cls.bl_idname)
+    mode = find_runnable_mode(op)
+    if mode is None:
+        result["status"] = "SKIPPED"
+        result["message"] = "poll() failed"
+        return result
+    result["mode"] = mode
+
+    times = []
+    modal_times = []
+    try:
+        with OperatorRunner(cls, args.modal_steps) as runner:
+            for _ in range(max(args.repeat, 1)):
+                scene.reset(mode)
+                ret, execute_time, modal_time = runner.run()
+                times.append(execute_time)
+                if modal_time is not None:
+                    modal_times.append(modal_time)
+
+            peak_memory = None
+            max_rss = get_max_rss()
+            if not args.no_memory:
+                scene.reset(mode)
+                tracemalloc.start()
+                try:
+                    runner.run()
+                    _, peak_memory = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+    except Exception as e:     # pylint: disable=W0703
+        result["status"] = "ERROR"
+        result["message"] = "{}: {}".format(type(e).__name__, e)
+        return result
+
+    result["result"] = ret
+    result["time"] = summarize_times(times)
+    if modal_times:
+        result["modal_steps"] = args.modal_steps
+        result["modal_time"] = summarize_times(modal_times)
+    result["peak_memory"] = peak_memory
+    if max_rss is not None:
+        result["max_rss_growth"] = get_max_rss() - max_rss
+
+    return result
+
+
+def run_benchmarks(args):
+    import bpy
+    from magic_uv_test import common
+
+    bpy.ops.wm.read_factory_settings()
+    common.check_addon_enabled("magic_uv")
+    import magic_uv
+
+    classes = get_operator_classes(args.operators)
+    results = {
+        "date": datetime.datetime.now().isoformat(),
+        "blender_version": ".".join(str(v) for v in bpy.app.version),
+        "magic_uv_version": ".".join(
+            str(v) for v in magic_uv.bl_info["version"]),
+        "platform": platform.platform(),
+        "python_version": platform.python_version(),
+        "config": {
+            "sizes": args.sizes,
+            "islands": args.islands,
+            "layout": args.layout,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "modal_steps": args.modal_steps,
+        },
+        "results": [],
+    }
+
+    # Operators taking more than max_time are not measured for the larger
+    # meshes.
+    too_slow = {}
+    for num_faces in sorted(args.sizes):
+        for num_islands in args.islands:
+            print("======== Benchmark: {} faces, {} islands ========"
+                  .format(num_faces, num_islands))
+            scene = BenchmarkScene(num_faces, num_islands, args.layout,
+                                   args.seed)
+            for cls in classes:
+                if too_slow.get((cls.bl_idname, num_islands), False):
+                    r = {
+                        "operator": cls.bl_idname,
+                        "class": cls.__name__,
+                        "faces": num_faces,
+                        "islands": num_islands,
+                        "status": "SKIPPED",
+                        "message": "Too slow on the smaller mesh",
+                    }
+                else:
+                    r = benchmark_operator(scene, cls, args)
+                results["results"].append(r)
+                if r["status"] == "OK":
+                    print("{:<40} {:>10.4f} [s]".format(
+                        cls.bl_idname, r["time"]["min"]))
+                    if r["time"]["min"] > args.max_time:
+                        too_slow[(cls.bl_idname, num_islands)] = True
+                else:
+                    print("{:<40} {} ({})".format(
+                        cls.bl_idname, r["status"], r["message"]))
+
+    common.check_addon_disabled("magic_uv")
+
+    return results
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Performance benchmark of Magic UV operators")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=DEFAULT_SIZES,
+                        help="Number of faces of the benchmark mesh")
+    parser.add_argument("--islands", type=int, nargs="+",
+                        default=DEFAULT_ISLANDS,
+                        help="Number of UV islands of the benchmark mesh")
+    parser.add_argument("--layout", default="ISLANDS",
+                        help="UV layout of the benchmark mesh (see "
+                             "magic_uv_test/fixtures.py)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the benchmark mesh")
+    parser.add_argument("--operators", nargs="+", default=[],
+                        help="Patterns of bl_idname of operators to be "
+                             "measured (ex. 'uv.muv_pack_uv*')")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of runs for each measurement")
+    parser.add_argument("--modal-steps", type=int, default=20,
+                        help="Number of simulated mouse moves for modal "
+                             "operators")
+    parser.add_argument("--max-time", type=float, default=60.0,
+                        help="Skip the larger meshes when the operator "
+                             "takes more than this time [sec]")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Do not measure the peak memory")
+    parser.add_argument("--output", default="benchmark_result.json",
+                        help="Path to the result JSON file")
+    parser.add_argument("--baseline",
+                        help="Path to the baseline JSON file to be compared")
+    parser.add_argument("--time-threshold", type=float, default=0.2,
+                        help="Allowed ratio of the increase of time")
+    parser.add_argument("--memory-threshold", type=float, default=0.2,
+                        help="Allowed ratio of the increase of peak memory")
+    parser.add_argument("--min-time", type=float, default=0.005,
+                        help="Differences of time less than this [sec] are "
+                             "ignored")
+    parser.add_argument("--compare", nargs=2, metavar=("RESULT", "BASELINE"),
+                        help="Only compare the result with the baseline "
+                             "(Blender is not required)")
+
+    return parser.parse_args(argv)
+
+
+def benchmark_main():
+    # Arguments after '--' are passed to this script by Blender.
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv \
+        else sys.argv[1:]
+    args = parse_args(argv)
+
+    if args.compare:
+        results = load_json(args.compare[0])
+        baseline = load_json(args.compare[1])
+    else:
+        sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+        results = run_benchmarks(args)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print("Results are written to {}".format(args.output))
+        if not args.baseline:
+            sys.exit(0)
+        baseline = load_json(args.baseline)
+
+    regressions = compare_results(results, baseline, args.time_threshold,
+                                  args.memory_threshold, args.min_time)
+    print_comparison(results, baseline, regressions)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    benchmark_main()
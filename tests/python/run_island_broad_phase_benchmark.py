@@ -0,0 +1,133 @@
+"""
+Benchmark of the broad phase for the inter-island overlap detection.
+
+Run on Blender in background mode:
+
+    MUV_CONSOLE_MODE=true blender --factory-startup --background -noaudio \
+        --python tests/python/run_island_broad_phase_benchmark.py -- \
+        --max-islands 100000
+
+The pairwise AABB test (used by common.get_overlapped_uv_info before) and
+the sort and sweep (utils.spatial.find_overlapped_boxes) are measured on
+the bounding boxes of UV islands of the same atlas
+(magic_uv_test.fixtures) while increasing the number of islands.
+Islands of the atlas are shifted randomly by --jitter (ratio to the size
+of the island) so that neighbouring islands overlap.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+
+# Pairwise AABB test is too slow for many islands, so it is measured only
+# for small cases.
+PAIRWISE_LIMIT = 5000
+
+
+def calc_island_boxes(data, jitter, seed):
+    loop_islands = np.repeat(data.face_islands, 4)
+    num_islands = int(data.face_islands.max()) + 1
+    uvs = data.loop_uvs.astype(np.float64)
+
+    min_coords = np.full((num_islands, 2), np.inf)
+    max_coords = np.full((num_islands, 2), -np.inf)
+    np.minimum.at(min_coords, loop_islands, uvs)
+    np.maximum.at(max_coords, loop_islands, uvs)
+
+    rng = np.random.RandomState(seed)
+    offsets = rng.uniform(-jitter, jitter, (num_islands, 2)) * \
+        (max_coords - min_coords)
+
+    return min_coords + offsets, max_coords + offsets
+
+
+def pairwise(min_coords, max_coords):
+    mins = min_coords.tolist()
+    maxs = max_coords.tolist()
+    pairs = []
+    for i, (min_1, max_1) in enumerate(zip(mins, maxs)):
+        for j in range(i + 1, len(mins)):
+            min_2 = mins[j]
+            max_2 = maxs[j]
+            if (max_1[0] < min_2[0]) or (max_2[0] < min_1[0]) or \
+               (max_1[1] < min_2[1]) or (max_2[1] < min_1[1]):
+                continue
+            pairs.append((i, j))
+    return pairs
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def run_benchmarks(args):
+    import bpy
+    from magic_uv_test import common, fixtures
+
+    bpy.ops.wm.read_factory_settings()
+    common.check_addon_enabled("magic_uv")
+    from magic_uv.utils.spatial import find_overlapped_boxes
+
+    print("{:>10} {:>10} {:>14} {:>14}".format(
+        "islands", "pairs", "pairwise [s]", "sweep [s]"))
+    num_islands = args.min_islands
+    while num_islands <= args.max_islands:
+        data = fixtures.generate(args.layout,
+                                 num_islands * args.faces_per_island,
+                                 num_islands, args.seed)
+        min_coords, max_coords = calc_island_boxes(data, args.jitter,
+                                                   args.seed)
+        sweep_time, (indices_1, _) = measure(
+            find_overlapped_boxes, min_coords, max_coords)
+        if num_islands <= PAIRWISE_LIMIT:
+            pairwise_time, pairs = measure(pairwise, min_coords, max_coords)
+            assert len(pairs) == len(indices_1)
+            pairwise_str = "{:14.4f}".format(pairwise_time)
+        else:
+            pairwise_str = "{:>14}".format("-")
+        print("{:>10} {:>10} {} {:14.4f}".format(
+            num_islands, len(indices_1), pairwise_str, sweep_time))
+        num_islands *= 2
+
+    common.check_addon_disabled("magic_uv")
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the broad phase of UV Inspection")
+    parser.add_argument("--min-islands", type=int, default=1000,
+                        help="Number of UV islands of the first atlas")
+    parser.add_argument("--max-islands", type=int, default=100000,
+                        help="Maximum number of UV islands")
+    parser.add_argument("--faces-per-island", type=int, default=1,
+                        help="Number of faces of each UV island")
+    parser.add_argument("--layout", default="ISLANDS",
+                        help="UV layout of the atlas (see "
+                             "magic_uv_test/fixtures.py)")
+    parser.add_argument("--jitter", type=float, default=0.5,
+                        help="Random shift of islands relative to their "
+                             "size")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the atlas")
+
+    return parser.parse_args(argv)
+
+
+def benchmark_main():
+    # Arguments after '--' are passed to this script by Blender.
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv \
+        else sys.argv[1:]
+    args = parse_args(argv)
+
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    run_benchmarks(args)
+
+
+if __name__ == "__main__":
+    benchmark_main()
@@ -0,0 +1,202 @@
+"""
+Benchmark of Pack UV methods on the atlas which has many UV islands.
+
+Run on Blender in background mode:
+
+    MUV_CONSOLE_MODE=true blender --factory-startup --background -noaudio \
+        --python tests/python/run_pack_uv_benchmark.py -- \
+        --islands 10000 --output pack_result.json
+
+The following methods are measured on the same atlas
+(magic_uv_test.fixtures):
+
+    BLENDER_PACK_ISLANDS: bpy.ops.uv.pack_islands()
+    PACK_UV_BLENDER: bpy.ops.uv.muv_pack_uv(pack_method='BLENDER')
+    PACK_UV_BUILTIN: bpy.ops.uv.muv_pack_uv(pack_method='BUILTIN')
+
+Efficiency is the ratio of the total area of the bounding boxes of
+islands to the area of the bounding square of all packed UVs.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+
+DEFAULT_ISLANDS = [1000, 10000]
+METHODS = [
+    'BLENDER_PACK_ISLANDS',
+    'PACK_UV_BLENDER',
+    'PACK_UV_BUILTIN',
+]
+
+
+def run_method(method, rotate, margin):
+    import bpy
+
+    if method == 'BLENDER_PACK_ISLANDS':
+        bpy.ops.uv.select_all(action='SELECT')
+        return bpy.ops.uv.pack_islands(rotate=rotate, margin=margin)
+    if method == 'PACK_UV_BLENDER':
+        return bpy.ops.uv.muv_pack_uv(rotate=rotate, margin=margin,
+                                      pack_method='BLENDER')
+    if method == 'PACK_UV_BUILTIN':
+        return bpy.ops.uv.muv_pack_uv(rotate=rotate, margin=margin,
+                                      pack_method='BUILTIN')
+
+    raise ValueError("Invalid method: {}".format(method))
+
+
+def calc_efficiency(obj, loop_islands, num_islands):
+    mesh = obj.data
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    mesh.uv_layers.active.data.foreach_get("uv", uvs)
+    uvs = uvs.reshape(-1, 2).astype(np.float64)
+
+    min_uvs = np.full((num_islands, 2), np.inf)
+    max_uvs = np.full((num_islands, 2), -np.inf)
+    np.minimum.at(min_uvs, loop_islands, uvs)
+    np.maximum.at(max_uvs, loop_islands, uvs)
+    areas = np.prod(max_uvs - min_uvs, axis=1)
+    extent = np.max(uvs.max(axis=0) - uvs.min(axis=0))
+
+    return float(np.sum(areas) / (extent * extent))
+
+
+def benchmark_method(scene, data, method, args):
+    import bpy
+
+    result = {
+        "method": method,
+        "faces": scene.num_faces,
+        "islands": scene.num_islands,
+        "status": "OK",
+        "message": "",
+    }
+
+    loop_islands = np.repeat(data.face_islands, 4)
+    num_islands = int(data.face_islands.max()) + 1
+    times = []
+    try:
+        for _ in range(max(args.repeat, 1)):
+            scene.reset('EDIT')
+            start = time.perf_counter()
+            ret = run_method(method, args.rotate, args.margin)
+            times.append(time.perf_counter() - start)
+            if 'FINISHED' not in ret:
+                result["status"] = "FAILED"
+                result["message"] = "Returned {}".format(sorted(ret))
+                return result
+        bpy.ops.object.mode_set(mode='OBJECT')
+        result["efficiency"] = calc_efficiency(scene.object, loop_islands,
+                                               num_islands)
+    except Exception as e:     # pylint: disable=W0703
+        result["status"] = "ERROR"
+        result["message"] = "{}: {}".format(type(e).__name__, e)
+        return result
+
+    result["time"] = {
+        "min": min(times),
+        "max": max(times),
+        "runs": times,
+    }
+
+    return result
+
+
+def run_benchmarks(args):
+    import bpy
+    from magic_uv_test import common, fixtures
+    from run_benchmarks import BenchmarkScene
+
+    bpy.ops.wm.read_factory_settings()
+    common.check_addon_enabled("magic_uv")
+
+    results = {
+        "date": datetime.datetime.now().isoformat(),
+        "blender_version": ".".join(str(v) for v in bpy.app.version),
+        "platform": platform.platform(),
+        "python_version": platform.python_version(),
+        "config": {
+            "islands": args.islands,
+            "faces_per_island": args.faces_per_island,
+            "layout": args.layout,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "rotate": args.rotate,
+            "margin": args.margin,
+        },
+        "results": [],
+    }
+
+    for num_islands in args.islands:
+        num_faces = num_islands * args.faces_per_island
+        print("======== Benchmark: {} faces, {} islands ========"
+              .format(num_faces, num_islands))
+        scene = BenchmarkScene(num_faces, num_islands, args.layout,
+                               args.seed)
+        data = fixtures.generate(args.layout, num_faces, num_islands,
+                                 args.seed)
+        for method in args.methods:
+            r = benchmark_method(scene, data, method, args)
+            results["results"].append(r)
+            if r["status"] == "OK":
+                print("{:<24} {:>10.4f} [s]  efficiency {:.3f}".format(
+                    method, r["time"]["min"], r["efficiency"]))
+            else:
+                print("{:<24} {} ({})".format(method, r["status"],
+                                              r["message"]))
+
+    common.check_addon_disabled("magic_uv")
+
+    return results
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Benchmark of Pack UV methods")
+    parser.add_argument("--islands", type=int, nargs="+",
+                        default=DEFAULT_ISLANDS,
+                        help="Number of UV islands of the atlas")
+    parser.add_argument("--faces-per-island", type=int, default=4,
+                        help="Number of faces of each UV island")
+    parser.add_argument("--layout", default="ISLANDS",
+                        help="UV layout of the atlas (see "
+                             "magic_uv_test/fixtures.py)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the atlas")
+    parser.add_argument("--methods", nargs="+", default=METHODS,
+                        choices=METHODS, help="Methods to be measured")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of runs for each measurement")
+    parser.add_argument("--rotate", action="store_true",
+                        help="Allow to rotate islands")
+    parser.add_argument("--margin", type=float, default=0.001,
+                        help="Margin between islands")
+    parser.add_argument("--output", default="pack_uv_benchmark_result.json",
+                        help="Path to the result JSON file")
+
+    return parser.parse_args(argv)
+
+
+def benchmark_main():
+    # Arguments after '--' are passed to this script by Blender.
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv \
+        else sys.argv[1:]
+    args = parse_args(argv)
+
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    results = run_benchmarks(args)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print("Results are written to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    benchmark_main()
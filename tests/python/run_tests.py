@@ -19,15 +19,18 @@ def test_main():
         magic_uv_test.align_uv_test.TestAlignUVSnapToEdge,
         magic_uv_test.align_uv_cursor_test.TestAlignUVCursor,
         magic_uv_test.clip_uv_test.TestClipUV,
+        magic_uv_test.common_test.TestCommonIslandCache,
         magic_uv_test.copy_paste_uv_test.TestCopyPasteUV,
         magic_uv_test.copy_paste_uv_test.TestCopyPasteUVSelseq,
         magic_uv_test.copy_paste_uv_object_test.TestCopyPasteUVObject,
         magic_uv_test.copy_paste_uv_uvedit_test.TestCopyPasteUVUVEdit,
+        magic_uv_test.fixtures_test.TestFixtures,
         magic_uv_test.flip_rotate_uv_test.TestFlipRotateUV,
         magic_uv_test.mirror_uv_test.TestMirrorUV,
         magic_uv_test.move_uv_test.TestMoveUV,
         magic_uv_test.pack_uv_test.TestPackUV,
         magic_uv_test.preserve_uv_aspect_test.TestPreserveUVAspect,
+        magic_uv_test.profiler_test.TestProfiler,
         magic_uv_test.select_uv_test.TestSelectUVOverlapped,
         magic_uv_test.select_uv_test.TestSelectUVFlipped,
         magic_uv_test.select_uv_test.TestSelectUVZoomSelectedUV,
@@ -37,9 +40,16 @@ def test_main():
         magic_uv_test.texture_wrap_test.TestTextureWrap,
         magic_uv_test.transfer_uv_test.TestTransferUV,
         magic_uv_test.unwrap_constraint_test.TestUnwrapConstraint,
+        magic_uv_test.utils_test.TestUtilsIsland,
+        magic_uv_test.utils_test.TestUtilsSpatial,
+        magic_uv_test.utils_test.TestUtilsTransform,
+        magic_uv_test.utils_test.TestUtilsGraph,
+        magic_uv_test.utils_test.TestUtilsPacking,
+        magic_uv_test.utils_test.TestUtilsUVArray,
         magic_uv_test.uv_bounding_box_test.TestUVBoundingBox,
         magic_uv_test.uv_inspection_test.TestUVInspection,
         magic_uv_test.uv_inspection_test.TestUVInspectionPaintUVIsland,
+        magic_uv_test.uv_inspection_test.TestUVInspectionOverlappedPolygons,
         magic_uv_test.uv_sculpt_test.TestUVSculpt,
         magic_uv_test.uvw_test.TestUVWBox,
         magic_uv_test.uvw_test.TestUVWBestPlaner,
@@ -47,6 +57,7 @@ def test_main():
         magic_uv_test.world_scale_uv_test.TestWorldScaleUVApplyManual,
         magic_uv_test.world_scale_uv_test.TestWorldScaleUVApplyScalingDensity,
         magic_uv_test.world_scale_uv_test.TestWorldScaleUVProportionalToMesh,
+        magic_uv_test.world_scale_uv_test.TestWorldScaleUVReportDensity,
     ]
 
     suite = unittest.TestSuite()